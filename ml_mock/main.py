@@ -1,3 +1,4 @@
+import os
 from fastapi import FastAPI
 from pydantic import BaseModel
 from typing import List
@@ -17,6 +18,27 @@ class TopicsRequest(BaseModel):
 class TopicsResponse(BaseModel):
     topics: List[str]
 
+class AnalyzeRequest(BaseModel):
+    text: str
+    context: dict | None = None
+
+class AnalyzeResponse(BaseModel):
+    importance: float
+    topics: List[str]
+
+class BatchImportanceRequest(BaseModel):
+    texts: List[str]
+    contexts: List[dict] | None = None
+
+class BatchImportanceResponse(BaseModel):
+    importances: List[float]
+
+class BatchTopicsRequest(BaseModel):
+    texts: List[str]
+
+class BatchTopicsResponse(BaseModel):
+    topics: List[List[str]]
+
 
 @app.post("/importance", response_model=ImportanceResponse)
 async def importance(_: ImportanceRequest):
@@ -28,6 +50,22 @@ async def topics(_: TopicsRequest):
     return {"topics": ["mock", "test", "demo"]}
 
 
+@app.post("/analyze", response_model=AnalyzeResponse)
+async def analyze(_: AnalyzeRequest):
+    return {"importance": 0.5, "topics": ["mock", "test", "demo"]}
+
+
+@app.post("/importance/batch", response_model=BatchImportanceResponse)
+async def importance_batch(request: BatchImportanceRequest):
+    return {"importances": [0.5 for _ in request.texts]}
+
+
+@app.post("/topics/batch", response_model=BatchTopicsResponse)
+async def topics_batch(request: BatchTopicsRequest):
+    return {"topics": [["mock", "test", "demo"] for _ in request.texts]}
+
+
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
+    # Версия модели входит в ключи кеша бота: смена версии сбрасывает закешированные оценки
+    return {"status": "ok", "model_version": os.getenv("MODEL_VERSION", "mock-1")}
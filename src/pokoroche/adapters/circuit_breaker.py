@@ -0,0 +1,79 @@
+import logging
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Circuit breaker для вызовов внешнего сервиса.
+
+    closed    - запросы идут как обычно, считаем подряд идущие ошибки;
+    open      - после failure_threshold ошибок запросы не отправляются вовсе;
+    half_open - через recovery_timeout пропускаем один пробный запрос:
+                успех закрывает breaker, ошибка снова открывает.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        on_state_change: Optional[Callable[[str, str, str], None]] = None,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.on_state_change = on_state_change
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.rejected = 0
+
+    def _set_state(self, state: str) -> None:
+        if state == self.state:
+            return
+        old, self.state = self.state, state
+        logger.warning(f"Circuit breaker {self.name}: {old} -> {state}")
+        if self.on_state_change is not None:
+            self.on_state_change(self.name, old, state)
+
+    def allow_request(self) -> bool:
+        """Можно ли сейчас обращаться к сервису"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.recovery_timeout:
+                self.rejected += 1
+                return False
+            self._set_state(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN:
+            # Пока идёт пробный запрос, остальные сразу уходят в fallback
+            if self.probe_in_flight:
+                self.rejected += 1
+                return False
+            self.probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.probe_in_flight = False
+        self._set_state(self.CLOSED)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._set_state(self.OPEN)
+
+    def get_status(self) -> dict:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "failures": self.failures,
+            "rejected": self.rejected,
+        }
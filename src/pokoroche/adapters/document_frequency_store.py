@@ -0,0 +1,103 @@
+import json
+import math
+import time
+from collections import Counter
+from typing import Iterable, Optional
+
+from .redis_client import IRedisClient
+
+
+class DocumentFrequencyStore:
+    """Частоты слов по документам (DF) для TF-IDF оценки тем.
+
+    Счётчики живут в памяти процесса и обновляются на каждом сообщении;
+    раз в persist_every документов или persist_interval секунд накопленные
+    приращения вливаются в общий снимок в Redis. Слияние - чтение, сложение и
+    запись, поэтому при одновременной записи из нескольких процессов часть
+    приращений может потеряться: для статистики частот это допустимо.
+    """
+
+    def __init__(
+        self,
+        redis_client: Optional[IRedisClient] = None,
+        key: str = "topics:df",
+        persist_every: int = 500,
+        persist_interval: float = 60.0,
+        max_terms: int = 100000,
+        common_ratio: float = 0.5,
+        min_documents: int = 50,
+    ):
+        self.redis = redis_client
+        self.key = key
+        self.persist_every = persist_every
+        self.persist_interval = persist_interval
+        self.max_terms = max_terms
+        # Слово считается общим (не тема), если встречается больше чем в common_ratio документов.
+        # Пока документов меньше min_documents, статистике не доверяем
+        self.common_ratio = common_ratio
+        self.min_documents = min_documents
+        self.df: Counter = Counter()
+        self.documents = 0
+        # Приращения, ещё не записанные в Redis
+        self.pending: Counter = Counter()
+        self.pending_documents = 0
+        self.last_persist = time.monotonic()
+
+    def add_document(self, tokens: Iterable[str]) -> None:
+        unique = set(tokens)
+        self.df.update(unique)
+        self.pending.update(unique)
+        self.documents += 1
+        self.pending_documents += 1
+
+    def idf(self, term: str) -> float:
+        # Сглаженный IDF: не бывает нулевым и не делит на ноль для новых слов
+        return math.log((1 + self.documents) / (1 + self.df.get(term, 0))) + 1.0
+
+    def is_common(self, term: str) -> bool:
+        if self.documents < self.min_documents:
+            return False
+        return self.df.get(term, 0) / self.documents > self.common_ratio
+
+    async def load(self) -> None:
+        """Загрузить общий снимок из Redis"""
+        snapshot = await self._read_snapshot()
+        if snapshot is not None:
+            self.documents, self.df = snapshot
+            self.documents += self.pending_documents
+            self.df.update(self.pending)
+
+    async def persist(self) -> None:
+        """Влить накопленные приращения в снимок в Redis"""
+        self.last_persist = time.monotonic()
+        if self.redis is None or not self.pending_documents:
+            return
+        documents, df = await self._read_snapshot() or (0, Counter())
+        documents += self.pending_documents
+        df.update(self.pending)
+        if len(df) > self.max_terms:
+            # Редкие слова отбрасываем, чтобы словарь не рос бесконечно
+            df = Counter(dict(df.most_common(self.max_terms)))
+        await self.redis.set(self.key, json.dumps({"documents": documents, "df": df}))
+        # Заодно получаем приращения других процессов
+        self.documents, self.df = documents, df
+        self.pending = Counter()
+        self.pending_documents = 0
+
+    async def maybe_persist(self) -> None:
+        if self.pending_documents >= self.persist_every or (
+            self.pending_documents and time.monotonic() - self.last_persist >= self.persist_interval
+        ):
+            await self.persist()
+
+    async def _read_snapshot(self):
+        if self.redis is None:
+            return None
+        raw = await self.redis.get(self.key)
+        if not raw:
+            return None
+        try:
+            data = json.loads(raw)
+            return int(data["documents"]), Counter({str(k): int(v) for k, v in data["df"].items()})
+        except (ValueError, TypeError, KeyError, AttributeError):
+            return None
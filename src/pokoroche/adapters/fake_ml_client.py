@@ -1,6 +1,7 @@
-import re
 from typing import Dict, Any, List
 from .ml_client import IMLClient
+from .fallback_scorer import batch_fallback_importance
+from ..domain.services.text_processing import extract_keywords
 
 
 class FakeMLClient(IMLClient):
@@ -10,6 +11,8 @@ class FakeMLClient(IMLClient):
         if not text:
             return 0.0
         text = text.strip()
+        if not text:
+            return 0.0
         # Берем как один из критериев важности длину текста (считаю текст длины 300 как максимально важный)
         length_score = min(len(text) / 300, 1.0)
         # Дополнительный бонус к важности, который ориентируется на знаки препинания и регистр букв
@@ -26,26 +29,13 @@ class FakeMLClient(IMLClient):
         final_importance = min(urgency_score + length_score, 1.0)
         return final_importance
 
+    async def batch_analyze_importance(self, texts: List[str]) -> List[float]:
+        # Та же эвристика, но для всей пачки разом
+        return batch_fallback_importance(texts)
+
     async def extract_topics(self, text: str) -> List[str]:
-        if not text:
-            return []
-        text = text.strip().lower()
-        words = text.split()
-        # Допустимые символы - русские или латинские буквы, цифры, дефис
-        allowed_chars = re.compile(r'[^a-zA-Zа-яА-ЯёЁ0-9-]')
-        unique_words = set()
-        for word in words:
-            # "Очищаю" слово от недопустимых символов
-            cleaned_word = allowed_chars.sub('', word)
-            # Если слово осталось не пустым, то добавляю его в set
-            if cleaned_word:
-                unique_words.add(cleaned_word)
-        topics = []
-        for word in unique_words:
-            # Если длина слова больше 4 (исключаю короткие слова по типу и, на, или и тд), то добавляю в список тем
-            if len(word) > 4:
-                topics.append(word)
-        return topics
+        # Слова длиннее 4 символов (исключаю короткие слова по типу и, на, или и тд)
+        return extract_keywords(text)
 
     async def categorize_message(self, text: str) -> Dict[str, float]:
         topics = await self.extract_topics(text)
@@ -0,0 +1,56 @@
+from typing import List, Optional
+
+import numpy as np
+
+# Таблица "заглавная буква" для символов BMP: c.isalpha() and c.isupper(), как в эвристике MLClient.
+# Строится один раз при первом вызове
+_UPPER_TABLE: Optional[np.ndarray] = None
+_BMP_SIZE = 0x10000
+
+
+def _upper_table() -> np.ndarray:
+    global _UPPER_TABLE
+    if _UPPER_TABLE is None:
+        _UPPER_TABLE = np.fromiter(
+            (chr(i).isalpha() and chr(i).isupper() for i in range(_BMP_SIZE)), dtype=bool, count=_BMP_SIZE
+        )
+    return _UPPER_TABLE
+
+
+def batch_fallback_importance(texts: List[str]) -> List[float]:
+    """Эвристика важности для пачки текстов разом.
+
+    Те же признаки и те же оценки, что и у MLClient._fallback_importance:
+    длина, наличие '!'/'?' и доля заглавных букв, но посчитанные NumPy
+    по всем символам пачки сразу, а не циклом по каждому символу.
+    """
+    if not texts:
+        return []
+    stripped = [text.strip() if text else "" for text in texts]
+    lengths = np.fromiter((len(text) for text in stripped), dtype=np.int64, count=len(stripped))
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+
+    # Все тексты одной строкой -> массив кодов символов.
+    # surrogatepass: одиночные суррогаты (бывают в JSON от Telegram) кодируются как обычные коды
+    codes = np.frombuffer("".join(stripped).encode("utf-32-le", errors="surrogatepass"), dtype=np.uint32)
+    upper = _upper_table()[np.minimum(codes, _BMP_SIZE - 1)]
+    # Символы вне BMP (эмодзи и т.п.) редки - проверяем их по одному
+    for i in np.flatnonzero(codes >= _BMP_SIZE):
+        c = chr(codes[i])
+        upper[i] = c.isalpha() and c.isupper()
+    # Поиск подстроки в str уже идёт на C - для '!'/'?' этого достаточно
+    has_punct = np.fromiter(("!" in text or "?" in text for text in stripped), dtype=bool, count=len(stripped))
+
+    # Число заглавных в каждом тексте через накопленную сумму: count = cum[end] - cum[start]
+    upper_cum = np.zeros(len(codes) + 1, dtype=np.int32)
+    np.cumsum(upper, dtype=np.int32, out=upper_cum[1:])
+    upper_count = upper_cum[ends] - upper_cum[starts]
+
+    safe_lengths = np.maximum(lengths, 1)
+    length_score = np.minimum(lengths / 300, 1.0)
+    urgency_score = np.where(has_punct, 0.1, 0.0) + np.where(upper_count / safe_lengths > 0.3, 0.1, 0.0)
+    scores = np.minimum(urgency_score + length_score, 1.0)
+    # Пустой текст (или только пробелы) - 0.0
+    scores[lengths == 0] = 0.0
+    return scores.tolist()
@@ -0,0 +1,185 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from ..infrastructure.ml.model_loader import ModelLoader
+from .fake_ml_client import FakeMLClient
+from .ml_batcher import MicroBatcher
+from .ml_client import IMLClient
+
+# Модели в процессе-воркере пула. При fork воркеры наследуют уже загруженные
+# родителем модели, иначе (spawn) загружают их сами в _init_worker
+_loader: Optional[ModelLoader] = None
+
+
+def _init_worker(model_path: str) -> None:
+    global _loader
+    if _loader is not None and _loader.model_path == model_path:
+        return
+    loader = ModelLoader(model_path)
+    if not asyncio.run(loader.load_models()):
+        raise RuntimeError(f"Не удалось загрузить модели из {model_path}")
+    _loader = loader
+
+
+def _pool_context():
+    # fork: воркеры делят с родителем уже загруженные модели и отображённые в память массивы
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return None
+
+
+def _predict_importance(texts: List[str]) -> List[float]:
+    model = _loader.importance_model
+    # Классификатор с predict_proba: берём вероятность "важного" класса
+    if hasattr(model, "predict_proba"):
+        return [float(row[-1]) for row in model.predict_proba(texts)]
+    return [float(score) for score in model.predict(texts)]
+
+
+def _predict_topics(texts: List[str]) -> List[List[str]]:
+    topics = []
+    for prediction in _loader.topic_model.predict(texts):
+        # Модель может вернуть одну метку или список меток на текст
+        if isinstance(prediction, str):
+            topics.append([prediction])
+        else:
+            topics.append([str(topic) for topic in prediction])
+    return topics
+
+
+class LocalMLClient(IMLClient):
+    """ML клиент, который считает модели ModelLoader прямо в боте.
+
+    Инференс идёт в пуле процессов, чтобы не блокировать event loop;
+    одновременные вызовы собираются в пачки. Если модели недоступны,
+    используется та же эвристика, что и у FakeMLClient.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        workers: int = 2,
+        batch_size: int = 64,
+        batch_window: float = 0.0,
+        fallback: Optional[IMLClient] = None,
+        reload_interval: float = 0.0,
+    ):
+        self.model_path = model_path
+        self.workers = workers
+        # Как часто проверять, не поменялись ли файлы моделей (0 - не проверять)
+        self.reload_interval = reload_interval
+        self.watch_task: Optional[asyncio.Task] = None
+        self.loader: Optional[ModelLoader] = None
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.fallback = fallback or FakeMLClient()
+        self.importance_batcher: Optional[MicroBatcher] = None
+        self.topics_batcher: Optional[MicroBatcher] = None
+        if batch_window > 0:
+            self.importance_batcher = MicroBatcher(
+                lambda texts: self._run(_predict_importance, texts), batch_size, batch_window
+            )
+            self.topics_batcher = MicroBatcher(
+                lambda texts: self._run(_predict_topics, texts), batch_size, batch_window
+            )
+
+    @property
+    def model_version(self) -> Optional[str]:
+        return self.loader.model_version if self.loader else None
+
+    async def start(self) -> None:
+        """Загрузить модели и поднять пул процессов"""
+        global _loader
+        if self.executor is not None:
+            return
+        loader = ModelLoader(self.model_path)
+        if not await loader.load_models():
+            raise RuntimeError(f"Не удалось загрузить модели из {self.model_path}")
+        self.loader = loader
+        # Загружаем до создания пула: воркеры, созданные через fork, получат модели без повторной загрузки
+        _loader = loader
+        self.executor = self._create_executor()
+        if self.reload_interval > 0:
+            self.watch_task = asyncio.create_task(self._watch_models())
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=_pool_context(),
+            initializer=_init_worker,
+            initargs=(self.model_path,),
+        )
+
+    async def reload_models(self) -> bool:
+        """Подхватить новую версию моделей, если файлы изменились"""
+        if self.loader is None or not await self.loader.reload_if_changed():
+            return False
+        # Новые запросы сразу идут в новый пул (воркеры форкаются уже с новыми моделями),
+        # а старый пул досчитывает начатые пачки на старой версии и закрывается
+        old, self.executor = self.executor, self._create_executor()
+        if old is not None:
+            await asyncio.to_thread(old.shutdown, True)
+        print(f"Модели перезагружены, версия {self.model_version}")
+        return True
+
+    async def _watch_models(self) -> None:
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await self.reload_models()
+            except Exception as e:
+                print(f"Ошибка при перезагрузке моделей: {e}")
+
+    async def close(self) -> None:
+        if self.watch_task is not None:
+            self.watch_task.cancel()
+            self.watch_task = None
+        if self.executor is not None:
+            executor, self.executor = self.executor, None
+            await asyncio.to_thread(executor.shutdown, True, cancel_futures=True)
+
+    async def _run(self, fn: Callable[[List[str]], List[Any]], texts: List[str]) -> List[Any]:
+        if self.executor is None:
+            await self.start()
+        results = await asyncio.get_running_loop().run_in_executor(self.executor, fn, texts)
+        if len(results) != len(texts):
+            raise ValueError(f"model returned {len(results)} results for {len(texts)} texts")
+        return results
+
+    async def batch_analyze_importance(self, texts: List[str]) -> List[float]:
+        if not texts:
+            return []
+        try:
+            return await self._run(_predict_importance, texts)
+        except Exception as e:
+            print(f"Ошибка локальной модели важности: {e}")
+            return await self.fallback.batch_analyze_importance(texts)
+
+    async def batch_extract_topics(self, texts: List[str]) -> List[List[str]]:
+        if not texts:
+            return []
+        try:
+            return await self._run(_predict_topics, texts)
+        except Exception as e:
+            print(f"Ошибка локальной модели тем: {e}")
+            return await self.fallback.batch_extract_topics(texts)
+
+    async def analyze_importance(self, text: str, context: Dict[str, Any] = None) -> float:
+        if self.importance_batcher is None:
+            return (await self.batch_analyze_importance([text]))[0]
+        try:
+            return await self.importance_batcher.submit(text)
+        except Exception:
+            return await self.fallback.analyze_importance(text, context)
+
+    async def extract_topics(self, text: str) -> List[str]:
+        if self.topics_batcher is None:
+            return (await self.batch_extract_topics([text]))[0]
+        try:
+            return await self.topics_batcher.submit(text)
+        except Exception:
+            return await self.fallback.extract_topics(text)
+
+    async def health_check(self) -> bool:
+        return self.executor is not None
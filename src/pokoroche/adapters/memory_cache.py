@@ -0,0 +1,68 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from ..application.dtos.cache_dto import CacheItem
+
+
+class LRUCache:
+    """Кеш в памяти процесса (L1) с вытеснением давно неиспользованных записей.
+
+    Ограничен и числом записей, и примерным объёмом в байтах; у каждой записи свой TTL.
+    """
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 16 * 1024 * 1024, ttl: int = 60):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.items: "OrderedDict[str, CacheItem]" = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        item = self.items.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        if not item.is_valid():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self.items.move_to_end(key)
+        self.hits += 1
+        return item.value
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        size = len(key) + len(value)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        if key in self.items:
+            self._remove(key)
+        self.items[key] = CacheItem(key, value, ttl if ttl is not None else self.ttl, size=size)
+        self.size += size
+        while len(self.items) > self.max_entries or self.size > self.max_bytes:
+            oldest = next(iter(self.items))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        if key in self.items:
+            self._remove(key)
+
+    def clear(self) -> None:
+        self.items.clear()
+        self.size = 0
+
+    def _remove(self, key: str) -> None:
+        item = self.items.pop(key)
+        self.size -= item.size
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.items),
+            "bytes": self.size,
+        }
@@ -1,4 +1,5 @@
-from typing import Optional
+from typing import List, Optional, Tuple
+import asyncio
 import json
 
 class MessageQueue:
@@ -19,3 +20,56 @@ class MessageQueue:
         if message is None:
             return None
         return json.loads(message)
+
+    async def pop_wait(self, queue_name: str, timeout: int = 5) -> Optional[dict]:
+        """Взять сообщение из очереди, подождав его появления до timeout секунд"""
+        message = await self.redis.blpop(queue_name, timeout=timeout)
+        if message is None:
+            return None
+        return json.loads(message)
+
+    async def reserve(self, queue_name: str, processing_name: str, timeout: int = 5) -> Optional[Tuple[dict, str]]:
+        """Взять сообщение, переложив его в список обрабатываемых (BLMOVE).
+
+        Возвращает сообщение и его исходную строку для ack(): пока сообщение
+        не подтверждено, оно лежит в processing_name и не теряется при падении.
+        """
+        message = await self.redis.blmove(queue_name, processing_name, timeout=timeout)
+        if message is None:
+            return None
+        return json.loads(message), message
+
+    async def ack(self, processing_name: str, raw_message: str) -> None:
+        """Подтвердить обработку сообщения, взятого через reserve()"""
+        await self.redis.lrem(processing_name, raw_message)
+
+    async def restore(self, processing_name: str, queue_name: str) -> int:
+        """Вернуть неподтверждённые сообщения в начало очереди в прежнем порядке"""
+        restored = 0
+        while await self.redis.lmove(processing_name, queue_name, "RIGHT", "LEFT") is not None:
+            restored += 1
+        return restored
+
+    async def pop_batch(
+        self, queue_name: str, max_size: int, linger: float = 0.05, timeout: int = 5, poll_interval: float = 0.01
+    ) -> List[dict]:
+        """Взять пачку до max_size сообщений.
+
+        Ждёт первое сообщение до timeout секунд, затем добирает остальные
+        (LPOP с count) ещё не дольше linger секунд - пачка уходит, как только
+        набралась целиком или истекло время ожидания.
+        """
+        first = await self.pop_wait(queue_name, timeout=timeout)
+        if first is None:
+            return []
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + linger
+        while len(batch) < max_size:
+            messages = await self.redis.lpop_many(queue_name, max_size - len(batch))
+            batch.extend(json.loads(m) for m in messages)
+            remaining = deadline - loop.time()
+            if len(batch) >= max_size or remaining <= 0:
+                break
+            await asyncio.sleep(min(poll_interval, remaining))
+        return batch
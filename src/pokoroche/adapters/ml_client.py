@@ -1,10 +1,23 @@
-import re
+import time
+import random
+import secrets
+import asyncio
+from contextvars import ContextVar
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Awaitable, Callable, Optional
 import hashlib
 import aiohttp
 import json
 
+from .ml_batcher import MicroBatcher
+from .circuit_breaker import CircuitBreaker
+from .memory_cache import LRUCache
+from .fallback_scorer import batch_fallback_importance
+from ..domain.services.text_processing import extract_keywords
+
+# Сюда CachedMLClient отмечает, что результат посчитан эвристикой, а не моделью
+_fallback_marks: ContextVar[Optional[list]] = ContextVar("ml_fallback_marks", default=None)
+
 
 class IMLClient(ABC):
     """Интерфейс для взаимодействия с ML сервисом"""
@@ -24,33 +37,196 @@ class IMLClient(ABC):
         """Проверить доступность ML сервиса"""
         pass
 
+    async def start(self) -> None:
+        """Подготовить ресурсы клиента (соединения, процессы); по умолчанию - ничего"""
+
+    async def close(self) -> None:
+        """Освободить ресурсы клиента; по умолчанию - ничего"""
+
+    async def analyze(self, text: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Важность и темы за один вызов (по умолчанию - двумя запросами)"""
+        importance, topics = await asyncio.gather(self.analyze_importance(text, context), self.extract_topics(text))
+        return {"importance": importance, "topics": topics}
+
+    async def batch_analyze_importance(self, texts: List[str]) -> List[float]:
+        """Оценка важности для пачки текстов (по умолчанию - по одному)"""
+        return list(await asyncio.gather(*(self.analyze_importance(text) for text in texts)))
+
+    async def batch_extract_topics(self, texts: List[str]) -> List[List[str]]:
+        """Извлечение тем для пачки текстов (по умолчанию - по одному)"""
+        return list(await asyncio.gather(*(self.extract_topics(text) for text in texts)))
+
 
 class MLClient(IMLClient):
     """Реализация ML клиента"""
 
-    def __init__(self, ml_service_url: str, timeout: int = 30, max_retries: int = 3):
+    def __init__(
+        self,
+        ml_service_url: str,
+        timeout: int = 30,
+        max_retries: int = 3,
+        connection_limit: int = 100,
+        keepalive_timeout: int = 30,
+        dns_cache_ttl: int = 300,
+        batch_size: int = 32,
+        batch_window: float = 0.0,
+        deadline: float = 10.0,
+        backoff_base: float = 0.2,
+        backoff_max: float = 2.0,
+        breaker_threshold: int = 5,
+        breaker_recovery: float = 30.0,
+        on_breaker_state_change=None,
+    ):
         self.ml_service_url = ml_service_url.rstrip("/")
         self.timeout = timeout
         self.max_retries = max_retries
+        self.connection_limit = connection_limit
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        # Общий бюджет времени на один вызов вместе со всеми повторами
+        self.deadline = deadline
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # Если ML сервис лежит, breaker открывается и вызовы сразу уходят в локальную эвристику
+        self.breaker = CircuitBreaker(
+            "ml_service",
+            failure_threshold=breaker_threshold,
+            recovery_timeout=breaker_recovery,
+            on_state_change=on_breaker_state_change,
+        )
+        # Одна долгоживущая сессия на клиент: соединения к ML сервису переиспользуются
+        self.session: Optional[aiohttp.ClientSession] = None
+        # Микробатчинг: одновременные запросы за batch_window секунд уходят одним batch-запросом.
+        # batch_window = 0 - батчинг выключен, каждый текст отправляется отдельно
+        self.importance_batcher: Optional[MicroBatcher] = None
+        self.topics_batcher: Optional[MicroBatcher] = None
+        if batch_window > 0:
+            self.importance_batcher = MicroBatcher(self._importance_batch, batch_size, batch_window)
+            self.topics_batcher = MicroBatcher(self._topics_batch, batch_size, batch_window)
+
+    async def start(self) -> None:
+        """Создать пул соединений к ML сервису"""
+        if self.session is not None and not self.session.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.connection_limit,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.dns_cache_ttl,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+
+    async def close(self) -> None:
+        """Закрыть пул соединений"""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    async def ensure_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            await self.start()
+        return self.session
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Экспоненциальная задержка перед повтором с jitter"""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(delay / 2, delay)
+
+    async def _post_json(self, path: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """POST в ML сервис с повторами. None - если все попытки неудачны или breaker открыт"""
+        if not self.breaker.allow_request():
+            return None
+        # В half_open это пробный запрос: breaker должен узнать его исход, даже если вызов отменят
+        is_probe = self.breaker.state == CircuitBreaker.HALF_OPEN
+        try:
+            return await self._post_with_retries(path, payload)
+        except asyncio.CancelledError:
+            if is_probe:
+                # Отменённую пробу считаем ошибкой: breaker снова открывается и
+                # пропустит следующую пробу через recovery_timeout, а не застрянет в half_open
+                self.breaker.record_failure()
+            raise
+
+    async def _post_with_retries(self, path: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        url = f"{self.ml_service_url}{path}"
+        session = await self.ensure_session()
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + self.deadline
+        for attempt in range(self.max_retries):
+            remaining = deadline_at - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                timeout = aiohttp.ClientTimeout(total=min(self.timeout, remaining))
+                async with session.post(url, json=payload, timeout=timeout) as resp:
+                    resp.raise_for_status()
+                    data = await resp.json()
+                self.breaker.record_success()
+                return data
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                pass
+            if attempt < self.max_retries - 1:
+                delay = self._backoff_delay(attempt)
+                if delay >= deadline_at - loop.time():
+                    break
+                await asyncio.sleep(delay)
+        self.breaker.record_failure()
+        return None
+
+    async def _importance_batch(self, items: List[tuple]) -> List[float]:
+        """Один запрос /importance/batch для пачки (text, context)"""
+        payload = {"texts": [text for text, _ in items], "contexts": [context for _, context in items]}
+        data = await self._post_json("/importance/batch", payload)
+        if data is None:
+            raise RuntimeError("ML batch request failed")
+        return [float(score) for score in data["importances"]]
+
+    async def _topics_batch(self, texts: List[str]) -> List[List[str]]:
+        """Один запрос /topics/batch для пачки текстов"""
+        data = await self._post_json("/topics/batch", {"texts": texts})
+        if data is None:
+            raise RuntimeError("ML batch request failed")
+        return [list(topics) for topics in data["topics"]]
 
     async def analyze_importance(self, text: str, context: Dict[str, Any] = None) -> float:
         """Реализация HTTP запроса к ML сервису для анализа важности"""
-        url = f"{self.ml_service_url}/importance"
+        if self.importance_batcher is not None:
+            try:
+                return await self.importance_batcher.submit((text, context or {}))
+            except Exception:
+                return self._fallback_importance(text)
+
         payload = {"text": text, "context": context or {}}
 
-        for _ in range(self.max_retries):
+        data = await self._post_json("/importance", payload)
+        if data is not None:
             try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(url, json=payload, timeout=self.timeout) as resp:
-                        resp.raise_for_status()
-                        data = await resp.json()
-                        return float(data["importance"])
-            except Exception:
-                continue
+                return float(data["importance"])
+            except (KeyError, TypeError, ValueError):
+                pass
+        return self._fallback_importance(text)
+
+    async def batch_analyze_importance(self, texts: List[str]) -> List[float]:
+        """Оценка важности пачки текстов одним запросом"""
+        if not texts:
+            return []
+        try:
+            return await self._importance_batch([(text, {}) for text in texts])
+        except Exception:
+            return self._fallback_importance_batch(texts)
+
+    def _fallback_importance(self, text: str) -> float:
+        """Эвристика на случай, если ML сервис недоступен"""
         # Если в тексте нечего анализировать, то мы возвращаем 0.0
         if not text:
             return 0.0
         text = text.strip()
+        if not text:
+            return 0.0
         # Берем как один из критериев важности длину текста (считаю текст длины 300 как максимально важный)
         length_score = min(len(text) / 300, 1.0)
         # Дополнительный бонус к важности, который ориентируется на знаки препинания и регистр букв
@@ -67,89 +243,426 @@ class MLClient(IMLClient):
         final_importance = min(urgency_score + length_score, 1.0)
         return final_importance
 
+    def _fallback_importance_batch(self, texts: List[str]) -> List[float]:
+        """Та же эвристика для пачки текстов, векторизованно"""
+        return batch_fallback_importance(texts)
+
     async def extract_topics(self, text: str) -> List[str]:
         """Извлечение списка тем из текста."""
-        url = f"{self.ml_service_url}/topics"
+        if self.topics_batcher is not None:
+            try:
+                return await self.topics_batcher.submit(text)
+            except Exception:
+                return self._fallback_topics(text)
+
         payload = {"text": text}
 
-        for _ in range(self.max_retries):
+        data = await self._post_json("/topics", payload)
+        if data is not None:
             try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(url, json=payload, timeout=self.timeout) as resp:
-                        resp.raise_for_status()
-                        data = await resp.json()
-                        return list(data["topics"])
-            except Exception:
-                continue
-        # Если текст пустой, то возвращаю пустой список
-        if not text:
+                return list(data["topics"])
+            except (KeyError, TypeError):
+                pass
+        return self._fallback_topics(text)
+
+    async def batch_extract_topics(self, texts: List[str]) -> List[List[str]]:
+        """Извлечение тем для пачки текстов одним запросом"""
+        if not texts:
             return []
-        text = text.strip().lower()
-        words = text.split()
-        # Допустимые символы - русские или латинские буквы, цифры, дефис
-        allowed_chars = re.compile(r'[^a-zA-Zа-яА-ЯёЁ0-9-]')
-        unique_words = set()
-        for word in words:
-            # "Очищаю" слово от недопустимых символов
-            cleaned_word = allowed_chars.sub('', word)
-            # Если слово осталось не пустым, то добавляю его в set
-            if cleaned_word:
-                unique_words.add(cleaned_word)
-        topics = []
-        for word in unique_words:
-            # Если длина слова больше 4 (исключаю короткие слова по типу и, на, или и тд), то добавляю в список тем
-            if len(word) > 4:
-                topics.append(word)
-        return topics
+        try:
+            return await self._topics_batch(texts)
+        except Exception:
+            return [self._fallback_topics(text) for text in texts]
+
+    def _fallback_topics(self, text: str) -> List[str]:
+        """Эвристика на случай, если ML сервис недоступен"""
+        # Уникальные слова от 5 символов из text_processing (для пустого текста - пустой список)
+        return extract_keywords(text)
+
+    async def analyze(self, text: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Важность и темы одним запросом /analyze"""
+        data = await self._post_json("/analyze", {"text": text, "context": context or {}})
+        if data is not None:
+            try:
+                return {"importance": float(data["importance"]), "topics": list(data["topics"])}
+            except (KeyError, TypeError, ValueError):
+                pass
+        return {"importance": self._fallback_importance(text), "topics": self._fallback_topics(text)}
 
     async def health_check(self) -> bool:
         """Проверка, доступен ли ML сервер"""
         url = f"{self.ml_service_url}/health"
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, timeout=self.timeout) as resp:
-                    return resp.status == 200
+            session = await self.ensure_session()
+            async with session.get(url) as resp:
+                return resp.status == 200
         except Exception:
             return False
 
+    async def fetch_model_version(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Версия модели из ответа /health; None, если сервис недоступен или её не сообщает"""
+        url = f"{self.ml_service_url}/health"
+        try:
+            session = await self.ensure_session()
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout or self.timeout)) as resp:
+                resp.raise_for_status()
+                data = await resp.json()
+        except Exception:
+            return None
+        version = data.get("model_version") if isinstance(data, dict) else None
+        return str(version) if version else None
+
 
 class CachedMLClient(MLClient):
-    """ML клиент с кешированием результатов в Redis"""
+    """ML клиент с двухуровневым кешем: память процесса (L1), затем Redis (L2)"""
 
     CACHE_TTL = 3600  # Значение будет находиться в кеше CACHE_TTL секунд
+    # Поднимать при изменении предобработки текста (prepare_text), чтобы не отдавать старые оценки
+    NORMALIZATION_VERSION = "1"
+    # Счётчик поколений кеша: его смена переводит все процессы на новое пространство ключей
+    GENERATION_KEY = "ml:cache:generation"
+    # Запрос версии модели не должен надолго задерживать обновление пространства ключей
+    VERSION_FETCH_TIMEOUT = 2.0
 
-    def __init__(self, ml_service_url: str, redis_client, timeout: int = 30, max_retries: int = 3):
-        super().__init__(ml_service_url, timeout, max_retries)
+    def __init__(
+        self,
+        ml_service_url: str,
+        redis_client,
+        timeout: int = 30,
+        max_retries: int = 3,
+        l1_max_entries: int = 10000,
+        l1_max_bytes: int = 16 * 1024 * 1024,
+        l1_ttl: int = 60,
+        distributed_lock: bool = False,
+        lock_ttl: float = 5.0,
+        lock_poll_interval: float = 0.05,
+        model_version: Optional[str] = None,
+        fallback_ttl: int = 60,
+        namespace_refresh_interval: float = 30.0,
+        **kwargs,
+    ):
+        super().__init__(ml_service_url, timeout, max_retries, **kwargs)
         self.redis = redis_client
+        # L1 живёт меньше, чем Redis, чтобы процессы не расходились надолго
+        self.l1 = LRUCache(max_entries=l1_max_entries, max_bytes=l1_max_bytes, ttl=min(l1_ttl, self.CACHE_TTL))
+        self.redis_hits = 0
+        self.redis_misses = 0
+        # Single-flight: одновременные промахи по одному ключу ждут один общий вызов ML
+        self.in_flight: Dict[str, asyncio.Task] = {}
+        self.coalesced = 0
+        # Опционально то же между процессами: короткая блокировка в Redis (SET NX)
+        self.distributed_lock = distributed_lock
+        self.lock_ttl = lock_ttl
+        self.lock_poll_interval = lock_poll_interval
+        # Пространство ключей: версия модели, версия нормализации и поколение кеша.
+        # Версия модели задаётся явно (ModelLoader) или берётся из /health ML сервиса
+        self.model_version = model_version
+        # Последняя версия, полученная из /health: при сбое ML пространство ключей не меняется
+        self.last_model_version: Optional[str] = None
+        self.namespace = self._build_namespace(model_version or "unknown", "0")
+        self.namespace_refresh_interval = namespace_refresh_interval
+        self.namespace_expires_at = 0.0
+        self.namespace_ready = False
+        self.namespace_lock = asyncio.Lock()
+        self.namespace_task: Optional[asyncio.Task] = None
+        # Результаты эвристики кешируем ненадолго, чтобы сбой ML не закреплял плохие оценки
+        self.fallback_ttl = fallback_ttl
+
+    def _build_namespace(self, model_version: str, generation: str) -> str:
+        return f"ml:{model_version}:n{self.NORMALIZATION_VERSION}:g{generation}"
 
     def _generate_cache_key(self, text: str, prefix: str) -> str:
         """Генерируем уникальный ключ для Redis по тексту"""
         text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
-        return f"{prefix}:{text_hash}"
+        return f"{self.namespace}:{prefix}:{text_hash}"
 
-    async def analyze_importance(self, text: str, context: Dict[str, Any] = None) -> float:
-        """Анализ важности с кешированием"""
-        key = self._generate_cache_key(text, "importance")
+    async def _current_model_version(self) -> str:
+        """Версия модели для пространства ключей; если ML недоступен - последняя известная"""
+        if self.model_version:
+            return self.model_version
+        # При открытом breaker в сервис не ходим - как и остальные вызовы
+        if self.breaker.state == CircuitBreaker.CLOSED:
+            version = await self.fetch_model_version(timeout=min(self.VERSION_FETCH_TIMEOUT, self.deadline))
+            if version:
+                self.last_model_version = version
+        return self.last_model_version or "unknown"
+
+    async def refresh_namespace(self) -> str:
+        """Перечитать поколение кеша и версию модели"""
+        generation = await self.redis.get(self.GENERATION_KEY) or "0"
+        namespace = self._build_namespace(await self._current_model_version(), generation)
+        if namespace != self.namespace:
+            # Старые записи L1 больше не нужны; в Redis они истекут сами по TTL
+            self.l1.clear()
+            self.namespace = namespace
+        self.namespace_ready = True
+        self.namespace_expires_at = asyncio.get_running_loop().time() + self.namespace_refresh_interval
+        return namespace
+
+    async def _refresh_namespace_in_background(self) -> None:
+        try:
+            await self.refresh_namespace()
+        except Exception as e:
+            # Логируем ошибку; до следующей попытки работаем в текущем пространстве ключей
+            print(f"Ошибка при обновлении пространства ключей кеша: {e}")
+            self.namespace_expires_at = asyncio.get_running_loop().time() + self.namespace_refresh_interval
+
+    async def _maybe_refresh_namespace(self) -> None:
+        if asyncio.get_running_loop().time() < self.namespace_expires_at:
+            return
+        if self.namespace_ready:
+            # Пространство ключей уже есть - обновляем его в фоне, не задерживая вызовы
+            if self.namespace_task is None or self.namespace_task.done():
+                self.namespace_task = asyncio.ensure_future(self._refresh_namespace_in_background())
+            return
+        # Первый раз ждём, чтобы не писать в кеш под неизвестной версией модели
+        async with self.namespace_lock:
+            if not self.namespace_ready:
+                await self.refresh_namespace()
+
+    async def close(self) -> None:
+        if self.namespace_task is not None and not self.namespace_task.done():
+            self.namespace_task.cancel()
+            try:
+                await self.namespace_task
+            except asyncio.CancelledError:
+                pass
+        self.namespace_task = None
+        await super().close()
 
+    async def invalidate_cache(self) -> str:
+        """Сбросить весь кеш ML результатов: все процессы переходят на новое поколение ключей"""
+        await self.redis.set(self.GENERATION_KEY, str(time.time_ns()))
+        return await self.refresh_namespace()
+
+    def _fallback_importance(self, text: str) -> float:
+        marks = _fallback_marks.get()
+        if marks is not None:
+            marks.append(text)
+        return super()._fallback_importance(text)
+
+    def _fallback_importance_batch(self, texts: List[str]) -> List[float]:
+        marks = _fallback_marks.get()
+        if marks is not None:
+            marks.extend(texts)
+        return super()._fallback_importance_batch(texts)
+
+    def _fallback_topics(self, text: str) -> List[str]:
+        marks = _fallback_marks.get()
+        if marks is not None:
+            marks.append(text)
+        return super()._fallback_topics(text)
+
+    async def _compute_tracked(self, compute: Callable[[], Awaitable[Any]]) -> tuple:
+        """Вызвать ML и узнать, пришлось ли откатиться на эвристику"""
+        marks: list = []
+        token = _fallback_marks.set(marks)
+        try:
+            result = await compute()
+        finally:
+            _fallback_marks.reset(token)
+        return result, bool(marks)
+
+    async def _redis_get(self, key: str) -> Optional[str]:
         cached = await self.redis.get(key)
         if cached:
-            print("CACHE HIT (Redis)")
-            return float(cached)
-        
-        print("CACHE MISS (calling ML)")
-        result = await super().analyze_importance(text, context)
-        await self.redis.set(key, str(result), expire=self.CACHE_TTL)
+            self.redis_hits += 1
+            self.l1.set(key, cached)
+            return cached
+        self.redis_misses += 1
+        return None
+
+    async def _cache_get(self, key: str) -> Optional[str]:
+        """Ищем значение сначала в L1, потом в Redis (с прогревом L1)"""
+        cached = self.l1.get(key)
+        if cached is not None:
+            return cached
+        return await self._redis_get(key)
+
+    def _store_ttl(self, is_fallback: bool) -> int:
+        """TTL записи результата; 0 - не кешировать (эвристика при fallback_ttl <= 0)"""
+        if not is_fallback:
+            return self.CACHE_TTL
+        return max(0, self.fallback_ttl)
+
+    async def _cache_set(self, key: str, value: str, ttl: int = None) -> None:
+        ttl = self.CACHE_TTL if ttl is None else ttl
+        if ttl <= 0:
+            return
+        self.l1.set(key, value, ttl=min(self.l1.ttl, ttl))
+        await self.redis.set(key, value, expire=ttl)
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Попадания и промахи по каждому уровню кеша"""
+        return {
+            "l1": self.l1.get_stats(),
+            "redis": {"hits": self.redis_hits, "misses": self.redis_misses},
+            "coalesced": self.coalesced,
+        }
+
+    async def _single_flight(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        """Один вызов load на ключ; остальные вызывающие ждут его результат"""
+        task = self.in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(load())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        # shield: отмена одного из ждущих не должна отменять общий вызов
+        return await asyncio.shield(task)
+
+    async def _cached(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        encode: Callable[[Any], str],
+        decode: Callable[[str], Any],
+    ) -> Any:
+        # L1 и in_flight проверяются без await между ними: значение кладётся в L1
+        # раньше, чем задача убирается из in_flight, поэтому повторного вызова ML не будет
+        cached = self.l1.get(key)
+        if cached is not None:
+            return decode(cached)
+        return await self._single_flight(key, lambda: self._load(key, compute, encode, decode))
+
+    async def _load(self, key, compute, encode, decode) -> Any:
+        cached = await self._redis_get(key)
+        if cached:
+            return decode(cached)
+        if not self.distributed_lock:
+            return await self._compute_and_store(key, compute, encode)
+
+        lock_key = f"lock:{key}"
+        # Токен владельца: если TTL истёк и блокировку взял другой процесс, чужую не снимаем
+        token = secrets.token_hex(16)
+        if await self.redis.set_if_absent(lock_key, token, expire=max(1, int(self.lock_ttl))):
+            try:
+                return await self._compute_and_store(key, compute, encode)
+            finally:
+                await self.redis.delete_if_equals(lock_key, token)
+
+        # Этот текст уже считает другой процесс - ждём его результат в Redis
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.lock_ttl
+        while loop.time() < deadline:
+            await asyncio.sleep(self.lock_poll_interval)
+            cached = await self.redis.get(key)
+            if cached:
+                self.l1.set(key, cached)
+                return decode(cached)
+        # Не дождались (процесс упал или ML медленный) - считаем сами
+        return await self._compute_and_store(key, compute, encode)
+
+    async def _compute_and_store(self, key, compute, encode) -> Any:
+        result, is_fallback = await self._compute_tracked(compute)
+        await self._cache_set(key, encode(result), self._store_ttl(is_fallback))
         return result
 
+    async def analyze_importance(self, text: str, context: Dict[str, Any] = None) -> float:
+        """Анализ важности с кешированием"""
+        await self._maybe_refresh_namespace()
+        key = self._generate_cache_key(text, "importance")
+        return await self._cached(
+            key,
+            lambda: super(CachedMLClient, self).analyze_importance(text, context),
+            str,
+            float,
+        )
+
     async def extract_topics(self, text: str) -> List[str]:
         """Извлечение тем с кешированием"""
+        await self._maybe_refresh_namespace()
         key = self._generate_cache_key(text, "topics")
+        return await self._cached(
+            key,
+            lambda: super(CachedMLClient, self).extract_topics(text),
+            json.dumps,
+            json.loads,
+        )
 
-        cached = await self.redis.get(key)
-        if cached:
-            return json.loads(cached)
+    async def _cached_batch(
+        self,
+        texts: List[str],
+        prefix: str,
+        compute_batch: Callable[[List[str]], Awaitable[List[Any]]],
+        encode: Callable[[Any], str],
+        decode: Callable[[str], Any],
+    ) -> List[Any]:
+        """Пачка текстов: L1, затем один MGET, промахи - одним batch-вызовом ML, запись - одним pipeline"""
+        await self._maybe_refresh_namespace()
+        keys = [self._generate_cache_key(text, prefix) for text in texts]
+        results: List[Any] = [None] * len(texts)
+        missing = []
+        for i, key in enumerate(keys):
+            cached = self.l1.get(key)
+            if cached is not None:
+                results[i] = decode(cached)
+            else:
+                missing.append(i)
+        if not missing:
+            return results
 
-        result = await super().extract_topics(text)
-        await self.redis.set(key, json.dumps(result), expire=self.CACHE_TTL)
-        return result
+        values = await self.redis.mget([keys[i] for i in missing])
+        misses = []
+        for i, cached in zip(missing, values):
+            if cached:
+                self.redis_hits += 1
+                self.l1.set(keys[i], cached)
+                results[i] = decode(cached)
+            else:
+                self.redis_misses += 1
+                misses.append(i)
+        if not misses:
+            return results
+
+        # Одинаковые тексты внутри пачки отправляем в ML один раз
+        unique = list(dict.fromkeys(texts[i] for i in misses))
+        values, is_fallback = await self._compute_tracked(lambda: compute_batch(unique))
+        computed = dict(zip(unique, values))
+        ttl = self._store_ttl(is_fallback)
+        to_store = {}
+        for i in misses:
+            results[i] = computed[texts[i]]
+            to_store[keys[i]] = encode(results[i])
+        if ttl <= 0:
+            return results
+        for key, value in to_store.items():
+            self.l1.set(key, value, ttl=min(self.l1.ttl, ttl))
+        await self.redis.set_many(to_store, expire=ttl)
+        return results
+
+    async def batch_analyze_importance(self, texts: List[str]) -> List[float]:
+        """Оценка важности пачки текстов с кешированием"""
+        return await self._cached_batch(
+            texts, "importance", super().batch_analyze_importance, str, float
+        )
+
+    async def batch_extract_topics(self, texts: List[str]) -> List[List[str]]:
+        """Извлечение тем для пачки текстов с кешированием"""
+        return await self._cached_batch(
+            texts, "topics", super().batch_extract_topics, json.dumps, json.loads
+        )
+
+    async def analyze(self, text: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Совместный анализ с кешированием (те же ключи, что и у отдельных методов)"""
+        await self._maybe_refresh_namespace()
+        importance_key = self._generate_cache_key(text, "importance")
+        topics_key = self._generate_cache_key(text, "topics")
+
+        cached_importance = await self._cache_get(importance_key)
+        cached_topics = await self._cache_get(topics_key)
+        if cached_importance and cached_topics:
+            return {"importance": float(cached_importance), "topics": json.loads(cached_topics)}
+
+        async def load() -> Dict[str, Any]:
+            result, is_fallback = await self._compute_tracked(
+                lambda: super(CachedMLClient, self).analyze(text, context)
+            )
+            ttl = self._store_ttl(is_fallback)
+            await self._cache_set(importance_key, str(result["importance"]), ttl)
+            await self._cache_set(topics_key, json.dumps(result["topics"]), ttl)
+            return result
+
+        return await self._single_flight(f"analyze:{importance_key}", load)
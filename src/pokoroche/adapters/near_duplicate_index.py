@@ -0,0 +1,119 @@
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+import numpy as np
+
+from ..domain.services.text_processing import tokenize
+
+# Ссылки и упоминания отличаются у каждой копии пересланного текста - в отпечаток их не берём
+_LINKS = re.compile(r"(https?://\S+|www\.\S+|t\.me/\S+|@\w+)", re.IGNORECASE)
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+class NearDuplicateIndex:
+    """Индекс почти одинаковых текстов на MinHash + LSH.
+
+    Текст превращается во множество слов (без ссылок, упоминаний, эмодзи и
+    знаков препинания) и сжимается в MinHash-подпись из num_perm чисел: доля
+    совпавших позиций двух подписей оценивает сходство Жаккара их множеств.
+    Подпись режется на bands полос; кандидаты - записи, совпавшие хотя бы в
+    одной полосе целиком, и только у них считается оценка сходства. Так
+    пересланные копии с другой подписью автора или ссылкой находятся без
+    перебора всех записей. Память ограничена max_entries записями (LRU).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 20000,
+        threshold: float = 0.8,
+        num_perm: int = 64,
+        bands: int = 16,
+        min_tokens: int = 8,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm должно делиться на bands")
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        # У коротких текстов сходство ненадёжно: "ок, спасибо" не должно совпадать со всем подряд
+        self.min_tokens = min_tokens
+        # Параметры хеш-функций фиксированы, чтобы подписи совпадали между процессами и перезапусками
+        rng = np.random.RandomState(1)
+        self.a = rng.randint(1, 1 << 61, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, 1 << 61, size=num_perm, dtype=np.uint64)
+        self.entries: "OrderedDict[int, Tuple[np.ndarray, Any]]" = OrderedDict()
+        self.buckets: Dict[Tuple[int, bytes], Set[int]] = {}
+        self.next_id = 0
+        self.lookups = 0
+        self.hits = 0
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash-подпись текста; None, если слов слишком мало"""
+        words = set(tokenize(_LINKS.sub(" ", text or "")))
+        if len(words) < self.min_tokens:
+            return None
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(w.encode("utf-8"), digest_size=4).digest(), "little") for w in words),
+            dtype=np.uint64,
+            count=len(words),
+        )
+        # Все перестановки разом: строка - слово, столбец - хеш-функция (a*x + b) mod p
+        permuted = (hashes[:, None] * self.a + self.b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def _bands(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def find(self, signature: Optional[np.ndarray]) -> Optional[Any]:
+        """Значение самой похожей записи со сходством не ниже threshold"""
+        self.lookups += 1
+        if signature is None:
+            return None
+        candidates: Set[int] = set()
+        for band in self._bands(signature):
+            candidates |= self.buckets.get(band, set())
+        best_id, best_similarity = None, self.threshold
+        for entry_id in candidates:
+            similarity = float(np.count_nonzero(self.entries[entry_id][0] == signature)) / self.num_perm
+            if similarity >= best_similarity:
+                best_id, best_similarity = entry_id, similarity
+        if best_id is None:
+            return None
+        self.entries.move_to_end(best_id)
+        self.hits += 1
+        return self.entries[best_id][1]
+
+    def add(self, signature: Optional[np.ndarray], value: Any) -> None:
+        if signature is None or self.max_entries <= 0:
+            return
+        entry_id = self.next_id
+        self.next_id += 1
+        self.entries[entry_id] = (signature, value)
+        for band in self._bands(signature):
+            self.buckets.setdefault(band, set()).add(entry_id)
+        while len(self.entries) > self.max_entries:
+            self._evict()
+
+    def _evict(self) -> None:
+        entry_id, (signature, _) = self.entries.popitem(last=False)
+        for band in self._bands(signature):
+            bucket = self.buckets.get(band)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self.buckets[band]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "reuse_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "entries": len(self.entries),
+        }
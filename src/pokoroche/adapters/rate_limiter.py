@@ -0,0 +1,108 @@
+import asyncio
+import time
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """Token bucket: rate токенов в секунду, не больше capacity накопленных"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self) -> float:
+        """Забрать токен и вернуть, сколько секунд нужно подождать до отправки.
+
+        Баланс может уйти в минус - так следующие вызовы встают в очередь
+        за уже зарезервированными, и порядок отправки сохраняется.
+        """
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+    def is_idle(self) -> bool:
+        self._refill(time.monotonic())
+        return self.tokens >= self.capacity
+
+
+class TelegramRateLimiter:
+    """Ограничение исходящих запросов к Telegram: общий лимит и лимит на чат.
+
+    Также хранит паузу из retry_after ответа 429 и собирает метрики времени
+    ожидания в очереди.
+    """
+
+    # После стольких чатов начинаем выкидывать бакеты простаивающих чатов
+    MAX_CHAT_BUCKETS = 10000
+
+    def __init__(self, global_rate: float = 30.0, chat_rate: float = 1.0, chat_burst: float = 3.0):
+        self.global_bucket = TokenBucket(global_rate)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.chat_buckets: Dict[int, TokenBucket] = {}
+        self.paused_until = 0.0
+        self.stats = {
+            "sent": 0,
+            "throttled": 0,
+            "retries": 0,
+            "wait_total": 0.0,
+            "wait_max": 0.0,
+        }
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self.chat_buckets) >= self.MAX_CHAT_BUCKETS:
+                self.chat_buckets = {k: b for k, b in self.chat_buckets.items() if not b.is_idle()}
+            bucket = TokenBucket(self.chat_rate, self.chat_burst)
+            self.chat_buckets[chat_id] = bucket
+        return bucket
+
+    async def acquire(self, chat_id: Optional[int] = None) -> float:
+        """Дождаться разрешения на отправку. Возвращает время ожидания в секундах"""
+        started = time.monotonic()
+
+        pause = self.paused_until - started
+        if pause > 0:
+            await asyncio.sleep(pause)
+
+        if chat_id is not None:
+            delay = self._chat_bucket(chat_id).reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        delay = self.global_bucket.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        waited = time.monotonic() - started
+        self.stats["sent"] += 1
+        self.stats["wait_total"] += waited
+        self.stats["wait_max"] = max(self.stats["wait_max"], waited)
+        if waited > 0.001:
+            self.stats["throttled"] += 1
+        return waited
+
+    def pause(self, retry_after: float) -> None:
+        """Telegram ответил 429: не отправлять ничего retry_after секунд"""
+        self.stats["retries"] += 1
+        self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+    def get_stats(self) -> dict:
+        sent = self.stats["sent"]
+        return {
+            **self.stats,
+            "wait_avg": self.stats["wait_total"] / sent if sent else 0.0,
+            "chats_tracked": len(self.chat_buckets),
+        }
@@ -1,7 +1,15 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, List, Set
 from redis.asyncio import Redis
 
+# Удалить ключ, только если в нём всё ещё наше значение (снятие блокировки владельцем)
+_DELETE_IF_EQUALS = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
 
 class IRedisClient(ABC):
     """Интерфейс для работы с Redis"""
@@ -26,11 +34,51 @@ class IRedisClient(ABC):
         """Установить значение с опциональным временем жизни"""
         pass
     
+    @abstractmethod
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        """Получить значения нескольких ключей одним запросом"""
+        pass
+
+    @abstractmethod
+    async def set_many(self, items: Dict[str, str], expire: int = None) -> bool:
+        """Установить несколько значений одним pipeline"""
+        pass
+
+    @abstractmethod
+    async def set_if_absent(self, key: str, value: str, expire: int = None) -> bool:
+        """Установить значение, только если ключа ещё нет (SET NX)"""
+        pass
+
     @abstractmethod
     async def delete(self, key: str) -> bool:
         """Удалить ключ"""
         pass
 
+    @abstractmethod
+    async def delete_if_equals(self, key: str, value: str) -> bool:
+        """Удалить ключ, только если его значение равно value (атомарно)"""
+        pass
+
+    @abstractmethod
+    async def sadd(self, key: str, *members: str) -> int:
+        """Добавить элементы в множество"""
+        pass
+
+    @abstractmethod
+    async def srem(self, key: str, *members: str) -> int:
+        """Удалить элементы из множества"""
+        pass
+
+    @abstractmethod
+    async def smembers(self, key: str) -> Set[str]:
+        """Получить все элементы множества"""
+        pass
+
+    @abstractmethod
+    async def sunion(self, keys: List[str]) -> Set[str]:
+        """Объединение нескольких множеств одним запросом"""
+        pass
+
     @abstractmethod
     async def rpush(self, key: str, value: str) -> int:
         """Добавить элемент в конец очереди"""
@@ -41,11 +89,36 @@ class IRedisClient(ABC):
         """Взять элемент из начала очереди"""
         pass
     
+    @abstractmethod
+    async def lpop_many(self, key: str, count: int) -> List[str]:
+        """Взять до count элементов из начала очереди одним запросом"""
+        pass
+
     @abstractmethod
     async def llen(self, key: str) -> int:
         """Получить размер очереди (количество элементов)"""
         pass
 
+    @abstractmethod
+    async def blpop(self, key: str, timeout: int = 0) -> Optional[str]:
+        """Взять элемент из начала очереди, подождав до timeout секунд"""
+        pass
+
+    @abstractmethod
+    async def lmove(self, source: str, destination: str, src: str = "LEFT", dest: str = "RIGHT") -> Optional[str]:
+        """Атомарно переложить элемент из одной очереди в другую"""
+        pass
+
+    @abstractmethod
+    async def blmove(self, source: str, destination: str, timeout: int = 0) -> Optional[str]:
+        """Переложить элемент из начала source в конец destination, подождав до timeout секунд"""
+        pass
+
+    @abstractmethod
+    async def lrem(self, key: str, value: str, count: int = 1) -> int:
+        """Удалить из очереди до count элементов, равных value"""
+        pass
+
 class RedisClient(IRedisClient):
     """Реализация Redis клиента"""
     
@@ -83,13 +156,69 @@ class RedisClient(IRedisClient):
         result = await self.redis.set(key, value, ex=expire)
         return bool(result)
 
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        """Получение значений нескольких ключей одним MGET."""
+        self._check_connection()
+        if not keys:
+            return []
+        return await self.redis.mget(keys)
+
+    async def set_many(self, items: Dict[str, str], expire: int = None) -> bool:
+        """Установка нескольких значений одним pipeline (SET ... EX на каждый ключ)."""
+        self._check_connection()
+        if not items:
+            return True
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.set(key, value, ex=expire)
+            results = await pipe.execute()
+        return all(results)
+
+    async def set_if_absent(self, key: str, value: str, expire: int = None) -> bool:
+        """Установка значения, только если ключа ещё нет (SET NX)."""
+        self._check_connection()
+        result = await self.redis.set(key, value, ex=expire, nx=True)
+        return bool(result)
+
     async def delete(self, key: str) -> bool:
         """Удаление элемента по ключу."""
         self._check_connection()
         
         removed = await self.redis.delete(key)
         return removed > 0
+
+    async def delete_if_equals(self, key: str, value: str) -> bool:
+        """Удаление ключа, только если его значение равно value (Lua: сравнение и DEL атомарно)."""
+        self._check_connection()
+        removed = await self.redis.eval(_DELETE_IF_EQUALS, 1, key, value)
+        return bool(removed)
     
+    async def sadd(self, key: str, *members: str) -> int:
+        """Добавить элементы в множество"""
+        self._check_connection()
+        if not members:
+            return 0
+        return await self.redis.sadd(key, *members)
+
+    async def srem(self, key: str, *members: str) -> int:
+        """Удалить элементы из множества"""
+        self._check_connection()
+        if not members:
+            return 0
+        return await self.redis.srem(key, *members)
+
+    async def smembers(self, key: str) -> Set[str]:
+        """Получить все элементы множества"""
+        self._check_connection()
+        return set(await self.redis.smembers(key))
+
+    async def sunion(self, keys: List[str]) -> Set[str]:
+        """Объединение нескольких множеств одним запросом"""
+        self._check_connection()
+        if not keys:
+            return set()
+        return set(await self.redis.sunion(keys))
+
     async def rpush(self, key: str, value: str) -> int:
         """Добавить элемент в конец очереди"""
         self._check_connection()
@@ -100,7 +229,37 @@ class RedisClient(IRedisClient):
         self._check_connection()
         return await self.redis.lpop(key)
     
+    async def lpop_many(self, key: str, count: int) -> List[str]:
+        """Взять до count элементов из начала очереди одним запросом"""
+        self._check_connection()
+        # LPOP с count (Redis 6.2+); пустая очередь - None
+        return list(await self.redis.lpop(key, count) or [])
+
     async def llen(self, key: str) -> int:
         """Получить размер очереди (количество элементов)"""
         self._check_connection()
-        return await self.redis.llen(key)
\ No newline at end of file
+        return await self.redis.llen(key)
+
+    async def blpop(self, key: str, timeout: int = 0) -> Optional[str]:
+        """Взять элемент из начала очереди, подождав до timeout секунд"""
+        self._check_connection()
+        result = await self.redis.blpop([key], timeout=timeout)
+        if result is None:
+            return None
+        return result[1]
+
+    async def lmove(self, source: str, destination: str, src: str = "LEFT", dest: str = "RIGHT") -> Optional[str]:
+        """Атомарно переложить элемент из одной очереди в другую"""
+        self._check_connection()
+        # LMOVE/BLMOVE - Redis 6.2+
+        return await self.redis.lmove(source, destination, src, dest)
+
+    async def blmove(self, source: str, destination: str, timeout: int = 0) -> Optional[str]:
+        """Переложить элемент из начала source в конец destination, подождав до timeout секунд"""
+        self._check_connection()
+        return await self.redis.blmove(source, destination, timeout, "LEFT", "RIGHT")
+
+    async def lrem(self, key: str, value: str, count: int = 1) -> int:
+        """Удалить из очереди до count элементов, равных value"""
+        self._check_connection()
+        return await self.redis.lrem(key, count, value)
@@ -0,0 +1,108 @@
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from ..domain.services.text_processing import normalize_topic
+from .redis_client import IRedisClient
+
+
+class SubscriptionIndex:
+    """Обратный индекс подписок: тема -> telegram id подписчиков.
+
+    Хранится в Redis множествами (по одному на тему) и зеркалится в памяти
+    процесса, поэтому подписчики тем сообщения находятся за O(число тем),
+    без просмотра настроек всех пользователей. Темы приводятся к тому же
+    виду, что и темы сообщений (normalize_topic).
+
+    Зеркало обновляет только свой процесс; изменения из других процессов
+    подтягиваются через load() или читаются напрямую из Redis (fetch_subscribers).
+    """
+
+    def __init__(self, redis_client: Optional[IRedisClient] = None, prefix: str = "subscriptions"):
+        self.redis = redis_client
+        self.prefix = prefix
+        # Множество всех тем, на которые кто-то подписан - чтобы восстановить зеркало
+        self.topics_key = f"{prefix}:topics"
+        self.mirror: Dict[str, Set[int]] = defaultdict(set)
+        # Разные подписки могут дать одну тему ("C++" и "C#" -> "c"): пользователь
+        # остаётся подписчиком темы, пока у него есть хоть одна такая подписка
+        self.sources: Dict[Tuple[int, str], Set[str]] = defaultdict(set)
+
+    def _topic_key(self, topic: str) -> str:
+        return f"{self.prefix}:topic:{topic}"
+
+    def _sources_key(self, user_id: int, topic: str) -> str:
+        return f"{self.prefix}:sources:{topic}:{user_id}"
+
+    @staticmethod
+    def _source(topic: str) -> str:
+        # Подписка в том виде, в каком её сравнивает SubscribeCommand
+        return " ".join((topic or "").strip().lower().split())
+
+    async def add(self, user_id: int, topic: str) -> None:
+        key = normalize_topic(topic)
+        if not key:
+            return
+        user_id = int(user_id)
+        self.sources[(user_id, key)].add(self._source(topic))
+        self.mirror[key].add(user_id)
+        if self.redis is not None:
+            await self.redis.sadd(self._sources_key(user_id, key), self._source(topic))
+            await self.redis.sadd(self._topic_key(key), str(user_id))
+            await self.redis.sadd(self.topics_key, key)
+
+    async def remove(self, user_id: int, topic: str) -> None:
+        key = normalize_topic(topic)
+        if not key:
+            return
+        user_id = int(user_id)
+        sources = self.sources.get((user_id, key), set())
+        sources.discard(self._source(topic))
+        if self.redis is not None:
+            # Остальные подписки могли добавить другие процессы - считаем по Redis
+            await self.redis.srem(self._sources_key(user_id, key), self._source(topic))
+            still_subscribed = bool(await self.redis.smembers(self._sources_key(user_id, key)))
+        else:
+            still_subscribed = bool(sources)
+        if still_subscribed:
+            return
+        self.sources.pop((user_id, key), None)
+        subscribers = self.mirror.get(key)
+        if subscribers is not None:
+            subscribers.discard(user_id)
+            if not subscribers:
+                del self.mirror[key]
+        if self.redis is not None:
+            await self.redis.srem(self._topic_key(key), str(user_id))
+            if not await self.redis.smembers(self._topic_key(key)):
+                await self.redis.srem(self.topics_key, key)
+
+    def subscribers(self, topics: Iterable[str]) -> Set[int]:
+        """Подписчики любой из тем - из зеркала в памяти"""
+        result: Set[int] = set()
+        for topic in topics:
+            result |= self.mirror.get(normalize_topic(topic), set())
+        return result
+
+    async def fetch_subscribers(self, topics: Iterable[str]) -> Set[int]:
+        """То же, но из Redis одним SUNION (с учётом подписок из других процессов)"""
+        if self.redis is None:
+            return self.subscribers(topics)
+        keys = [self._topic_key(t) for t in {normalize_topic(t) for t in topics} if t]
+        return {int(user_id) for user_id in await self.redis.sunion(keys)}
+
+    async def load(self) -> None:
+        """Пересобрать зеркало из Redis"""
+        if self.redis is None:
+            return
+        mirror: Dict[str, Set[int]] = defaultdict(set)
+        for topic in await self.redis.smembers(self.topics_key):
+            members = await self.redis.smembers(self._topic_key(topic))
+            if members:
+                mirror[topic] = {int(user_id) for user_id in members}
+        self.mirror = mirror
+
+    async def rebuild(self, subscriptions: Iterable[Tuple[int, Iterable[str]]]) -> None:
+        """Заполнить индекс по уже существующим подпискам (user_id, темы из settings)"""
+        for user_id, topics in subscriptions:
+            for topic in topics:
+                await self.add(user_id, topic)
@@ -1,8 +1,45 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Awaitable, Callable
 import aiohttp
 import asyncio
 
+from .update_dispatcher import UpdateDispatcher
+from .telegram_webhook import TelegramWebhookServer
+from .rate_limiter import TelegramRateLimiter
+from .update_offset_store import UpdateOffsetStore
+from .update_queue import RedisUpdateQueue
+
+MAX_MESSAGE_LENGTH = 4096
+GET_UPDATES_LIMIT = 100
+
+# Методы, которые пишут в чат и попадают под flood-лимиты Telegram
+RATE_LIMITED_METHODS = {"sendMessage", "editMessageText", "editMessageReplyMarkup"}
+
+
+def split_message(text: str, max_len: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """Разбить текст на части не длиннее max_len за один проход.
+
+    Режем по границе абзаца, если её нет - по переводу строки, и только
+    в крайнем случае посреди строки.
+    """
+    parts: List[str] = []
+    start = 0
+    n = len(text)
+    while n - start > max_len:
+        end = start + max_len
+        cut = text.rfind("\n\n", start, end)
+        if cut <= start:
+            cut = text.rfind("\n", start, end)
+        if cut <= start:
+            cut = end
+        parts.append(text[start:cut])
+        start = cut
+        while start < n and text[start] == "\n":
+            start += 1
+    if start < n or not parts:
+        parts.append(text[start:])
+    return parts
+
 
 class ITelegramBot(ABC):
     @abstractmethod
@@ -18,7 +55,7 @@ class ITelegramBot(ABC):
         pass
 
     @abstractmethod
-    async def send_digest(self, user_id: int, digest_content: str) -> bool:
+    async def send_digest(self, user_id: int, digest_content: str, digest_id: Optional[int] = None) -> bool:
         pass
 
     @abstractmethod
@@ -31,14 +68,47 @@ class ITelegramBot(ABC):
 
 
 class TelegramBot(ITelegramBot):
-    def __init__(self, bot_token: str):
+    def __init__(
+        self,
+        bot_token: str,
+        workers: int = 8,
+        queue_size: int = 100,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        max_send_retries: int = 5,
+        offset_store: Optional[UpdateOffsetStore] = None,
+        shutdown_timeout: float = 30.0,
+        update_queue: Optional[RedisUpdateQueue] = None,
+        api_base_url: str = "https://api.telegram.org",
+    ):
         self.bot_token = bot_token
+        # Можно направить на локальную заглушку Bot API (telegram_mock)
+        self.api_base_url = api_base_url.rstrip("/")
         self.is_running = False
         self.session: Optional[aiohttp.ClientSession] = None
         self.handlers: Dict[str, Any] = {}
         self.update_offset: int = 0
         self.message_handler = None
         self.feedback_handler = None
+        self.dispatcher = UpdateDispatcher(self.handle_update, workers=workers, queue_size=queue_size)
+        self.webhook_server: Optional[TelegramWebhookServer] = None
+        self.rate_limiter = TelegramRateLimiter(global_rate=global_rate, chat_rate=chat_rate)
+        self.max_send_retries = max_send_retries
+        self.offset_store = offset_store
+        # update_id, которые уже отданы воркерам, но ещё не обработаны
+        self.in_flight: set = set()
+        # Апдейты до этого id могли быть обработаны до рестарта - их сверяем с Redis
+        self.resume_max_seen: int = 0
+        self.max_seen: int = 0
+        # Сколько секунд stop() ждёт завершения обработчиков и отправок
+        self.shutdown_timeout = shutdown_timeout
+        self.pending_sends = 0
+        self.sends_idle = asyncio.Event()
+        self.sends_idle.set()
+        # Если задана очередь, бот только публикует апдейты для воркер-процессов
+        self.update_queue = update_queue
+        # Вызывается с update_id после обработки апдейта (подтверждение в очереди воркера)
+        self.on_update_done: Optional[Callable[[int], Awaitable[None]]] = None
 
     def register_handler(self, command: str, handler) -> None:
         self.handlers[command] = handler
@@ -50,42 +120,191 @@ class TelegramBot(ITelegramBot):
         self.feedback_handler = handler
 
     def api_url(self, method: str) -> str:
-        return f"https://api.telegram.org/bot{self.bot_token}/{method}"
+        return f"{self.api_base_url}/bot{self.bot_token}/{method}"
 
     async def ensure_session(self):
         if self.session is None or self.session.closed:
             self.session = aiohttp.ClientSession()
         return self.session
 
-    async def post(self, method: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    async def _request(self, method: str, payload: Dict[str, Any]) -> Dict[str, Any]:
         session = await self.ensure_session()
         async with session.post(self.api_url(method), json=payload) as response:
             return await response.json(content_type=None)
 
+    @staticmethod
+    def _retry_after(data: Dict[str, Any]) -> Optional[float]:
+        if data.get("ok") is True or data.get("error_code") != 429:
+            return None
+        params = data.get("parameters") if isinstance(data.get("parameters"), dict) else {}
+        retry_after = params.get("retry_after")
+        return float(retry_after) if isinstance(retry_after, (int, float)) else 1.0
+
+    async def post(self, method: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if method not in RATE_LIMITED_METHODS:
+            return await self._request(method, payload)
+
+        chat_id = payload.get("chat_id")
+        chat_id = chat_id if isinstance(chat_id, int) else None
+        data: Dict[str, Any] = {}
+        self.pending_sends += 1
+        self.sends_idle.clear()
+        try:
+            for attempt in range(self.max_send_retries + 1):
+                await self.rate_limiter.acquire(chat_id)
+                data = await self._request(method, payload)
+                retry_after = self._retry_after(data)
+                if retry_after is None or attempt == self.max_send_retries:
+                    break
+                # Telegram просит подождать - ставим отправку обратно в очередь, а не теряем её
+                print(f"{method}: flood limit, повтор через {retry_after} с")
+                self.rate_limiter.pause(retry_after)
+        finally:
+            self.pending_sends -= 1
+            if self.pending_sends == 0:
+                self.sends_idle.set()
+        return data
+
     async def answer_callback_query(self, callback_query_id: str, **kwargs) -> bool:
         payload = {"callback_query_id": callback_query_id, **kwargs}
         data = await self.post("answerCallbackQuery", payload)
         return data.get("ok") is True
 
+    async def process_update(self, upd: Dict[str, Any]) -> None:
+        """Обработать один апдейт: callback, команду или обычное сообщение"""
+        if self.update_queue is not None:
+            await self.update_queue.publish(upd)
+            return
+
+        cb = upd.get("callback_query")
+        if isinstance(cb, dict):
+            if self.feedback_handler is not None:
+                await self.feedback_handler(cb)
+            cb_id = cb.get("id")
+            if isinstance(cb_id, str):
+                await self.answer_callback_query(cb_id)
+            return
+
+        msg = upd.get("message")
+        if not isinstance(msg, dict):
+            return
+
+        text = msg.get("text") or ""
+        chat = msg.get("chat") if isinstance(msg.get("chat"), dict) else {}
+        from_user = msg.get("from") if isinstance(msg.get("from"), dict) else {}
+
+        chat_id = chat.get("id")
+        user_id = from_user.get("id")
+
+        if not isinstance(chat_id, int) or not isinstance(user_id, int):
+            return
+
+        if isinstance(text, str) and text.startswith("/"):
+            command = text.split()[0].split("@")[0]
+            handler = self.handlers.get(command)
+            if handler is None:
+                return
+            reply = await handler(user_id, msg)
+            if isinstance(reply, str) and reply:
+                await self.send_message(chat_id, reply)
+        else:
+            if self.message_handler is not None and isinstance(text, str) and text.strip():
+                await self.message_handler(user_id, chat_id, text, msg)
+
+    async def handle_update(self, upd: Dict[str, Any]) -> None:
+        """Обработка апдейта воркером с отметкой о завершении"""
+        upd_id = upd.get("update_id")
+        cancelled = False
+        try:
+            await self.process_update(upd)
+        except asyncio.CancelledError:
+            # Прерван при остановке: остаётся в in_flight и после рестарта обработается заново
+            cancelled = True
+            raise
+        finally:
+            if not cancelled and isinstance(upd_id, int):
+                self.in_flight.discard(upd_id)
+                if self.offset_store is not None:
+                    try:
+                        await self.offset_store.mark_processed(upd_id)
+                    except Exception as e:
+                        print("mark_processed error:", e)
+                if self.on_update_done is not None:
+                    await self.on_update_done(upd_id)
+
+    async def enqueue_update(self, upd: Dict[str, Any], wait: bool = True) -> bool:
+        """Передать апдейт воркерам, пропустив уже обработанные до рестарта.
+
+        wait=False (вебхук) - не ждать места в очереди диспетчера: при заполненной
+        очереди апдейт отбрасывается, а повторные доставки Telegram отсекаются по
+        обрабатываемым и уже обработанным update_id. Возвращает True, если апдейт
+        поставлен в очередь.
+        """
+        upd_id = upd.get("update_id")
+        if isinstance(upd_id, int):
+            if not wait and upd_id in self.in_flight:
+                return False
+            if self.offset_store is not None and (upd_id <= self.resume_max_seen or not wait):
+                if await self.offset_store.is_processed(upd_id):
+                    return False
+            self.max_seen = max(self.max_seen, upd_id)
+            self.in_flight.add(upd_id)
+        if wait:
+            await self.dispatcher.dispatch(upd)
+            return True
+        if self.dispatcher.try_dispatch(upd):
+            return True
+        print(f"Очередь обработки заполнена, апдейт {upd_id} отброшен")
+        if isinstance(upd_id, int):
+            self.in_flight.discard(upd_id)
+        return False
+
+    def safe_offset(self) -> int:
+        """Offset, с которого можно продолжить без потери необработанных апдейтов"""
+        if self.in_flight:
+            return min(self.in_flight)
+        return self.update_offset
+
+    async def checkpoint(self) -> None:
+        if self.offset_store is None:
+            return
+        try:
+            await self.offset_store.save(self.safe_offset(), self.max_seen)
+        except Exception as e:
+            print("offset checkpoint error:", e)
+
     async def start(self) -> None:
         await self.ensure_session()
-        await self.post("deleteWebhook", {"drop_pending_updates": True})
+        if self.offset_store is not None:
+            # Продолжаем с сохранённого offset, накопившиеся апдейты не выбрасываем
+            self.update_offset, self.resume_max_seen = await self.offset_store.load()
+            self.max_seen = self.resume_max_seen
+            print(f"Продолжаем с update_offset={self.update_offset}")
+        await self.post("deleteWebhook", {"drop_pending_updates": self.offset_store is None})
         await self.setup_commands()
         self.is_running = True
+        self.dispatcher.start()
 
         print(f"Зарегистрированные команды: {list(self.handlers.keys())}")
         print(f"Обработчик /subscribe: {self.handlers.get('/subscribe')}")
 
+        backlog = False
         while self.is_running:
             try:
                 data = await self.post(
                     "getUpdates",
                     {
                         "offset": self.update_offset,
-                        "timeout": 25,
+                        # Пока разбираем накопившийся хвост, не ждём long polling
+                        "timeout": 0 if backlog else 25,
+                        "limit": GET_UPDATES_LIMIT,
                         "allowed_updates": ["message", "callback_query"],
                     },
                 )
+                if not self.is_running:
+                    # Остановка во время long polling: offset не сдвигаем,
+                    # эти апдейты Telegram отдаст следующему запуску
+                    break
                 if data.get("ok") is not True:
                     print("getUpdates error:", data)
                     await asyncio.sleep(1)
@@ -96,52 +315,80 @@ class TelegramBot(ITelegramBot):
                     upd_id = upd.get("update_id")
                     if isinstance(upd_id, int):
                         self.update_offset = upd_id + 1
-
-                    cb = upd.get("callback_query")
-                    if isinstance(cb, dict):
-                        if self.feedback_handler is not None:
-                            await self.feedback_handler(cb)
-                        cb_id = cb.get("id")
-                        if isinstance(cb_id, str):
-                            await self.answer_callback_query(cb_id)
-                        continue
-
-                    msg = upd.get("message")
-                    if not isinstance(msg, dict):
-                        continue
-
-                    text = msg.get("text") or ""
-                    chat = msg.get("chat") if isinstance(msg.get("chat"), dict) else {}
-                    from_user = msg.get("from") if isinstance(msg.get("from"), dict) else {}
-
-                    chat_id = chat.get("id")
-                    user_id = from_user.get("id")
-
-                    if not isinstance(chat_id, int) or not isinstance(user_id, int):
-                        continue
-
-                    if isinstance(text, str) and text.startswith("/"):
-                        command = text.split()[0].split("@")[0]
-                        handler = self.handlers.get(command)
-                        if handler is None:
-                            continue
-                        reply = await handler(user_id, msg)
-                        if isinstance(reply, str) and reply:
-                            await self.send_message(chat_id, reply)
-                    else:
-                        if self.message_handler is not None and isinstance(text, str) and text.strip():
-                            await self.message_handler(user_id, chat_id, text, msg)
+                    # Обработка идёт в воркерах; если их очереди заполнены, здесь ждём
+                    await self.enqueue_update(upd)
+                backlog = len(updates) >= GET_UPDATES_LIMIT
+                await self.checkpoint()
 
             except asyncio.CancelledError:
                 break
             except Exception:
+                if not self.is_running:
+                    break
                 import traceback
 
                 traceback.print_exc()
                 await asyncio.sleep(1)
 
+    async def start_webhook(
+        self,
+        webhook_url: str,
+        secret_token: Optional[str] = None,
+        host: str = "0.0.0.0",
+        port: int = 8080,
+        path: str = "/webhook",
+    ) -> None:
+        """Запуск в режиме вебхука вместо long polling"""
+        await self.ensure_session()
+        self.webhook_server = TelegramWebhookServer(self, secret_token=secret_token, path=path, host=host, port=port)
+        self.dispatcher.start()
+        await self.webhook_server.start()
+
+        payload: Dict[str, Any] = {"url": webhook_url, "allowed_updates": ["message", "callback_query"]}
+        if secret_token:
+            payload["secret_token"] = secret_token
+        data = await self.post("setWebhook", payload)
+        if data.get("ok") is not True:
+            print("setWebhook error:", data)
+        await self.setup_commands()
+        self.is_running = True
+
+        while self.is_running:
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                break
+
+    async def drain(self, timeout: float) -> bool:
+        """Дождаться обработки поставленных апдейтов и исходящих отправок"""
+        async def wait_all():
+            await self.dispatcher.join()
+            await self.sends_idle.wait()
+
+        try:
+            await asyncio.wait_for(wait_all(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
     async def stop(self) -> None:
+        # 1) Больше не принимаем апдейты
         self.is_running = False
+        if self.webhook_server is not None:
+            await self.webhook_server.stop()
+            self.webhook_server = None
+
+        # 2) Даём обработчикам и отправкам закончиться, пока сессия ещё открыта
+        drained = await self.drain(self.shutdown_timeout)
+        if not drained:
+            print(
+                f"Остановка: не успели за {self.shutdown_timeout} с, "
+                f"в очереди {self.dispatcher.pending()}, отправок {self.pending_sends}"
+            )
+        await self.dispatcher.stop()
+        await self.checkpoint()
+
+        # 3) Только теперь закрываем HTTP сессию
         if self.session and not self.session.closed:
             await self.session.close()
         self.session = None
@@ -153,48 +400,27 @@ class TelegramBot(ITelegramBot):
             print("sendMessage error:", data)
         return data.get("ok") is True
 
-    async def send_digest(self, user_id: int, digest_content: str) -> bool:
+    async def send_digest(self, user_id: int, digest_content: str, digest_id: Optional[int] = None) -> bool:
         header = "📃 Дайджест за 24 часа\n\n"
-        full_text = header + (digest_content or "")
-        max_len = 4096
-
-        parts = []
-        while full_text:
-            parts.append(full_text[:max_len])
-            full_text = full_text[max_len:]
+        parts = split_message(header + (digest_content or ""))
 
-        last_message_id: Optional[int] = None
+        for part in parts[:-1]:
+            ok = await self.send_message(user_id, part)
+            if not ok:
+                return False
 
-        for i, part in enumerate(parts):
-            if i == len(parts) - 1:
-                data = await self.post("sendMessage", {"chat_id": user_id, "text": part})
-                if data.get("ok") is not True:
-                    print("sendMessage error:", data)
-                    return False
-                result = data.get("result") or {}
-                mid = result.get("message_id")
-                if isinstance(mid, int):
-                    last_message_id = mid
-            else:
-                ok = await self.send_message(user_id, part)
-                if not ok:
-                    return False
-
-        if last_message_id is not None:
-            reply_markup = {
+        # Клавиатура для оценки уходит вместе с последней частью, без отдельного editMessageReplyMarkup
+        kwargs: Dict[str, Any] = {}
+        if digest_id is not None:
+            kwargs["reply_markup"] = {
                 "inline_keyboard": [
                     [
-                        {"text": "👍", "callback_data": f"feedback:{last_message_id}:1"},
-                        {"text": "👎", "callback_data": f"feedback:{last_message_id}:0"},
+                        {"text": "👍", "callback_data": f"feedback:{digest_id}:1"},
+                        {"text": "👎", "callback_data": f"feedback:{digest_id}:0"},
                     ]
                 ]
             }
-            await self.post(
-                "editMessageReplyMarkup",
-                {"chat_id": user_id, "message_id": last_message_id, "reply_markup": reply_markup},
-            )
-
-        return True
+        return await self.send_message(user_id, parts[-1], **kwargs)
 
     async def setup_commands(self) -> None:
         commands = [
@@ -206,8 +432,5 @@ class TelegramBot(ITelegramBot):
         ]
         data = await self.post("setMyCommands", {"commands": commands})
         if data.get("ok") is not True:
-<<<<<<< HEAD
             print("setMyCommands error:", data)
-=======
-            print("setMyCommands error:", data)
->>>>>>> dea9d23ace1ae033e25d20924634a8b2728cad0a
+
@@ -0,0 +1,61 @@
+import hmac
+from typing import Optional
+
+from aiohttp import web
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class TelegramWebhookServer:
+    """Встроенный HTTP сервер, принимающий апдейты от Telegram по вебхуку.
+
+    Апдейт ставится в очередь диспетчера бота без ожидания места в ней, и Telegram
+    сразу получает 200, не дожидаясь обработчиков. Повторные доставки и апдейты,
+    не поместившиеся в заполненную очередь, отбрасываются (см. enqueue_update).
+    Локально сервер можно проверить, отправив POST с записанным апдейтом на host:port/path.
+    """
+
+    def __init__(self, bot, secret_token: Optional[str] = None, path: str = "/webhook",
+                 host: str = "0.0.0.0", port: int = 8080):
+        self.bot = bot
+        self.secret_token = secret_token
+        self.path = path
+        self.host = host
+        self.port = port
+        self.runner: Optional[web.AppRunner] = None
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(self.path, self.handle_update)
+        return app
+
+    def _check_secret(self, request: web.Request) -> bool:
+        if not self.secret_token:
+            return True
+        received = request.headers.get(SECRET_HEADER, "")
+        return hmac.compare_digest(received.encode("utf-8"), self.secret_token.encode("utf-8"))
+
+    async def handle_update(self, request: web.Request) -> web.Response:
+        if not self._check_secret(request):
+            return web.Response(status=401)
+        try:
+            update = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+        if not isinstance(update, dict):
+            return web.Response(status=400)
+
+        await self.bot.enqueue_update(update, wait=False)
+        return web.Response(status=200)
+
+    async def start(self) -> None:
+        self.runner = web.AppRunner(self.make_app())
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        print(f"Webhook сервер слушает {self.host}:{self.port}{self.path}")
+
+    async def stop(self) -> None:
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
@@ -0,0 +1,114 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+def extract_chat_id(update: Dict[str, Any]) -> Optional[int]:
+    """Достать chat_id из апдейта (message или callback_query)"""
+    msg = update.get("message")
+    cb = update.get("callback_query")
+    if isinstance(cb, dict):
+        msg = cb.get("message")
+        if not isinstance(msg, dict):
+            from_user = cb.get("from") if isinstance(cb.get("from"), dict) else {}
+            user_id = from_user.get("id")
+            return user_id if isinstance(user_id, int) else None
+    if not isinstance(msg, dict):
+        return None
+    chat = msg.get("chat") if isinstance(msg.get("chat"), dict) else {}
+    chat_id = chat.get("id")
+    return chat_id if isinstance(chat_id, int) else None
+
+
+class UpdateDispatcher:
+    """Раздача апдейтов пулу воркеров с сохранением порядка внутри одного чата.
+
+    Каждый воркер владеет своей ограниченной очередью, а чат всегда попадает
+    в одну и ту же очередь (chat_id % workers). Поэтому сообщения одного чата
+    обрабатываются строго по порядку, а разные чаты - параллельно.
+    Когда очередь заполнена, dispatch() ждёт освобождения места (backpressure),
+    а try_dispatch() сразу возвращает False.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Dict[str, Any]], Awaitable[None]],
+        workers: int = 8,
+        queue_size: int = 100,
+    ):
+        if workers < 1:
+            raise ValueError("workers must be positive")
+        if queue_size < 1:
+            raise ValueError("queue_size must be positive")
+        self.handler = handler
+        self.workers = workers
+        self.queue_size = queue_size
+        self.queues: List[asyncio.Queue] = []
+        self.tasks: List[asyncio.Task] = []
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self.tasks)
+
+    def start(self) -> None:
+        if self.tasks:
+            return
+        self.queues = [asyncio.Queue(maxsize=self.queue_size) for _ in range(self.workers)]
+        self.tasks = [
+            asyncio.create_task(self._worker(queue), name=f"update-worker-{i}")
+            for i, queue in enumerate(self.queues)
+        ]
+
+    def _queue_for(self, update: Dict[str, Any]) -> asyncio.Queue:
+        chat_id = extract_chat_id(update)
+        if chat_id is None:
+            # Апдейт без чата ни с чем не упорядочиваем - кладём по update_id
+            upd_id = update.get("update_id")
+            chat_id = upd_id if isinstance(upd_id, int) else 0
+        return self.queues[chat_id % self.workers]
+
+    async def dispatch(self, update: Dict[str, Any]) -> None:
+        """Поставить апдейт в очередь его чата (ждёт, если очередь заполнена)"""
+        if not self.tasks:
+            self.start()
+        await self._queue_for(update).put(update)
+
+    def try_dispatch(self, update: Dict[str, Any]) -> bool:
+        """Поставить апдейт в очередь его чата без ожидания; False, если очередь заполнена"""
+        if not self.tasks:
+            self.start()
+        try:
+            self._queue_for(update).put_nowait(update)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    def pending(self) -> int:
+        """Сколько апдейтов ждут обработки во всех очередях"""
+        return sum(queue.qsize() for queue in self.queues)
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            update = await queue.get()
+            try:
+                await self.handler(update)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                import traceback
+
+                traceback.print_exc()
+            finally:
+                queue.task_done()
+
+    async def join(self) -> None:
+        """Дождаться обработки всех уже поставленных апдейтов"""
+        for queue in self.queues:
+            await queue.join()
+
+    async def stop(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        self.queues = []
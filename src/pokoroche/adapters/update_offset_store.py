@@ -0,0 +1,42 @@
+import json
+from typing import Tuple
+
+from .redis_client import IRedisClient
+
+
+class UpdateOffsetStore:
+    """Хранение offset getUpdates и уже обработанных update_id в Redis.
+
+    Offset сохраняется после каждой пачки апдейтов, поэтому после рестарта
+    бот продолжает с того же места, а не выбрасывает накопившиеся апдейты.
+    Апдейты, которые успели обработаться до падения, но оказались после
+    сохранённого offset, отсекаются по отметкам processed.
+    """
+
+    # Telegram хранит неполученные апдейты сутки - дольше помнить их незачем
+    PROCESSED_TTL = 24 * 3600
+
+    def __init__(self, redis_client: IRedisClient, namespace: str = "telegram"):
+        self.redis = redis_client
+        self.offset_key = f"{namespace}:update_offset"
+        self.processed_prefix = f"{namespace}:processed"
+
+    async def load(self) -> Tuple[int, int]:
+        """Вернуть (offset, максимальный виденный update_id) из последнего чекпоинта"""
+        raw = await self.redis.get(self.offset_key)
+        if not raw:
+            return 0, 0
+        try:
+            data = json.loads(raw)
+            return int(data.get("offset", 0)), int(data.get("max_seen", 0))
+        except (ValueError, TypeError, AttributeError):
+            return 0, 0
+
+    async def save(self, offset: int, max_seen: int) -> None:
+        await self.redis.set(self.offset_key, json.dumps({"offset": offset, "max_seen": max_seen}))
+
+    async def mark_processed(self, update_id: int) -> None:
+        await self.redis.set(f"{self.processed_prefix}:{update_id}", "1", expire=self.PROCESSED_TTL)
+
+    async def is_processed(self, update_id: int) -> bool:
+        return bool(await self.redis.get(f"{self.processed_prefix}:{update_id}"))
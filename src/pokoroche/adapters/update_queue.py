@@ -0,0 +1,111 @@
+import asyncio
+from typing import Any, Dict, Optional, Tuple
+
+from .message_queue import MessageQueue
+from .update_dispatcher import extract_chat_id
+
+
+class RedisUpdateQueue:
+    """Очереди сырых апдейтов Telegram в Redis, разбитые на партиции по chat_id.
+
+    Поллер публикует апдейты, каждый воркер-процесс читает свою партицию.
+    Чат всегда попадает в одну партицию, поэтому порядок внутри чата сохраняется.
+    Взятые апдейты лежат в списке обрабатываемых партиции до подтверждения (ack),
+    поэтому упавший воркер после рестарта обработает их заново.
+    """
+
+    def __init__(self, redis_client, partitions: int, prefix: str = "telegram:updates"):
+        if partitions < 1:
+            raise ValueError("partitions must be positive")
+        self.queue = MessageQueue(redis_client)
+        self.partitions = partitions
+        self.prefix = prefix
+
+    def queue_name(self, partition: int) -> str:
+        return f"{self.prefix}:{partition}"
+
+    def partition_for(self, update: Dict[str, Any]) -> int:
+        chat_id = extract_chat_id(update)
+        if chat_id is None:
+            upd_id = update.get("update_id")
+            chat_id = upd_id if isinstance(upd_id, int) else 0
+        return chat_id % self.partitions
+
+    async def publish(self, update: Dict[str, Any]) -> None:
+        await self.queue.push(self.queue_name(self.partition_for(update)), update)
+
+    def processing_name(self, partition: int) -> str:
+        return f"{self.queue_name(partition)}:processing"
+
+    async def consume(self, partition: int, timeout: int = 5) -> Optional[Tuple[Dict[str, Any], str]]:
+        """Апдейт и его исходная строка для ack(); апдейт остаётся в списке обрабатываемых"""
+        return await self.queue.reserve(self.queue_name(partition), self.processing_name(partition), timeout=timeout)
+
+    async def ack(self, partition: int, raw_update: str) -> None:
+        await self.queue.ack(self.processing_name(partition), raw_update)
+
+    async def restore(self, partition: int) -> int:
+        """Вернуть в партицию апдейты, которые воркер взял, но не успел обработать"""
+        return await self.queue.restore(self.processing_name(partition), self.queue_name(partition))
+
+
+class UpdateQueueConsumer:
+    """Воркер: забирает апдейты своей партиции и отдаёт их обработчикам бота.
+
+    Апдейт подтверждается в очереди только после того, как бот его обработал.
+    """
+
+    def __init__(self, bot, update_queue: RedisUpdateQueue, partition: int, poll_timeout: int = 5):
+        self.bot = bot
+        self.update_queue = update_queue
+        self.partition = partition
+        self.poll_timeout = poll_timeout
+        self.is_running = False
+        # update_id -> исходная строка апдейта, ещё не подтверждённого в очереди
+        self.unacked: Dict[int, str] = {}
+        self.bot.on_update_done = self.ack
+
+    async def ack(self, update_id: int) -> None:
+        raw = self.unacked.pop(update_id, None)
+        if raw is None:
+            return
+        try:
+            await self.update_queue.ack(self.partition, raw)
+        except Exception as e:
+            # Останется в списке обрабатываемых - после рестарта обработается ещё раз
+            print(f"Ошибка подтверждения апдейта {update_id}: {e}")
+
+    async def run(self) -> None:
+        self.is_running = True
+        self.bot.dispatcher.start()
+        # Партицию читает один воркер, так что всё в списке обрабатываемых - от прошлого запуска
+        restored = await self.update_queue.restore(self.partition)
+        print(f"Воркер партиции {self.partition} запущен, возвращено необработанных апдейтов: {restored}")
+
+        while self.is_running:
+            try:
+                reserved = await self.update_queue.consume(self.partition, timeout=self.poll_timeout)
+                if reserved is None:
+                    continue
+                upd, raw = reserved
+                upd_id = upd.get("update_id")
+                if isinstance(upd_id, int):
+                    self.unacked[upd_id] = raw
+                # Внутри процесса апдейты тоже раздаются по чатам, порядок чата сохраняется
+                await self.bot.enqueue_update(upd)
+                if not isinstance(upd_id, int):
+                    # Без update_id бот не сообщит об обработке - подтверждаем сразу
+                    await self.update_queue.ack(self.partition, raw)
+            except asyncio.CancelledError:
+                break
+            except Exception:
+                if not self.is_running:
+                    break
+                import traceback
+
+                traceback.print_exc()
+                await asyncio.sleep(1)
+
+    async def stop(self) -> None:
+        self.is_running = False
+        await self.bot.stop()
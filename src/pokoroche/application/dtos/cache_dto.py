@@ -3,10 +3,11 @@ import time
 class CacheItem:
     """Элемент кеша"""
     
-    def __init__(self, key: str, value: any, ttl: int):
+    def __init__(self, key: str, value: any, ttl: int, size: int = 0):
         self.key = key
         self.value = value
         self.ttl = ttl  # время жизни в секундах
+        self.size = size  # примерный размер в байтах, для лимита памяти
         self.created_at = time.time() #время создания кеша
     
     def is_valid(self) -> bool:
@@ -99,14 +99,16 @@ class DigestDeliveryUseCase:
             count += 1
         text = "\n".join(lines)
 
-        await self.telegram_bot.send_digest(user.telegram_id, text)
-
         # TODO: реализовать save_delivery - Сохранить запись об отправленном дайджесте
-        await self.digest_repository.save_delivery(
+        # Запись сохраняем до отправки, чтобы id дайджеста сразу попал в кнопки оценки
+        digest = await self.digest_repository.save_delivery(
             telegram_id=user.telegram_id,
             from_time=from_time,
             sent_at=datetime.now(timezone.utc),
             items_count=count,
             digest=text,
         )
+        digest_id = getattr(digest, "id", None)
+
+        await self.telegram_bot.send_digest(user.telegram_id, text, digest_id=digest_id)
         return True
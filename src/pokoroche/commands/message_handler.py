@@ -1,11 +1,37 @@
 import structlog
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timezone
 
 from src.pokoroche.domain.models.message import MessageEntity
 
 logger = structlog.get_logger(__name__)
 
+# Очередь текстовых сообщений для MessageIngestionWorker
+INGEST_QUEUE = "messages:ingest"
+
+
+def build_message_entity(user_id: int,
+                         chat_id: int,
+                         text: str,
+                         message_data: Dict[str, Any]) -> Optional[MessageEntity]:
+    """MessageEntity из данных Telegram; None, если нет message_id"""
+    telegram_message_id = message_data.get("message_id")
+    if not isinstance(telegram_message_id, int):
+        return None
+
+    created_at = datetime.now(timezone.utc)
+    ts = message_data.get("date")  # время сообщения в формате числа(timestamp)
+    if isinstance(ts, int):
+        created_at = datetime.fromtimestamp(ts, tz=timezone.utc)
+    return MessageEntity(
+        telegram_message_id=telegram_message_id,
+        chat_id=chat_id,
+        user_id=user_id,
+        text=text,
+        metadata=message_data,
+        created_at=created_at,
+    )
+
 
 class MessageHandler:
     """Обработчик обычных текстовых сообщений (не команд)"""
@@ -13,10 +39,22 @@ class MessageHandler:
     def __init__(self,
                  message_repository,
                  importance_service,
-                 topic_service):
+                 topic_service,
+                 analysis_service=None,
+                 duplicate_index=None,
+                 message_queue=None,
+                 queue_name: str = INGEST_QUEUE):
         self.message_repository = message_repository
         self.importance_service = importance_service
         self.topic_service = topic_service
+        # Если задан, важность и темы считаются одним запросом к ML
+        self.analysis_service = analysis_service
+        # Если задан (NearDuplicateIndex), для почти одинаковых текстов берутся прошлые важность и темы
+        self.duplicate_index = duplicate_index
+        # Если задана (MessageQueue), текстовые сообщения только ставятся в очередь,
+        # а оценивают и сохраняют их пачками воркеры MessageIngestionWorker
+        self.message_queue = message_queue
+        self.queue_name = queue_name
 
     async def handle(self,
                      user_id: int,
@@ -30,6 +68,9 @@ class MessageHandler:
         3. Извлечь темы через topic_service
         4. Сохранить метаданные
 
+        С message_queue текстовое сообщение только ставится в очередь,
+        шаги 2-4 выполняет MessageIngestionWorker.
+
         Args:
             user_id: ID пользователя в Telegram
             chat_id: ID чата
@@ -46,36 +87,35 @@ class MessageHandler:
         has_text = bool(text.strip())
 
         # 1)создание MessageEntity
-        telegram_message_id = message_data.get("message_id")
-        if not isinstance(telegram_message_id, int):
+        message_entity = build_message_entity(user_id, chat_id, text, message_data)
+        if message_entity is None:
             return
 
-        created_at = datetime.now(timezone.utc)
-        ts = message_data.get("date")  # время сообщения в формате числа(timestamp)
-        if isinstance(ts, int):
-            created_at = datetime.fromtimestamp(ts, tz=timezone.utc)
-        message_entity = MessageEntity(
-            telegram_message_id=telegram_message_id,
-            chat_id=chat_id,
-            user_id=user_id,
-            text=text,
-            metadata=message_data,
-            created_at=created_at,
-        )
+        if has_text and self.message_queue is not None:
+            try:
+                await self.message_queue.push(self.queue_name, {
+                    "user_id": user_id,
+                    "chat_id": chat_id,
+                    "text": text,
+                    "message_data": message_data,
+                })
+                logger.info("Message queued", telegram_message_id=message_entity.telegram_message_id, chat_id=chat_id)
+                return
+            except Exception as e:
+                # Очередь недоступна - обрабатываем сообщение сразу
+                print(f"Ошибка при постановке сообщения в очередь: {e}")
 
-        #  2) анализ важности
         importance_score: float = 0.0
-        if has_text and self.importance_service is not None:
-            val = await self.importance_service.calculate_importance(text, context=message_data)
-            if isinstance(val, (int, float)):
-                importance_score = float(val)
-
-        message_entity.update_importance_score(importance_score)  # обновление важности; метод из MessageEntity
-
-        # 3) Извлечение тем
         topics = []
+        if has_text:
+            # 2-3) важность и темы
+            importance_score, topics = await self._score(text, message_data)
+
+        # Учитываю сообщение в частотах слов для TF-IDF оценки тем
         if has_text and self.topic_service is not None:
-            topics = await self.topic_service.extract_topics(text)
+            await self.topic_service.record_document(text)
+
+        message_entity.update_importance_score(importance_score)  # обновление важности; метод из MessageEntity
 
         for t in topics:
             message_entity.add_topic(t)
@@ -86,9 +126,43 @@ class MessageHandler:
         # запись в лог
         logger.info(
             "Message saved",
-            telegram_message_id=telegram_message_id,
+            telegram_message_id=message_entity.telegram_message_id,
             chat_id=chat_id,
             user_id=user_id,
             importance_score=message_entity.importance_score,
             topics=message_entity.topics,
         )
+
+    async def _score(self, text: str, message_data: Dict[str, Any]) -> Tuple[float, List[str]]:
+        """Важность и темы текста; для почти дубликата - из индекса без обращения к ML"""
+        signature = None
+        if self.duplicate_index is not None:
+            signature = self.duplicate_index.signature(text)
+            reused = self.duplicate_index.find(signature)
+            if reused is not None:
+                logger.info("Near-duplicate reused", reuse_rate=self.duplicate_index.get_stats()["reuse_rate"])
+                return reused[0], list(reused[1])
+
+        importance_score: float = 0.0
+        topics: List[str] = []
+        if self.analysis_service is not None:
+            # важность и темы за один запрос к ML
+            analysis = await self.analysis_service.analyze(text, context=message_data)
+            val = analysis.get("importance")
+            if isinstance(val, (int, float)):
+                importance_score = float(val)
+            topics = analysis.get("topics") or []
+        else:
+            #  анализ важности
+            if self.importance_service is not None:
+                val = await self.importance_service.calculate_importance(text, context=message_data)
+                if isinstance(val, (int, float)):
+                    importance_score = float(val)
+
+            # Извлечение тем
+            if self.topic_service is not None:
+                topics = await self.topic_service.extract_topics(text)
+
+        if self.duplicate_index is not None:
+            self.duplicate_index.add(signature, (importance_score, list(topics)))
+        return importance_score, topics
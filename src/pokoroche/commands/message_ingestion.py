@@ -0,0 +1,181 @@
+import asyncio
+import structlog
+from typing import Any, Dict, List, Tuple
+
+from src.pokoroche.commands.message_handler import INGEST_QUEUE, build_message_entity
+
+logger = structlog.get_logger(__name__)
+
+
+class MessageIngestionWorker:
+    """Воркер приёма сообщений: пачками забирает текстовые сообщения из очереди,
+    оценивает важность и темы пачкой и сохраняет их одной записью в БД.
+
+    Пачка уходит в обработку, как только набралось batch_size сообщений или
+    прошло linger секунд с первого. Несколько воркеров могут читать одну очередь.
+    """
+
+    def __init__(self,
+                 message_queue,
+                 message_repository,
+                 importance_service,
+                 topic_service,
+                 queue_name: str = INGEST_QUEUE,
+                 batch_size: int = 100,
+                 linger: float = 0.05,
+                 poll_timeout: int = 5,
+                 duplicate_index=None,
+                 max_attempts: int = 3):
+        self.message_queue = message_queue
+        self.message_repository = message_repository
+        self.importance_service = importance_service
+        self.topic_service = topic_service
+        self.queue_name = queue_name
+        self.batch_size = batch_size
+        self.linger = linger
+        self.poll_timeout = poll_timeout
+        self.duplicate_index = duplicate_index
+        # Сколько раз пробовать обработать сообщение, прежде чем выбросить его из очереди
+        self.max_attempts = max_attempts
+        self.is_running = False
+
+    async def run(self) -> None:
+        self.is_running = True
+        while self.is_running:
+            try:
+                items = await self.message_queue.pop_batch(
+                    self.queue_name, self.batch_size, linger=self.linger, timeout=self.poll_timeout
+                )
+                if not items:
+                    continue
+                try:
+                    await self.process_batch(items)
+                except Exception:
+                    # Пачка уже снята с очереди - возвращаем её, иначе сообщения потеряются
+                    await self._requeue(items)
+                    raise
+            except asyncio.CancelledError:
+                break
+            except Exception:
+                if not self.is_running:
+                    break
+                import traceback
+
+                traceback.print_exc()
+                await asyncio.sleep(1)
+
+    async def stop(self) -> None:
+        self.is_running = False
+
+    async def _requeue(self, items: List[Dict[str, Any]]) -> None:
+        """Вернуть в очередь сообщения неудачной пачки; после max_attempts попыток - выбросить"""
+        retry = []
+        for item in items:
+            attempts = int(item.get("attempts", 0)) + 1
+            if attempts < self.max_attempts:
+                retry.append({**item, "attempts": attempts})
+        dropped = len(items) - len(retry)
+        requeued = 0
+        try:
+            for item in retry:
+                await self.message_queue.push(self.queue_name, item)
+                requeued += 1
+        except Exception as e:
+            logger.error("Failed to requeue messages", error=str(e))
+        logger.error(
+            "Message batch failed",
+            requeued=requeued,
+            lost=len(items) - requeued,
+            dropped_after_retries=dropped,
+        )
+
+    async def process_batch(self, items: List[Dict[str, Any]]) -> int:
+        """Оценить и сохранить пачку сообщений из очереди; возвращает число сохранённых"""
+        batch = []
+        for item in items:
+            text = item.get("text")
+            entity = build_message_entity(
+                item.get("user_id"),
+                item.get("chat_id"),
+                text if isinstance(text, str) else "",
+                item.get("message_data") or {},
+            )
+            if entity is not None:
+                batch.append((item, entity))
+        if not batch:
+            return 0
+
+        entities = [entity for _, entity in batch]
+        scores, topics = await self._score_batch([entity.text for entity in entities])
+        for entity, score, entity_topics in zip(entities, scores, topics):
+            entity.update_importance_score(score)
+            for t in entity_topics:
+                entity.add_topic(t)
+
+        saved = await self._save(batch)
+        # Учитываю в частотах слов для TF-IDF оценки тем только сохранённые сообщения
+        if self.topic_service is not None:
+            try:
+                for entity in saved:
+                    await self.topic_service.record_document(entity.text)
+            except Exception as e:
+                # Сообщения уже в БД - повторять пачку нельзя, иначе будут дубли
+                logger.error("Failed to record documents", error=str(e))
+
+        logger.info("Message batch saved", count=len(saved), failed=len(batch) - len(saved))
+        return len(saved)
+
+    async def _save(self, batch: List[Tuple[Dict[str, Any], Any]]) -> List[Any]:
+        """Сохранить пачку одной записью; если не вышло - по одному, неудачные вернуть в очередь"""
+        entities = [entity for _, entity in batch]
+        if hasattr(self.message_repository, "save_many"):
+            try:
+                await self.message_repository.save_many(entities)
+                return entities
+            except Exception as e:
+                logger.warning("Batch save failed, saving one by one", count=len(entities), error=str(e))
+
+        saved = []
+        failed = []
+        for item, entity in batch:
+            try:
+                await self.message_repository.save(entity)
+                saved.append(entity)
+            except Exception as e:
+                logger.error("Failed to save message", error=str(e))
+                failed.append(item)
+        if failed:
+            await self._requeue(failed)
+        return saved
+
+    async def _score_batch(self, texts: List[str]) -> Tuple[List[float], List[List[str]]]:
+        """Важность и темы пачки текстов; почти дубликаты берутся из индекса, остальное - одним запросом к ML"""
+        scores: List[float] = [0.0] * len(texts)
+        topics: List[List[str]] = [[] for _ in texts]
+        signatures = [None] * len(texts)
+        pending = list(range(len(texts)))
+        if self.duplicate_index is not None:
+            pending = []
+            for i, text in enumerate(texts):
+                signatures[i] = self.duplicate_index.signature(text)
+                reused = self.duplicate_index.find(signatures[i])
+                if reused is None:
+                    pending.append(i)
+                else:
+                    scores[i], topics[i] = reused[0], list(reused[1])
+        if not pending:
+            return scores, topics
+
+        pending_texts = [texts[i] for i in pending]
+        pending_scores = [0.0] * len(pending)
+        pending_topics: List[List[str]] = [[] for _ in pending]
+        if self.importance_service is not None:
+            pending_scores = await self.importance_service.batch_calculate_importance(pending_texts)
+        if self.topic_service is not None:
+            pending_topics = await self.topic_service.batch_extract_topics(pending_texts)
+
+        for i, score, text_topics in zip(pending, pending_scores, pending_topics):
+            scores[i], topics[i] = float(score), list(text_topics)
+            if self.duplicate_index is not None:
+                self.duplicate_index.add(signatures[i], (scores[i], list(text_topics)))
+        return scores, topics
@@ -1,8 +1,10 @@
 class SubscribeCommand:
-    def __init__(self, bot, user_repository, topic_service):
+    def __init__(self, bot, user_repository, topic_service, subscription_index=None):
         self.bot = bot
         self.user_repository = user_repository
         self.topic_service = topic_service
+        # Обратный индекс тема -> подписчики (SubscriptionIndex), обновляется вместе с настройками
+        self.subscription_index = subscription_index
 
     def _normalize(self, s: str) -> str:
         return " ".join((s or "").strip().lower().split())
@@ -74,6 +76,8 @@ class SubscribeCommand:
             topics = topics + [topic]
             self._set_topics(user, topics)
             await self.user_repository.update(user)
+            if self.subscription_index is not None:
+                await self.subscription_index.add(user_id, topic)
             return f"Готово! Ты подписался на тему: {topic}"
 
         if action == "remove":
@@ -82,10 +86,11 @@ class SubscribeCommand:
                 return f"Тема '{topic}' не найдена в твоих подписках."
             self._set_topics(user, new_topics)
             await self.user_repository.update(user)
+            if self.subscription_index is not None:
+                for removed in topics:
+                    if self._normalize(removed) == norm:
+                        await self.subscription_index.remove(user_id, removed)
             return f"Готово! Подписка на тему '{topic}' удалена."
 
-<<<<<<< HEAD
         return "Неизвестное действие. Используй add или remove."
-=======
-        return "Неизвестное действие. Используй add или remove."
->>>>>>> dea9d23ace1ae033e25d20924634a8b2728cad0a
+
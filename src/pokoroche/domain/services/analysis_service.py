@@ -0,0 +1,45 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict
+
+
+class IAnalysisService(ABC):
+    """Интерфейс совместного анализа сообщения: важность и темы за один вызов"""
+
+    @abstractmethod
+    async def analyze(self, text: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Вернуть {"importance": float, "topics": List[str]}"""
+        pass
+
+
+class AnalysisService(IAnalysisService):
+    """Сервис совместного анализа.
+
+    Текст нормализуется один раз и уходит в ML одним запросом (ml_client.analyze),
+    а ответ приводится к виду, который вернули бы ImportanceService и TopicService.
+    """
+
+    def __init__(self, ml_client, importance_service, topic_service):
+        self.ml_client = ml_client
+        self.importance_service = importance_service
+        self.topic_service = topic_service
+
+    async def analyze(self, text: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+        if text is None or text == "" or text.isspace():
+            return {"importance": 0.0, "topics": []}
+        text = self.importance_service.prepare_text(text)
+        context = self.importance_service.prepare_context(context)
+        try:
+            result = await self.ml_client.analyze(text, context)
+        except Exception as e:
+            # Логируем ошибку
+            print(f"Ошибка при вызове ML: {e}")
+            return {"importance": 0.0, "topics": []}
+
+        try:
+            importance = float(result.get("importance", 0.0))
+        except (TypeError, ValueError):
+            importance = 0.0
+        return {
+            "importance": self.importance_service.clamp_score(importance),
+            "topics": self.topic_service.normalize_topics(result.get("topics")),
+        }
@@ -1,12 +1,9 @@
 import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
-import unicodedata
+from collections import deque
+from typing import Any, AsyncIterable, AsyncIterator, Deque, Dict, Iterable, List, Union
 
-
-def remove_invisible_chars(s: str) -> str:
-    # Удаляем все символы, категория которых 'Cc' (Control) или 'Cf' (Format)
-    return "".join(c for c in s if unicodedata.category(c) not in ('Cc', 'Cf'))
+from .text_processing import normalize_text
 
 
 class IImportanceService(ABC):
@@ -26,23 +23,20 @@ class IImportanceService(ABC):
 class ImportanceService(IImportanceService):
     """Сервис анализа важности"""
 
-    def __init__(self, ml_client):
+    def __init__(self, ml_client, chunk_size: int = 100, concurrency: int = 4):
         self.ml_client = ml_client
+        # Потоковая пакетная обработка: размер пачки и сколько пачек одновременно в работе
+        self.chunk_size = chunk_size
+        self.concurrency = concurrency
 
-    async def calculate_importance(self, text: str, context: Dict[str, Any] = None) -> float:
-        # TODO: Реализовать логику анализа важности:
-        # Использовать модели для классификации, учитывать контекст, комбинировать несколько факторов в итоговую оценку
-        # Делаю проверку: (переменная не содержит строку) || (переменная - пустая строка) || (переменная - строка с пробелами, переносами строки или табами)
-        if text is None or text == "" or text.isspace():
-            return 0.0
-        # Теперь я сделаю предобработку текста, чтобы сделать его чище.
-        # Убираю пробелы в начале и в конце строки.
-        text = text.strip()
-        # Делаю нормализацию Unicode, чтобы привести текст к единому стандарту и убрать различия, которые модель может принять за разные символы.
-        # NFC композирует символы: комбинирует букву + диакритический знак в один символ, если возможно.
-        text = unicodedata.normalize("NFC", text)
-        # Делаю очистку невидимых символов, оставляем только печатаемые символы и пробелы
-        text = remove_invisible_chars(text)
+    def prepare_text(self, text: str) -> str:
+        """Предобработка текста перед отправкой в ML"""
+        # Убираю пробелы по краям, делаю нормализацию Unicode (NFC) и удаляю невидимые символы.
+        # Результат запоминается, поэтому одинаковые тексты обрабатываются один раз
+        return normalize_text(text)
+
+    def prepare_context(self, context: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Очистка контекста от пустых значений и приведение ключей к единому виду"""
         # Делаю проверку контекста: проверяю, что он действительно словарь
         if not isinstance(context, dict):
             context = {}
@@ -60,6 +54,25 @@ class ImportanceService(IImportanceService):
             new_key = str(key).strip().lower()
             if new_key != key:
                 context[new_key] = context.pop(key)
+        return context
+
+    @staticmethod
+    def clamp_score(score: float) -> float:
+        # Нормализация score
+        if score < 0.0:
+            return 0.0
+        if score > 1.0:
+            return 1.0
+        return score
+
+    async def calculate_importance(self, text: str, context: Dict[str, Any] = None) -> float:
+        # TODO: Реализовать логику анализа важности:
+        # Использовать модели для классификации, учитывать контекст, комбинировать несколько факторов в итоговую оценку
+        # Делаю проверку: (переменная не содержит строку) || (переменная - пустая строка) || (переменная - строка с пробелами, переносами строки или табами)
+        if text is None or text == "" or text.isspace():
+            return 0.0
+        text = self.prepare_text(text)
+        context = self.prepare_context(context)
         # Сделаю обработку ошибок ML: если ml_client.analyze_importance по какой-то причине падает (например, сеть, таймаут, ошибка сервера), то возвращаю 0.0 и логирую ошибку для отладки, чтобы весь бот не падал
         try:
             score = await self.ml_client.analyze_importance(text, context)
@@ -67,18 +80,75 @@ class ImportanceService(IImportanceService):
             # Логируем ошибку
             print(f"Ошибка при вызове ML: {e}")
             score = 0.0
-        # Нормализация score
-        if score < 0.0:
-            score = 0.0
-        elif score > 1.0:
-            score = 1.0
-        return score
+        return self.clamp_score(score)
 
     async def batch_calculate_importance(self, texts: List[str]) -> List[float]:
-        # TODO: Оптимизировать для пакетной обработки
-        # Создаю список кортуин
-        tasks = [self.calculate_importance(text) for text in texts]
-        # Выполняю все корутины параллельно и жду их завершения
-        results = await asyncio.gather(*tasks)
+        # Пустые тексты сразу получают 0.0, остальные уходят в ML одной пачкой
+        # (у CachedMLClient это один MGET и один pipeline на запись)
+        results = [0.0] * len(texts)
+        indexes = [i for i, text in enumerate(texts) if text is not None and text != "" and not text.isspace()]
+        if not indexes:
+            return results
+        prepared = [self.prepare_text(texts[i]) for i in indexes]
+        try:
+            scores = await self.ml_client.batch_analyze_importance(prepared)
+        except Exception as e:
+            # Логируем ошибку
+            print(f"Ошибка при вызове ML: {e}")
+            scores = [0.0] * len(prepared)
         # Возвращаю список результатов (float) в том же порядке, что и входные тексты
+        for i, score in zip(indexes, scores):
+            results[i] = self.clamp_score(score)
         return results
+
+    async def stream_calculate_importance(
+        self,
+        texts: Union[AsyncIterable[str], Iterable[str]],
+        chunk_size: int = None,
+        concurrency: int = None,
+    ) -> AsyncIterator[float]:
+        """Потоковый расчёт важности: оценки отдаются по одной в порядке входных текстов.
+
+        Тексты читаются пачками по chunk_size, каждая пачка - один batch_calculate_importance.
+        Одновременно в работе не больше concurrency пачек, поэтому память не растёт
+        с размером входа, а ML сервис не получает тысячи запросов разом.
+        """
+        chunk_size = chunk_size or self.chunk_size
+        concurrency = concurrency or self.concurrency
+        if chunk_size < 1 or concurrency < 1:
+            raise ValueError("chunk_size and concurrency must be positive")
+
+        # Окно задач в порядке поступления: ждём самую старую, когда окно заполнено.
+        # Работает как семафор на concurrency пачек, но ещё и ограничивает готовые, но не отданные результаты
+        window: Deque[asyncio.Task] = deque()
+        try:
+            async for chunk in _chunks(texts, chunk_size):
+                if len(window) >= concurrency:
+                    for score in await window.popleft():
+                        yield score
+                window.append(asyncio.ensure_future(self.batch_calculate_importance(chunk)))
+            while window:
+                for score in await window.popleft():
+                    yield score
+        finally:
+            # Если потребитель остановился раньше, незавершённые пачки не нужны
+            for task in window:
+                task.cancel()
+
+
+async def _chunks(texts: Union[AsyncIterable[str], Iterable[str]], size: int) -> AsyncIterator[List[str]]:
+    chunk: List[str] = []
+    if hasattr(texts, "__aiter__"):
+        async for text in texts:
+            chunk.append(text)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+    else:
+        for text in texts:
+            chunk.append(text)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,55 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import List
+
+# Общая предобработка текста для сервисов и ML клиентов. Регулярки компилируются один раз,
+# а результат нормализации запоминается: одинаковые тексты (пересылки, спам) приходят часто
+
+NORMALIZE_CACHE_SIZE = 4096
+
+# Всё, кроме букв, цифр и дефиса внутри слова; пробелы оставляем, чтобы потом разбить на слова
+_NON_WORD_CHARS = re.compile(r"[^a-zа-яё0-9\s-]")
+# Для готовой темы пробелы тоже лишние
+_NON_TOPIC_CHARS = re.compile(r"[^a-zа-яё0-9-]")
+
+# Символы категорий 'Cc' (Control) и 'Cf' (Format) одним классом символов из диапазонов
+# (Unicode 14.0). Такой класс работает быстрее, чем str.translate со словарём на ~230 символов,
+# а готовые диапазоны не требуют перебора всех кодовых точек при первом вызове
+_INVISIBLE_CHARS = re.compile(
+    r"[\x00-\x1f\x7f-\x9f\xad\u0600-\u0605\u061c\u06dd\u070f\u0890-\u0891\u08e2"
+    r"\u180e\u200b-\u200f\u202a-\u202e\u2060-\u2064\u2066-\u206f\ufeff\ufff9-\ufffb"
+    r"\U000110bd\U000110cd\U00013430-\U00013438\U0001bca0-\U0001bca3\U0001d173-\U0001d17a"
+    r"\U000e0001\U000e0020-\U000e007f]"
+)
+
+
+def remove_invisible_chars(s: str) -> str:
+    # Удаляем все символы, категория которых 'Cc' (Control) или 'Cf' (Format)
+    if s.isprintable():
+        # Печатаемая строка точно не содержит Cc/Cf - частый случай, проверка на C
+        return s
+    return _INVISIBLE_CHARS.sub("", s)
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize_text(text: str) -> str:
+    """Убрать пробелы по краям, привести к NFC и удалить невидимые символы"""
+    return remove_invisible_chars(unicodedata.normalize("NFC", text.strip()))
+
+
+def tokenize(text: str) -> List[str]:
+    """Слова текста в нижнем регистре без знаков препинания (кроме дефиса)"""
+    return _NON_WORD_CHARS.sub("", text.lower()).split()
+
+
+def extract_keywords(text: str, min_length: int = 5) -> List[str]:
+    """Уникальные слова не короче min_length в порядке появления - эвристика тем"""
+    if not text:
+        return []
+    return [word for word in dict.fromkeys(tokenize(text)) if len(word) >= min_length]
+
+
+def normalize_topic(topic: str) -> str:
+    """Тема в нижнем регистре только из букв, цифр и дефиса"""
+    return _NON_TOPIC_CHARS.sub("", topic.strip().lower())
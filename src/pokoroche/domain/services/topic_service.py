@@ -1,12 +1,9 @@
-import re
-import unicodedata
+import math
 from abc import ABC, abstractmethod
+from collections import Counter
 from typing import List, Dict
 
-
-def remove_invisible_chars(s: str) -> str:
-    # Удаляем все символы, категория которых 'Cc' (Control) или 'Cf' (Format)
-    return "".join(c for c in s if unicodedata.category(c) not in ('Cc', 'Cf'))
+from .text_processing import normalize_text, normalize_topic, tokenize
 
 
 class ITopicService(ABC):
@@ -17,6 +14,16 @@ class ITopicService(ABC):
         """Извлечь релевантные темы из текста"""
         pass
 
+    @abstractmethod
+    async def batch_extract_topics(self, texts: List[str]) -> List[List[str]]:
+        """Извлечь темы для пачки текстов"""
+        pass
+
+    @abstractmethod
+    async def record_document(self, text: str) -> None:
+        """Учесть сообщение в статистике корпуса (частоты слов для TF-IDF)"""
+        pass
+
     @abstractmethod
     async def categorize_message(self, text: str) -> Dict[str, float]:
         """Классифицировать сообщение по темам с оценками уверенности"""
@@ -26,43 +33,30 @@ class ITopicService(ABC):
 class TopicService(ITopicService):
     """Сервис определения тем"""
 
-    def __init__(self, ml_client):
+    def __init__(self, ml_client, df_store=None):
         self.ml_client = ml_client
+        # Частоты слов по документам (DocumentFrequencyStore) для TF-IDF в categorize_message
+        self.df_store = df_store
 
-    async def extract_topics(self, text: str) -> List[str]:
-        # TODO: Реализовать извлечение тем
-        # Делаю проверку: (переменная не содержит строку) || (переменная - пустая строка) || (переменная - строка с пробелами, переносами строки или табами)
-        if text is None or text == "" or text.isspace():
-            return []
-        # Теперь я сделаю предобработку текста, чтобы сделать его чище.
-        # Убираю пробелы в начале и в конце строки.
-        text = text.strip()
-        # Делаю нормализацию Unicode, чтобы привести текст к единому стандарту и убрать различия, которые модель может принять за разные символы.
-        # NFC композирует символы: комбинирует букву + диакритический знак в один символ, если возможно.
-        text = unicodedata.normalize("NFC", text)
-        # Делаю очистку невидимых символов, оставляем только печатаемые символы и пробелы
-        text = remove_invisible_chars(text)
-        try:
-            topics = await self.ml_client.extract_topics(text)
-        except Exception as e:
-            # Логируем ошибку
-            print(f"Ошибка при вызове ML: {e}")
-            return []
+    def prepare_text(self, text: str) -> str:
+        """Предобработка текста перед отправкой в ML"""
+        # Убираю пробелы по краям, делаю нормализацию Unicode (NFC) и удаляю невидимые символы.
+        # Результат запоминается, поэтому одинаковые тексты обрабатываются один раз
+        return normalize_text(text)
+
+    def normalize_topics(self, topics) -> List[str]:
+        """Приведение ответа ML к списку уникальных тем в нижнем регистре"""
         # Делаю проверку на корректность формата вывода
         if not isinstance(topics, list):
             return []
-        # Делаю нормализацию вывода.
-        # Добавляю разрешённые символы для тем: буквы a-z, а-я, ё, цифры, дефис
-        allowed_topics = re.compile(r'[^a-zа-яё0-9-]')
         normalized: List[str] = []
         # Создаю set, чтобы не было повторов в темах
         topics_set = set()
         for topic in topics:
             if not isinstance(topic, str):
                 continue
-            t_norm = topic.strip().lower()
-            # Удаляю все символы, кроме разрешённых
-            t_norm = allowed_topics.sub('', t_norm)
+            # Оставляю только разрешённые символы: буквы a-z, а-я, ё, цифры, дефис
+            t_norm = normalize_topic(topic)
             if t_norm == "":
                 continue
             if t_norm in topics_set:
@@ -71,20 +65,66 @@ class TopicService(ITopicService):
             normalized.append(t_norm)
         return normalized
 
+    async def extract_topics(self, text: str) -> List[str]:
+        # TODO: Реализовать извлечение тем
+        # Делаю проверку: (переменная не содержит строку) || (переменная - пустая строка) || (переменная - строка с пробелами, переносами строки или табами)
+        if text is None or text == "" or text.isspace():
+            return []
+        text = self.prepare_text(text)
+        try:
+            topics = await self.ml_client.extract_topics(text)
+        except Exception as e:
+            # Логируем ошибку
+            print(f"Ошибка при вызове ML: {e}")
+            return []
+        return self.normalize_topics(topics)
+
+    async def batch_extract_topics(self, texts: List[str]) -> List[List[str]]:
+        # Пустые тексты без тем, остальные уходят в ML одной пачкой
+        results: List[List[str]] = [[] for _ in texts]
+        indexes = [i for i, text in enumerate(texts) if text is not None and text != "" and not text.isspace()]
+        if not indexes:
+            return results
+        prepared = [self.prepare_text(texts[i]) for i in indexes]
+        try:
+            batch = await self.ml_client.batch_extract_topics(prepared)
+        except Exception as e:
+            # Логируем ошибку
+            print(f"Ошибка при вызове ML: {e}")
+            return results
+        for i, topics in zip(indexes, batch):
+            results[i] = self.normalize_topics(topics)
+        return results
+
+    async def record_document(self, text: str) -> None:
+        """Учесть сообщение в частотах слов"""
+        if self.df_store is None or text is None or text.isspace() or text == "":
+            return
+        self.df_store.add_document(tokenize(self.prepare_text(text)))
+        try:
+            await self.df_store.maybe_persist()
+        except Exception as e:
+            # Логируем ошибку
+            print(f"Ошибка при сохранении частот слов: {e}")
+
     async def categorize_message(self, text: str) -> Dict[str, float]:
-        # TODO: Реализовать многоклассовую классификацию
         topics = await self.extract_topics(text)
-        text_lower = text.lower()
-        words = text_lower.split()
-        number_for_topics = {}
+        if not topics:
+            return {}
+        # Один проход по словам текста
+        counts = Counter(tokenize(self.prepare_text(text)))
+        weights = {}
         for topic in topics:
-            # Считаю, сколько раз topic встречается среди слов в тексте.
-            # Привожу topic к нижнему регистру для совпадения.
-            count = words.count(topic.lower())
-            number_for_topics[topic] = count
-        result = {}
-        for topic, count in number_for_topics.items():
-            # Высчитываю score - даю базовый бонус 0.5 и добавляю 0.1 за каждое упоминание слова в тексте, беру минимум с 1.0
-            score = min(0.5 + 0.1 * count, 1.0)
-            result[topic] = score
-        return result
+            if self.df_store is not None and self.df_store.is_common(topic):
+                # Слово есть почти в каждом сообщении - это не тема
+                continue
+            count = counts.get(topic, 0)
+            # TF: логарифм числа упоминаний; тема, которой нет в тексте дословно (её вывела модель), получает 0.5
+            tf = 1.0 + math.log(count) if count else 0.5
+            idf = self.df_store.idf(topic) if self.df_store is not None else 1.0
+            weights[topic] = tf * idf
+        # Нормирую вектор TF-IDF (L2), чтобы уверенности были в диапазоне (0, 1]
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        if norm == 0:
+            return {}
+        return {topic: weight / norm for topic, weight in weights.items()}
@@ -16,9 +16,56 @@ class RedisConfig:
         self.url = os.getenv("REDIS_URL", "redis://redis:6379")
 
 
+class CacheConfig:
+    def __init__(self):
+        # Кеш ML результатов в памяти процесса перед Redis
+        self.l1_max_entries = int(os.getenv("CACHE_L1_MAX_ENTRIES", "10000"))
+        self.l1_max_bytes = int(os.getenv("CACHE_L1_MAX_BYTES", str(16 * 1024 * 1024)))
+        self.l1_ttl = int(os.getenv("CACHE_L1_TTL", "60"))
+        # Блокировка в Redis, чтобы один текст не считали сразу несколько процессов
+        self.distributed_lock = os.getenv("CACHE_DISTRIBUTED_LOCK", "false").lower() == "true"
+        self.lock_ttl = float(os.getenv("CACHE_LOCK_TTL", "5"))
+        # Сколько держать в кеше результаты эвристики (ML недоступен; 0 - не кешировать)
+        # и как часто перечитывать версию модели
+        self.fallback_ttl = int(os.getenv("CACHE_FALLBACK_TTL", "60"))
+        self.namespace_refresh = float(os.getenv("CACHE_NAMESPACE_REFRESH", "30"))
+        # Индекс почти дубликатов перед ML: сколько текстов помнить (0 - выключен) и порог сходства
+        self.dedup_max_entries = int(os.getenv("CACHE_DEDUP_MAX_ENTRIES", "20000"))
+        self.dedup_threshold = float(os.getenv("CACHE_DEDUP_THRESHOLD", "0.8"))
+
+
+class IngestConfig:
+    def __init__(self):
+        # Асинхронный приём сообщений: обработчик кладёт тексты в очередь, воркеры оценивают их пачками
+        self.enabled = os.getenv("INGEST_ENABLED", "false").lower() == "true"
+        self.queue = os.getenv("INGEST_QUEUE", "messages:ingest")
+        self.workers = int(os.getenv("INGEST_WORKERS", "2"))
+        # Размер пачки и сколько ждать её заполнения после первого сообщения, миллисекунды
+        self.batch_size = int(os.getenv("INGEST_BATCH_SIZE", "100"))
+        self.linger_ms = float(os.getenv("INGEST_LINGER_MS", "50"))
+        self.poll_timeout = int(os.getenv("INGEST_POLL_TIMEOUT", "5"))
+
+
 class MLServiceConfig:
     def __init__(self):
+        # remote - HTTP ML сервис, local - модели ModelLoader в пуле процессов бота
+        self.backend = os.getenv("ML_BACKEND", "remote").lower()
         self.url = os.getenv("ML_SERVICE_URL", "http://ml_mock:8000")
+        self.model_path = os.getenv("ML_MODEL_PATH", "models")
+        self.local_workers = int(os.getenv("ML_LOCAL_WORKERS", "2"))
+        # Период проверки файлов моделей для горячей перезагрузки, секунды (0 - выключена)
+        self.model_reload_interval = float(os.getenv("ML_MODEL_RELOAD_INTERVAL", "0"))
+        self.timeout = int(os.getenv("ML_TIMEOUT", "30"))
+        # Пул соединений к ML сервису
+        self.connection_limit = int(os.getenv("ML_CONNECTION_LIMIT", "100"))
+        self.keepalive_timeout = int(os.getenv("ML_KEEPALIVE_TIMEOUT", "30"))
+        # Общий дедлайн вызова с повторами и настройки circuit breaker
+        self.deadline = float(os.getenv("ML_DEADLINE", "10"))
+        self.breaker_threshold = int(os.getenv("ML_BREAKER_THRESHOLD", "5"))
+        self.breaker_recovery = float(os.getenv("ML_BREAKER_RECOVERY", "30"))
+        # Микробатчинг запросов: окно сбора в миллисекундах (0 - выключен) и размер пачки
+        self.batch_window_ms = float(os.getenv("ML_BATCH_WINDOW_MS", "5"))
+        self.batch_size = int(os.getenv("ML_BATCH_SIZE", "32"))
 
 
 class BotConfig:
@@ -26,6 +73,27 @@ class BotConfig:
         self.token = os.getenv("BOT_TOKEN")
         if not self.token:
             raise ValueError("BOT_TOKEN не задан!")
+        # Адрес Bot API; для нагрузочных тестов - локальная заглушка telegram_mock
+        self.api_url = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+        # Сколько апдейтов обрабатывается параллельно и глубина очереди каждого воркера
+        self.workers = int(os.getenv("BOT_WORKERS", "8"))
+        self.queue_size = int(os.getenv("BOT_QUEUE_SIZE", "100"))
+        # Лимиты исходящих сообщений: всего в секунду и в секунду на один чат
+        self.rate_limit = float(os.getenv("BOT_RATE_LIMIT", "30"))
+        self.chat_rate_limit = float(os.getenv("BOT_CHAT_RATE_LIMIT", "1"))
+        # Сколько воркер-процессов запускает launcher (по одной партиции Redis на процесс)
+        self.processes = int(os.getenv("BOT_PROCESSES", "2"))
+        # Сколько секунд ждать незавершённые обработчики при остановке
+        self.shutdown_timeout = float(os.getenv("BOT_SHUTDOWN_TIMEOUT", "30"))
+        # Режим получения апдейтов: polling (getUpdates) или webhook
+        self.mode = os.getenv("BOT_MODE", "polling").lower()
+        self.webhook_url = os.getenv("WEBHOOK_URL")
+        self.webhook_secret = os.getenv("WEBHOOK_SECRET")
+        self.webhook_host = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+        self.webhook_port = int(os.getenv("WEBHOOK_PORT", "8080"))
+        self.webhook_path = os.getenv("WEBHOOK_PATH", "/webhook")
+        if self.mode == "webhook" and not self.webhook_url:
+            raise ValueError("WEBHOOK_URL не задан!")
 
 
 class AppConfig:
@@ -39,6 +107,8 @@ class ApplicationConfig:
     def __init__(self):
         self.database = DatabaseConfig()
         self.redis = RedisConfig()
+        self.cache = CacheConfig()
+        self.ingest = IngestConfig()
         self.ml_service = MLServiceConfig()
         self.bot = BotConfig()
         self.app = AppConfig()
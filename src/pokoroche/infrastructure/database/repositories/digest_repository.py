@@ -109,3 +109,15 @@ class DigestRepository:
             return
         model.feedback_score = feedback_score
         await self.session.flush()
+
+
+class SessionDigestRepository:
+    """DigestRepository для конкурентных обработчиков: на каждый вызов своя сессия и commit"""
+
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+
+    async def update_feedback(self, digest_id: int, feedback_score: float) -> None:
+        async with self.session_factory() as session:
+            await DigestRepository(session).update_feedback(digest_id, feedback_score)
+            await session.commit()
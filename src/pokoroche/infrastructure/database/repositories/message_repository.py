@@ -39,6 +39,13 @@ class MessageRepository:
         await self.session.refresh(model)
         return message_model_to_entity(model)
 
+    async def save_many(self, messages: List[MessageEntity]) -> List[MessageEntity]:
+        """Сохранить пачку новых сообщений одним flush"""
+        models = [message_entity_to_model(m) for m in messages]
+        self.session.add_all(models)
+        await self.session.flush()
+        return [message_model_to_entity(m) for m in models]
+
     async def find_by_id(self, message_id: int) -> Optional[MessageEntity]:
         stmt = select(MessageModel).where(MessageModel.id == message_id)
         result = await self.session.execute(stmt)
@@ -107,3 +114,27 @@ class MessageRepository:
 
         filtered.sort(key=lambda x: (x.created_at or datetime.min), reverse=True)
         return [message_model_to_entity(m) for m in filtered]
+
+
+class SessionMessageRepository:
+    """MessageRepository для конкурентных обработчиков: на каждый вызов своя сессия и commit.
+
+    Одну AsyncSession нельзя использовать из нескольких задач одновременно,
+    а обработчики сообщений работают параллельно по чатам.
+    """
+
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+
+    async def save(self, message: MessageEntity) -> MessageEntity:
+        async with self.session_factory() as session:
+            saved = await MessageRepository(session).save(message)
+            await session.commit()
+            return saved
+
+    async def save_many(self, messages: List[MessageEntity]) -> List[MessageEntity]:
+        """Пачка сообщений - одна сессия, один flush и один commit"""
+        async with self.session_factory() as session:
+            saved = await MessageRepository(session).save_many(messages)
+            await session.commit()
+            return saved
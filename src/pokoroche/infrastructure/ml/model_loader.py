@@ -1,45 +1,102 @@
+import asyncio
 import pickle
-import aiofiles
+import hashlib
 from pathlib import Path
+from typing import Any, Optional
+
+MODEL_NAMES = ("topic_model", "importance_model")
+
+
+class LoadedModels:
+    """Снимок загруженных моделей одной версии; после создания не меняется"""
+
+    def __init__(self, topic_model: Any, importance_model: Any, version: str):
+        self.topic_model = topic_model
+        self.importance_model = importance_model
+        self.version = version
 
 
 class ModelLoader:
+    """Загрузка моделей из папки model_path.
+
+    Рядом с topic_model.pkl / importance_model.pkl могут лежать большие массивы
+    модели в виде <модель>.<атрибут>.npy (например importance_model.weights.npy).
+    Они не читаются в память, а отображаются через np.load(mmap_mode="r") и
+    подставляются атрибутами модели; процессы, созданные через fork после загрузки,
+    делят эти страницы, а не копируют их.
+
+    Новые файлы моделей нужно класть атомарно (запись во временный файл и rename).
+    """
+
     def __init__(self, model_path: str):
-        # Путь к папке или файлу с моделями
+        # Путь к папке с моделями
         self.model_path = model_path
-        # Атрибуты для моделей
-        self.topic_model = None
-        self.importance_model = None
+        # Текущий снимок моделей. Замена - одно присваивание, поэтому запросы,
+        # уже взявшие старый снимок, спокойно досчитываются на старой версии
+        self.models: Optional[LoadedModels] = None
+
+    @property
+    def topic_model(self) -> Any:
+        return self.models.topic_model if self.models else None
+
+    @property
+    def importance_model(self) -> Any:
+        return self.models.importance_model if self.models else None
+
+    @property
+    def model_version(self) -> Optional[str]:
+        return self.models.version if self.models else None
+
+    def artifact_version(self) -> str:
+        """Версия файлов моделей по их размеру и времени изменения (без чтения содержимого)"""
+        digest = hashlib.sha256()
+        for file in sorted(Path(self.model_path).glob("*_model*")):
+            stat = file.stat()
+            digest.update(f"{file.name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        return digest.hexdigest()[:12]
+
+    def _load_model(self, name: str) -> Any:
+        model_file = Path(self.model_path) / f"{name}.pkl"
+        # Проверяю, существует ли соответствующий файл
+        if not model_file.exists():
+            raise FileNotFoundError(f"Файл {name}.pkl не найден")
+        # pickle.load читает из файла потоком, без лишней копии всего файла в bytes
+        with open(model_file, "rb") as file:
+            model = pickle.load(file)
+        array_files = sorted(Path(self.model_path).glob(f"{name}.*.npy"))
+        if array_files:
+            import numpy as np
+
+            for array_file in array_files:
+                attr = array_file.name[len(name) + 1:-len(".npy")]
+                setattr(model, attr, np.load(array_file, mmap_mode="r"))
+        return model
+
+    def _load_snapshot(self) -> LoadedModels:
+        # Проверяю, существует ли путь к моделям
+        if not Path(self.model_path).exists():
+            raise FileNotFoundError("Путь к моделям не найден")
+        version = self.artifact_version()
+        models = {name: self._load_model(name) for name in MODEL_NAMES}
+        return LoadedModels(models["topic_model"], models["importance_model"], version)
 
     async def load_models(self) -> bool:
         try:
-            # Проверяю, существует ли путь к моделям
-            if not Path(self.model_path).exists():
-                # Если не существует, то выбрасываю соответствующее исключение
-                raise FileNotFoundError("Путь к моделям не найден")
-            # Загружаю модель для анализа тем
-            topic_model_file = Path(self.model_path) / "topic_model.pkl"
-            # Проверяю, существует ли соответствующий файл
-            if not topic_model_file.exists():
-                # Если не существует, то выбрасываю соответствующее исключение
-                raise FileNotFoundError("Файл topic_model.pkl не найден")
-            # Открываю файл (асинхронно) с моделью для чтения в бинарном режиме (тк pickle сохраняет объекты в специальном двоичном формате, а не как обычный текст)
-            async with aiofiles.open(topic_model_file, "rb") as file:
-                data = await file.read()
-            # Чтение бинарных данных (асинхронно) из файла и превращение их обратно в Python-объект (модель для анализа тем) и сохранение загруженной модели в атрибут
-            self.topic_model = pickle.loads(data)
-            # Загружаю модель для анализа важности сообщения
-            importance_model_file = Path(self.model_path) / "importance_model.pkl"
-            # Проверяю, существует ли соответствующий файл
-            if not importance_model_file.exists():
-                # Если не существует, то выбрасываю соответствующее исключение
-                raise FileNotFoundError("Файл importance_model.pkl не найден")
-            # Открываю файл (асинхронно) с моделью для чтения в бинарном режиме (тк pickle сохраняет объекты в специальном двоичном формате, а не как обычный текст)
-            async with aiofiles.open(importance_model_file, "rb") as file:
-                data = await file.read()
-                # Чтение бинарных данных (асинхронно) из файла и превращение их обратно в Python-объект (модель для анализа важности сообщения) и сохранение загруженной модели в атрибут
-            self.importance_model = pickle.loads(data)
-            return True
+            # Распаковка моделей - блокирующая операция, уводим её из event loop
+            models = await asyncio.to_thread(self._load_snapshot)
         except Exception as e:
-            print(f"Ошибка при запуске моделей:", e)
+            print("Ошибка при запуске моделей:", e)
+            return False
+        self.models = models
+        return True
+
+    async def reload_if_changed(self) -> bool:
+        """Перезагрузить модели, если файлы изменились. True - если загружена новая версия"""
+        try:
+            version = await asyncio.to_thread(self.artifact_version)
+        except OSError:
+            return False
+        if self.models is not None and version == self.models.version:
             return False
+        # При ошибке загрузки остаётся работать старая версия
+        return await self.load_models()
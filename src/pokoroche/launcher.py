@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import multiprocessing
+import signal
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.pokoroche.infrastructure.config.config import load_config
+from src.pokoroche.adapters.redis_client import RedisClient
+from src.pokoroche.adapters.update_offset_store import UpdateOffsetStore
+from src.pokoroche.adapters.update_queue import RedisUpdateQueue, UpdateQueueConsumer
+from src.pokoroche.main import Application, create_bot
+
+logger = logging.getLogger("pokoroche.launcher")
+
+
+async def run_poller(config) -> None:
+    """Поллер: получает апдейты от Telegram и раскладывает их по партициям в Redis"""
+    redis = RedisClient(config.redis.url)
+    await redis.connect()
+    update_queue = RedisUpdateQueue(redis, partitions=config.bot.processes)
+    bot = create_bot(config, update_queue=update_queue, offset_store=UpdateOffsetStore(redis))
+
+    def request_stop():
+        # Цикл getUpdates выйдет после текущего запроса, stop() сохранит offset
+        bot.is_running = False
+
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, request_stop)
+    loop.add_signal_handler(signal.SIGINT, request_stop)
+    try:
+        if config.bot.mode == "webhook":
+            await bot.start_webhook(
+                config.bot.webhook_url,
+                secret_token=config.bot.webhook_secret,
+                host=config.bot.webhook_host,
+                port=config.bot.webhook_port,
+                path=config.bot.webhook_path,
+            )
+        else:
+            await bot.start()
+    finally:
+        await bot.stop()
+        await redis.disconnect()
+
+
+async def run_worker(config, partition: int) -> None:
+    """Воркер: обрабатывает апдейты своей партиции обычными командами и обработчиками.
+
+    Здесь же работают MessageHandler и FeedbackHandler, то есть анализ
+    сообщений (ImportanceService/TopicService) распределён по процессам.
+    """
+    app = Application()
+    app.config = config
+    await app.setup()
+    update_queue = RedisUpdateQueue(app.redis, partitions=config.bot.processes)
+
+    # Отправляют сообщения все воркеры, поэтому общий лимит Bot API делим между ними
+    bot = create_bot(config, processes=config.bot.processes)
+    app.register_handlers(bot)
+    consumer = UpdateQueueConsumer(bot, update_queue, partition)
+
+    def request_stop():
+        consumer.is_running = False
+
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, request_stop)
+    loop.add_signal_handler(signal.SIGINT, request_stop)
+    try:
+        await consumer.run()
+    finally:
+        await consumer.stop()
+        await app.shutdown()
+
+
+def worker_main(partition: int) -> None:
+    asyncio.run(run_worker(load_config(), partition))
+
+
+def main():
+    config = load_config()
+    count = config.bot.processes
+    logger.info(f"Запуск поллера и {count} воркер-процессов")
+
+    ctx = multiprocessing.get_context("spawn")
+    workers = [
+        ctx.Process(target=worker_main, args=(partition,), name=f"pokoroche-worker-{partition}")
+        for partition in range(count)
+    ]
+    for process in workers:
+        process.start()
+
+    try:
+        asyncio.run(run_poller(config))
+    except KeyboardInterrupt:
+        logger.info("Остановлено пользователем")
+    finally:
+        # Воркеры дорабатывают уже полученные апдейты и выходят сами
+        for process in workers:
+            if process.is_alive():
+                process.terminate()
+        for process in workers:
+            process.join(timeout=config.bot.shutdown_timeout + 10)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,15 +2,33 @@ import asyncio
 import logging
 import sys
 from pathlib import Path
+from typing import Any, Callable, List, Optional
 
 sys.path.insert(0, str(Path(__file__).parent))
 
 from src.pokoroche.infrastructure.config.config import load_config
 from src.pokoroche.adapters.telegram_bot import TelegramBot
+from src.pokoroche.adapters.redis_client import RedisClient
+from src.pokoroche.adapters.message_queue import MessageQueue
+from src.pokoroche.adapters.ml_client import IMLClient, MLClient, CachedMLClient
+from src.pokoroche.adapters.local_ml_client import LocalMLClient
+from src.pokoroche.adapters.subscription_index import SubscriptionIndex
+from src.pokoroche.adapters.update_offset_store import UpdateOffsetStore
+from src.pokoroche.adapters.near_duplicate_index import NearDuplicateIndex
+from src.pokoroche.adapters.document_frequency_store import DocumentFrequencyStore
+from src.pokoroche.commands.feedback_handler import FeedbackHandler
+from src.pokoroche.commands.message_handler import MessageHandler
+from src.pokoroche.commands.message_ingestion import MessageIngestionWorker
 from src.pokoroche.commands.start_cmd import StartCommand
 from src.pokoroche.commands.subscribe_cmd import SubscribeCommand
 from src.pokoroche.commands.settings_cmd import SettingsCommand
 from src.pokoroche.commands.digest_cmd import DigestCommand
+from src.pokoroche.domain.services.analysis_service import AnalysisService
+from src.pokoroche.domain.services.importance_service import ImportanceService
+from src.pokoroche.domain.services.topic_service import TopicService
+from src.pokoroche.infrastructure.database.database import Database
+from src.pokoroche.infrastructure.database.repositories.digest_repository import SessionDigestRepository
+from src.pokoroche.infrastructure.database.repositories.message_repository import SessionMessageRepository
 
 
 logging.basicConfig(
@@ -21,6 +39,101 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def create_bot(config, processes: int = 1, **kwargs) -> TelegramBot:
+    """Создать TelegramBot с параметрами из конфигурации.
+
+    processes - сколько процессов отправляют сообщения от имени бота: общий
+    лимит Bot API делится между ними поровну.
+    """
+    return TelegramBot(
+        config.bot.token,
+        workers=config.bot.workers,
+        queue_size=config.bot.queue_size,
+        global_rate=config.bot.rate_limit / max(1, processes),
+        chat_rate=config.bot.chat_rate_limit,
+        shutdown_timeout=config.bot.shutdown_timeout,
+        api_base_url=config.bot.api_url,
+        **kwargs,
+    )
+
+
+def create_ml_client(config, redis_client=None) -> IMLClient:
+    """Создать ML клиент: локальные модели или HTTP сервис (с кешем, если передан Redis)"""
+    ml = config.ml_service
+    if ml.backend == "local":
+        return LocalMLClient(
+            ml.model_path,
+            workers=ml.local_workers,
+            batch_size=ml.batch_size,
+            batch_window=ml.batch_window_ms / 1000,
+            reload_interval=ml.model_reload_interval,
+        )
+    kwargs = dict(
+        timeout=ml.timeout,
+        connection_limit=ml.connection_limit,
+        keepalive_timeout=ml.keepalive_timeout,
+        batch_size=ml.batch_size,
+        batch_window=ml.batch_window_ms / 1000,
+        deadline=ml.deadline,
+        breaker_threshold=ml.breaker_threshold,
+        breaker_recovery=ml.breaker_recovery,
+    )
+    if redis_client is None:
+        return MLClient(ml.url, **kwargs)
+    return CachedMLClient(
+        ml.url,
+        redis_client,
+        l1_max_entries=config.cache.l1_max_entries,
+        l1_max_bytes=config.cache.l1_max_bytes,
+        l1_ttl=config.cache.l1_ttl,
+        distributed_lock=config.cache.distributed_lock,
+        lock_ttl=config.cache.lock_ttl,
+        fallback_ttl=config.cache.fallback_ttl,
+        namespace_refresh_interval=config.cache.namespace_refresh,
+        **kwargs,
+    )
+
+
+def create_duplicate_index(config) -> Optional[NearDuplicateIndex]:
+    """Индекс почти дубликатов для MessageHandler (None, если выключен)"""
+    if config.cache.dedup_max_entries <= 0:
+        return None
+    return NearDuplicateIndex(
+        max_entries=config.cache.dedup_max_entries,
+        threshold=config.cache.dedup_threshold,
+    )
+
+
+def create_ingestion_workers(config,
+                             message_queue,
+                             repository_factory: Callable[[], Any],
+                             importance_service,
+                             topic_service,
+                             duplicate_index=None) -> List[MessageIngestionWorker]:
+    """Пул воркеров приёма сообщений (пустой, если приём через очередь выключен).
+
+    repository_factory создаёт репозиторий для каждого воркера отдельно:
+    воркеры сохраняют пачки параллельно, общей сессии БД у них быть не должно.
+    """
+    ingest = config.ingest
+    if not ingest.enabled:
+        return []
+    return [
+        MessageIngestionWorker(
+            message_queue,
+            repository_factory(),
+            importance_service,
+            topic_service,
+            queue_name=ingest.queue,
+            batch_size=ingest.batch_size,
+            linger=ingest.linger_ms / 1000,
+            poll_timeout=ingest.poll_timeout,
+            duplicate_index=duplicate_index,
+        )
+        for _ in range(ingest.workers)
+    ]
+
+
 class InMemoryUserRepo:
     def __init__(self):
         self._users = {}
@@ -61,90 +174,150 @@ class InMemoryUserRepo:
     async def upsert(self, user):
         await self.insert(user)
 
+    async def get_all(self, limit=None):
+        return list(self._users.values())[:limit]
+
+    def subscriptions(self, users):
+        """Пары (telegram id, темы из settings) - для заполнения SubscriptionIndex"""
+        for user in users:
+            settings = user.get("settings") if isinstance(user, dict) else getattr(user, "settings", None)
+            topics = settings.get("topics") if isinstance(settings, dict) else None
+            user_id = self._key(user)
+            if user_id is not None and isinstance(topics, list):
+                yield user_id, topics
+
 
 class Application:
     def __init__(self):
         self.config = None
         self.bot = None
+        self.database = None
+        self.redis = None
+        self.ml_client = None
+        self.df_store = None
+        self.duplicate_index = None
+        self.message_handler = None
+        self.digest_repository = None
+        self.user_repository = InMemoryUserRepo()
+        self.subscription_index = None
+        self.ingestion_workers: List[MessageIngestionWorker] = []
+        self.ingestion_tasks: List[asyncio.Task] = []
 
     async def setup_database(self):
         logger.info("Инициализация базы данных...")
         logger.info(f"Подключение к БД: {self.config.database.url}")
+        self.database = Database(self.config.database.url)
+        await self.database.connect()
 
     async def setup_redis(self):
         logger.info("Инициализация Redis...")
         logger.info(f"Подключение к Redis: {self.config.redis.url}")
+        self.redis = RedisClient(self.config.redis.url)
+        await self.redis.connect()
+
+    async def setup_services(self):
+        """ML клиент, сервисы анализа и обработчик обычных сообщений"""
+        logger.info("Инициализация сервисов...")
+        # ML_BACKEND: локальные модели в пуле процессов или HTTP сервис с кешем в Redis
+        self.ml_client = create_ml_client(self.config, self.redis)
+        await self.ml_client.start()
+        importance_service = ImportanceService(self.ml_client)
+        # Частоты слов для TF-IDF оценки тем: общий снимок в Redis, приращения копятся в процессе
+        self.df_store = DocumentFrequencyStore(self.redis)
+        await self.df_store.load()
+        topic_service = TopicService(self.ml_client, self.df_store)
+        # Важность и темы одного сообщения - одним запросом к ML
+        analysis_service = AnalysisService(self.ml_client, importance_service, topic_service)
+        # Почти одинаковые тексты (пересылки) не отправляем в ML повторно
+        self.duplicate_index = create_duplicate_index(self.config)
+        # Обработчики и воркеры работают параллельно - у каждого вызова своя сессия БД
+        session_factory = self.database.session_factory
+        # INGEST_ENABLED: обработчик только ставит тексты в очередь, оценивают и сохраняют их воркеры пачками
+        message_queue = MessageQueue(self.redis) if self.config.ingest.enabled else None
+        self.message_handler = MessageHandler(
+            SessionMessageRepository(session_factory),
+            importance_service,
+            topic_service,
+            analysis_service=analysis_service,
+            duplicate_index=self.duplicate_index,
+            message_queue=message_queue,
+            queue_name=self.config.ingest.queue,
+        )
+        self.ingestion_workers = create_ingestion_workers(
+            self.config,
+            message_queue,
+            lambda: SessionMessageRepository(session_factory),
+            importance_service,
+            topic_service,
+            duplicate_index=self.duplicate_index,
+        )
+        self.ingestion_tasks = [asyncio.ensure_future(worker.run()) for worker in self.ingestion_workers]
+        self.digest_repository = SessionDigestRepository(session_factory)
+        # Обратный индекс подписок: что уже есть в Redis плюс подписки из настроек пользователей
+        self.subscription_index = SubscriptionIndex(self.redis)
+        await self.subscription_index.load()
+        users = await self.user_repository.get_all(limit=None)
+        await self.subscription_index.rebuild(self.user_repository.subscriptions(users))
+
+    async def setup(self):
+        """Всё, кроме бота: БД, Redis и сервисы (общее для Application и воркер-процессов)"""
+        await self.setup_database()
+        await self.setup_redis()
+        await self.setup_services()
+
+    async def stop_ingestion(self):
+        """Остановить воркеры приёма: текущие пачки дорабатываются, новые не берутся"""
+        for worker in self.ingestion_workers:
+            await worker.stop()
+        if self.ingestion_tasks:
+            # Воркер ждёт очередь не дольше poll_timeout, потом видит остановку
+            _, pending = await asyncio.wait(
+                self.ingestion_tasks, timeout=self.config.ingest.poll_timeout + self.config.bot.shutdown_timeout
+            )
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        self.ingestion_workers = []
+        self.ingestion_tasks = []
+
+    async def shutdown(self):
+        await self.stop_ingestion()
+        if self.duplicate_index is not None:
+            logger.info(f"Повторное использование оценок почти дубликатов: {self.duplicate_index.get_stats()}")
+        if self.df_store is not None:
+            try:
+                await self.df_store.persist()
+            except Exception as e:
+                print(f"Ошибка при сохранении частот слов: {e}")
+        if self.ml_client is not None:
+            await self.ml_client.close()
+        if self.redis is not None:
+            await self.redis.disconnect()
+        if self.database is not None:
+            await self.database.disconnect()
 
     async def setup_bot(self):
         logger.info("Инициализация Telegram бота...")
-<<<<<<< HEAD
-        
-        self.bot = TelegramBot(self.config.bot.token)
-
-        class StubRepository:
-            def __init__(self):
-                self.users = {}
-                
-            async def find_by_telegram_id(self, telegram_id):
-                return self.users.get(telegram_id)
-                
-            async def update(self, user):
-                if hasattr(user, 'telegram_id'):
-                    self.users[user.telegram_id] = user
-                elif isinstance(user, dict) and 'telegram_id' in user:
-                    self.users[user['telegram_id']] = user
-                    
-            async def insert(self, user):
-                if hasattr(user, 'telegram_id'):
-                    self.users[user.telegram_id] = user
-                elif isinstance(user, dict) and 'telegram_id' in user:
-                    self.users[user['telegram_id']] = user
-=======
-
-        from src.pokoroche.adapters.telegram_bot import TelegramBot
-        from src.pokoroche.commands.start_cmd import StartCommand
-        from src.pokoroche.commands.settings_cmd import SettingsCommand
-        from src.pokoroche.commands.digest_cmd import DigestCommand
-        from src.pokoroche.commands.subscribe_cmd import SubscribeCommand
-
-        self.bot = TelegramBot(self.config.bot.token)
-
-        user_repo = InMemoryUserRepo()
->>>>>>> dea9d23ace1ae033e25d20924634a8b2728cad0a
+        # Offset и обработанные апдейты в Redis: после рестарта продолжаем без потерь и повторов
+        self.bot = create_bot(self.config, offset_store=UpdateOffsetStore(self.redis))
+        self.register_handlers(self.bot)
+        logger.info("Бот инициализирован")
+
+    def register_handlers(self, bot):
+        user_repo = self.user_repository
 
         class StubDigestDelivery:
             async def execute(self, user_id):
                 return True
-<<<<<<< HEAD
-        
-        class StubTopicService:
-            async def extract_topics(self, text):
-                return ["тест"]
-
-        stub_repo = StubRepository()
-        stub_digest = StubDigestDelivery()
-        stub_topic_service = StubTopicService()
-
-        start_handler = StartCommand(self.bot, stub_repo)
-        subscribe_handler = SubscribeCommand(self.bot, stub_repo, stub_topic_service)
-        settings_handler = SettingsCommand(stub_repo)
-        digest_handler = DigestCommand(stub_digest)
-
-        self.bot.register_handler("/start", start_handler.handle)
-        self.bot.register_handler("/subscribe", subscribe_handler.handle)
-        self.bot.register_handler("/settings", settings_handler.handle)
-        self.bot.register_handler("/digest", digest_handler.handle)
-        
-=======
 
         class StubTopicService:
             async def list_available_topics(self):
                 return []
 
-        start_cmd = StartCommand(self.bot, user_repo)
+        start_cmd = StartCommand(bot, user_repo)
         settings_cmd = SettingsCommand(user_repo)
         digest_cmd = DigestCommand(StubDigestDelivery())
-        subscribe_cmd = SubscribeCommand(user_repository=user_repo, topic_service=StubTopicService())
+        subscribe_cmd = SubscribeCommand(bot, user_repo, StubTopicService(), self.subscription_index)
 
         async def start_handler(user_id, msg):
             reply = await start_cmd.handle(user_id, msg)
@@ -153,26 +326,42 @@ class Application:
                 await user_repo.insert({"telegram_id": user_id, "settings": {"topics": []}})
             return reply
 
-        self.bot.register_handler("/start", start_handler)
-        self.bot.register_handler("/settings", settings_cmd.handle)
-        self.bot.register_handler("/digest", digest_cmd.handle)
-        self.bot.register_handler("/subscribe", subscribe_cmd.handle)
+        bot.register_handler("/start", start_handler)
+        bot.register_handler("/settings", settings_cmd.handle)
+        bot.register_handler("/digest", digest_cmd.handle)
+        bot.register_handler("/subscribe", subscribe_cmd.handle)
 
->>>>>>> dea9d23ace1ae033e25d20924634a8b2728cad0a
-        logger.info("Бот инициализирован")
+        if self.message_handler is not None:
+            bot.register_message_handler(self.message_handler.handle)
+        if self.digest_repository is not None:
+            # FeedbackService пока не умеет process_feedback - оценка только сохраняется в дайджест
+            feedback_handler = FeedbackHandler(bot, self.digest_repository, None)
+            bot.register_feedback_handler(feedback_handler.handle)
 
     async def run(self):
         self.config = load_config()
         logger.info("Конфигурация загружена")
         logger.info(f"Токен бота: {self.config.bot.token[:10]}...")
 
-        await self.setup_database()
-        await self.setup_redis()
+        await self.setup()
         await self.setup_bot()
 
         logger.info("Все компоненты инициализированы")
         logger.info("Запуск бота...")
-        await self.bot.start()
+        try:
+            if self.config.bot.mode == "webhook":
+                await self.bot.start_webhook(
+                    self.config.bot.webhook_url,
+                    secret_token=self.config.bot.webhook_secret,
+                    host=self.config.bot.webhook_host,
+                    port=self.config.bot.webhook_port,
+                    path=self.config.bot.webhook_path,
+                )
+            else:
+                await self.bot.start()
+        finally:
+            await self.bot.stop()
+            await self.shutdown()
 
 
 def main():
@@ -0,0 +1,229 @@
+import asyncio
+import itertools
+import json
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+# Заглушка Telegram Bot API для нагрузочного тестирования бота без api.telegram.org.
+# Бот направляется сюда через TELEGRAM_API_URL=http://localhost:8081
+#
+# Управление:
+#   POST /_control/updates  - добавить апдейты в ленту (объект или список)
+#   POST /_control/config   - поменять latency / flood_rate / retry_after на лету
+#   GET  /_control/stats    - число апдейтов/ответов, p50/p99 задержки ответа
+#   GET  /_control/sent     - все отправленные ботом сообщения
+#   POST /_control/reset    - очистить ленту, отправленные сообщения и статистику
+
+
+STATE = web.AppKey("state", "FakeTelegramState")
+
+
+class FakeTelegramState:
+    def __init__(self, latency: float = 0.0, flood_rate: float = 0.0, retry_after: int = 1):
+        self.latency = latency  # задержка каждого ответа, секунды
+        self.flood_rate = flood_rate  # доля отправок, на которые отвечаем 429
+        self.retry_after = retry_after
+        self.reset()
+
+    def reset(self) -> None:
+        self.updates: List[Dict[str, Any]] = []
+        self.update_ids = itertools.count(1)
+        self.message_ids = itertools.count(1)
+        self.new_updates = asyncio.Event()
+        self.sent: List[Dict[str, Any]] = []
+        self.webhook: Optional[str] = None
+        self.commands: List[Dict[str, Any]] = []
+        # chat_id -> время поступления апдейтов, ещё не получивших ответа
+        self.awaiting_reply: Dict[int, List[float]] = {}
+        self.reply_latencies: List[float] = []
+        self.flood_responses = 0
+        self.delivered_updates = 0
+
+    def add_update(self, update: Dict[str, Any]) -> Dict[str, Any]:
+        update = dict(update)
+        update.setdefault("update_id", next(self.update_ids))
+        self.updates.append(update)
+        chat_id = _chat_id(update)
+        if chat_id is not None:
+            self.awaiting_reply.setdefault(chat_id, []).append(time.monotonic())
+        self.new_updates.set()
+        return update
+
+    def take_updates(self, offset: int, limit: int) -> List[Dict[str, Any]]:
+        # Как в Telegram: апдейты с id меньше offset считаются подтверждёнными
+        self.updates = [u for u in self.updates if u["update_id"] >= offset]
+        if not self.updates:
+            self.new_updates.clear()
+        return self.updates[:limit]
+
+    def record_reply(self, chat_id: int) -> None:
+        pending = self.awaiting_reply.get(chat_id)
+        if pending:
+            self.reply_latencies.append(time.monotonic() - pending.pop(0))
+
+    def stats(self) -> Dict[str, Any]:
+        latencies = sorted(self.reply_latencies)
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        return {
+            "delivered_updates": self.delivered_updates,
+            "pending_updates": len(self.updates),
+            "sent_messages": len(self.sent),
+            "flood_responses": self.flood_responses,
+            "replies": len(latencies),
+            "reply_latency_p50": percentile(0.5),
+            "reply_latency_p99": percentile(0.99),
+        }
+
+
+def _chat_id(update: Dict[str, Any]) -> Optional[int]:
+    msg = update.get("message")
+    if isinstance(update.get("callback_query"), dict):
+        msg = update["callback_query"].get("message")
+    if not isinstance(msg, dict) or not isinstance(msg.get("chat"), dict):
+        return None
+    chat_id = msg["chat"].get("id")
+    return chat_id if isinstance(chat_id, int) else None
+
+
+def ok(result: Any) -> web.Response:
+    return web.json_response({"ok": True, "result": result})
+
+
+async def call_method(request: web.Request) -> web.Response:
+    state: FakeTelegramState = request.app[STATE]
+    method = request.match_info["method"]
+    try:
+        payload = await request.json() if request.can_read_body else {}
+    except ValueError:
+        payload = {}
+
+    if state.latency:
+        await asyncio.sleep(state.latency)
+
+    if method == "getUpdates":
+        offset = int(payload.get("offset") or 0)
+        limit = int(payload.get("limit") or 100)
+        timeout = float(payload.get("timeout") or 0)
+        updates = state.take_updates(offset, limit)
+        if not updates and timeout > 0:
+            try:
+                await asyncio.wait_for(state.new_updates.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            updates = state.take_updates(offset, limit)
+        state.delivered_updates += len(updates)
+        return ok(updates)
+
+    if method in ("sendMessage", "editMessageReplyMarkup") and random.random() < state.flood_rate:
+        state.flood_responses += 1
+        return web.json_response(
+            {
+                "ok": False,
+                "error_code": 429,
+                "description": f"Too Many Requests: retry after {state.retry_after}",
+                "parameters": {"retry_after": state.retry_after},
+            },
+            status=429,
+        )
+
+    if method == "sendMessage":
+        chat_id = payload.get("chat_id")
+        message = {
+            "message_id": next(state.message_ids),
+            "date": int(time.time()),
+            "chat": {"id": chat_id},
+            "text": payload.get("text", ""),
+        }
+        if "reply_markup" in payload:
+            message["reply_markup"] = payload["reply_markup"]
+        state.sent.append(message)
+        if isinstance(chat_id, int):
+            state.record_reply(chat_id)
+        return ok(message)
+
+    if method == "editMessageReplyMarkup":
+        return ok(True)
+    if method == "answerCallbackQuery":
+        return ok(True)
+    if method == "setMyCommands":
+        state.commands = list(payload.get("commands") or [])
+        return ok(True)
+    if method == "deleteWebhook":
+        state.webhook = None
+        if payload.get("drop_pending_updates"):
+            state.updates = []
+        return ok(True)
+    if method == "setWebhook":
+        state.webhook = payload.get("url")
+        return ok(True)
+
+    return web.json_response({"ok": False, "error_code": 404, "description": "Not Found"}, status=404)
+
+
+async def add_updates(request: web.Request) -> web.Response:
+    state: FakeTelegramState = request.app[STATE]
+    data = await request.json()
+    items = data if isinstance(data, list) else [data]
+    added = [state.add_update(u) for u in items if isinstance(u, dict)]
+    return web.json_response({"added": len(added), "update_ids": [u["update_id"] for u in added]})
+
+
+async def update_config(request: web.Request) -> web.Response:
+    state: FakeTelegramState = request.app[STATE]
+    data = await request.json()
+    state.latency = float(data.get("latency", state.latency))
+    state.flood_rate = float(data.get("flood_rate", state.flood_rate))
+    state.retry_after = int(data.get("retry_after", state.retry_after))
+    return web.json_response(
+        {"latency": state.latency, "flood_rate": state.flood_rate, "retry_after": state.retry_after}
+    )
+
+
+async def get_stats(request: web.Request) -> web.Response:
+    return web.json_response(request.app[STATE].stats())
+
+
+async def get_sent(request: web.Request) -> web.Response:
+    return web.json_response(request.app[STATE].sent)
+
+
+async def reset(request: web.Request) -> web.Response:
+    request.app[STATE].reset()
+    return web.json_response({"ok": True})
+
+
+def create_app(state: Optional[FakeTelegramState] = None, updates_file: Optional[str] = None) -> web.Application:
+    app = web.Application()
+    app[STATE] = state or FakeTelegramState(
+        latency=float(os.getenv("FAKE_TG_LATENCY", "0")),
+        flood_rate=float(os.getenv("FAKE_TG_FLOOD_RATE", "0")),
+        retry_after=int(os.getenv("FAKE_TG_RETRY_AFTER", "1")),
+    )
+    # Сценарий апдейтов: JSON-список, который сразу попадает в ленту getUpdates
+    updates_file = updates_file or os.getenv("FAKE_TG_UPDATES_FILE")
+    if updates_file:
+        with open(updates_file, encoding="utf-8") as f:
+            for update in json.load(f):
+                app[STATE].add_update(update)
+
+    app.router.add_post("/bot{token}/{method}", call_method)
+    app.router.add_get("/bot{token}/{method}", call_method)
+    app.router.add_post("/_control/updates", add_updates)
+    app.router.add_post("/_control/config", update_config)
+    app.router.add_get("/_control/stats", get_stats)
+    app.router.add_get("/_control/sent", get_sent)
+    app.router.add_post("/_control/reset", reset)
+    return app
+
+
+if __name__ == "__main__":
+    web.run_app(create_app(), host="0.0.0.0", port=int(os.getenv("PORT", "8081")))
@@ -0,0 +1,69 @@
+"""Микробенчмарк предобработки текста: старая посимвольная версия против text_processing.
+
+Запуск из корня репозитория:
+    python tests/benchmarks/bench_text_processing.py
+"""
+import random
+import re
+import sys
+import timeit
+import unicodedata
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.pokoroche.domain.services.text_processing import (  # noqa: E402
+    extract_keywords,
+    normalize_text,
+    remove_invisible_chars,
+)
+
+WORDS = (
+    "завтра собрание команды обсуждаем релиз новой версии бота дедлайн перенесли "
+    "СРОЧНО проверьте отчёт по продажам и ответьте до вечера пожалуйста"
+).split()
+
+
+def old_prepare_text(text):
+    text = unicodedata.normalize("NFC", text.strip())
+    return "".join(c for c in text if unicodedata.category(c) not in ("Cc", "Cf"))
+
+
+def old_keywords(text):
+    allowed_chars = re.compile(r"[^a-zA-Zа-яА-ЯёЁ0-9-]")
+    words = {allowed_chars.sub("", word) for word in text.strip().lower().split()}
+    return [word for word in words if len(word) > 4]
+
+
+def make_texts(count, words_per_text, seed=1):
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(words_per_text)) + "\u200b!"
+        for _ in range(count)
+    ]
+
+
+def bench(name, fn, texts, number=5):
+    seconds = min(timeit.repeat(lambda: [fn(t) for t in texts], number=1, repeat=number))
+    print(f"{name:<40} {seconds * 1000:8.1f} ms")
+    return seconds
+
+
+def main():
+    texts = make_texts(200, 500)  # 200 длинных русских текстов по ~4 КБ
+
+    print(f"{len(texts)} текстов, в среднем {sum(map(len, texts)) // len(texts)} символов")
+    old = bench("prepare_text: unicodedata.category", old_prepare_text, texts)
+    new = bench("prepare_text: класс символов (без кеша)", normalize_text.__wrapped__, texts)
+    normalize_text.cache_clear()
+    [normalize_text(t) for t in texts]
+    cached = bench("prepare_text: класс символов (кеш LRU)", normalize_text, texts)
+    print(f"ускорение: {old / new:.1f}x без кеша, {old / cached:.0f}x на повторах")
+
+    old = bench("keywords: re.compile на каждый вызов", old_keywords, texts)
+    new = bench("keywords: один проход готовой регуляркой", extract_keywords, texts)
+    print(f"ускорение: {old / new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
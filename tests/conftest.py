@@ -1,9 +1,12 @@
+import asyncio
 import pytest
+from collections import defaultdict
 
 class FakeRedis:
     def __init__(self):
         self.storage = {}
-        self.queue = []
+        self.queues = defaultdict(list)
+        self.sets = defaultdict(set)
 
     async def get(self, key):
         return self.storage.get(key)
@@ -12,17 +15,88 @@ class FakeRedis:
         self.storage[key] = value
         return True
 
+    async def mget(self, keys):
+        return [self.storage.get(key) for key in keys]
+
+    async def set_many(self, items, expire=None):
+        self.storage.update(items)
+        return True
+
+    async def set_if_absent(self, key, value, expire=None):
+        if key in self.storage:
+            return False
+        self.storage[key] = value
+        return True
+
+    async def delete(self, key):
+        return self.storage.pop(key, None) is not None
+
+    async def delete_if_equals(self, key, value):
+        if self.storage.get(key) != value:
+            return False
+        del self.storage[key]
+        return True
+
+    async def sadd(self, key, *members):
+        added = set(members) - self.sets[key]
+        self.sets[key].update(members)
+        return len(added)
+
+    async def srem(self, key, *members):
+        removed = set(members) & self.sets[key]
+        self.sets[key].difference_update(members)
+        return len(removed)
+
+    async def smembers(self, key):
+        return set(self.sets[key])
+
+    async def sunion(self, keys):
+        return set().union(*(self.sets[key] for key in keys))
+
     async def rpush(self, key, value):
-        self.queue.append(value)
-        return len(self.queue)
+        self.queues[key].append(value)
+        return len(self.queues[key])
 
     async def lpop(self, key):
-        if not self.queue:
+        if not self.queues[key]:
             return None
-        return self.queue.pop(0)
+        return self.queues[key].pop(0)
+
+    async def lpop_many(self, key, count):
+        items = self.queues[key][:count]
+        del self.queues[key][:count]
+        return items
 
     async def llen(self, key):
-        return len(self.queue)
+        return len(self.queues[key])
+
+    async def blpop(self, key, timeout=0):
+        if not self.queues[key]:
+            # Настоящий BLPOP ждёт появления элемента - имитируем короткое ожидание
+            await asyncio.sleep(0.01)
+        return await self.lpop(key)
+
+    async def lmove(self, source, destination, src="LEFT", dest="RIGHT"):
+        if not self.queues[source]:
+            return None
+        value = self.queues[source].pop(0 if src == "LEFT" else -1)
+        if dest == "LEFT":
+            self.queues[destination].insert(0, value)
+        else:
+            self.queues[destination].append(value)
+        return value
+
+    async def blmove(self, source, destination, timeout=0):
+        if not self.queues[source]:
+            await asyncio.sleep(0.01)
+        return await self.lmove(source, destination)
+
+    async def lrem(self, key, value, count=1):
+        removed = 0
+        while value in self.queues[key] and removed < count:
+            self.queues[key].remove(value)
+            removed += 1
+        return removed
 
 
 @pytest.fixture
@@ -0,0 +1,65 @@
+import asyncio
+import pytest
+from aiohttp.test_utils import TestServer
+from unittest.mock import AsyncMock
+from src.pokoroche.adapters.telegram_bot import TelegramBot
+from telegram_mock.main import FakeTelegramState, create_app
+
+
+def command_update(chat_id, text="/digest"):
+    return {"message": {"message_id": 1, "date": 1700000000, "text": text, "chat": {"id": chat_id}, "from": {"id": chat_id}}}
+
+
+async def wait_for(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_bot_replies_through_fake_telegram():
+    state = FakeTelegramState()
+    server = TestServer(create_app(state))
+    await server.start_server()
+
+    bot = TelegramBot("token", api_base_url=str(server.make_url("")))
+    bot.register_handler("/digest", AsyncMock(return_value="Дайджест отправлен."))
+    polling = asyncio.create_task(bot.start())
+    try:
+        # Без offset_store бот при старте сбрасывает накопившиеся апдейты
+        await wait_for(lambda: bot.is_running)
+        for chat_id in (1, 2, 3):
+            state.add_update(command_update(chat_id))
+        await wait_for(lambda: len(state.sent) == 3)
+    finally:
+        await bot.stop()
+        await polling
+        await server.close()
+
+    stats = state.stats()
+    assert stats["delivered_updates"] == 3
+    assert stats["replies"] == 3
+    assert stats["reply_latency_p99"] is not None
+    assert [c["command"] for c in state.commands][:1] == ["start"]
+
+
+@pytest.mark.asyncio
+async def test_bot_retries_injected_flood_errors():
+    state = FakeTelegramState(flood_rate=1.0, retry_after=0)
+    server = TestServer(create_app(state))
+    await server.start_server()
+
+    bot = TelegramBot("token", api_base_url=str(server.make_url("")), max_send_retries=10)
+    try:
+        send = asyncio.create_task(bot.send_message(1, "привет"))
+        await wait_for(lambda: state.flood_responses >= 2)
+        state.flood_rate = 0.0
+        assert await send is True
+    finally:
+        await bot.stop()
+        await server.close()
+
+    assert len(state.sent) == 1
+    assert bot.rate_limiter.get_stats()["retries"] >= 2
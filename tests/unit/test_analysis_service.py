@@ -0,0 +1,33 @@
+import pytest
+from unittest.mock import AsyncMock
+from src.pokoroche.domain.services.analysis_service import AnalysisService
+from src.pokoroche.domain.services.importance_service import ImportanceService
+from src.pokoroche.domain.services.topic_service import TopicService
+
+
+def make_service(ml_client):
+    return AnalysisService(ml_client, ImportanceService(ml_client), TopicService(ml_client))
+
+
+@pytest.mark.asyncio
+async def test_analysis_service_single_ml_call():
+    ml_client = AsyncMock()
+    ml_client.analyze = AsyncMock(return_value={"importance": 1.7, "topics": ["Релиз!", "релиз", 5]})
+    service = make_service(ml_client)
+
+    result = await service.analyze("  Релиз\u200b завтра  ", context={"chat": "dev"})
+
+    ml_client.analyze.assert_awaited_once_with("Релиз завтра", {"chat": "dev"})
+    ml_client.analyze_importance.assert_not_awaited()
+    ml_client.extract_topics.assert_not_awaited()
+    assert result == {"importance": 1.0, "topics": ["релиз"]}
+
+
+@pytest.mark.asyncio
+async def test_analysis_service_empty_text_and_ml_error():
+    ml_client = AsyncMock()
+    ml_client.analyze = AsyncMock(side_effect=RuntimeError("down"))
+    service = make_service(ml_client)
+
+    assert await service.analyze("   ") == {"importance": 0.0, "topics": []}
+    assert await service.analyze("текст") == {"importance": 0.0, "topics": []}
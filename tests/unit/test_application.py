@@ -0,0 +1,143 @@
+import json
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from src.pokoroche.adapters.local_ml_client import LocalMLClient
+from src.pokoroche.adapters.ml_client import CachedMLClient, MLClient
+from src.pokoroche.main import Application, create_bot, create_ml_client
+
+
+def make_config(**bot):
+    bot_config = dict(
+        token="token", workers=2, queue_size=10, rate_limit=30.0, chat_rate_limit=1.0,
+        shutdown_timeout=1.0, api_url="https://api.telegram.org",
+    )
+    bot_config.update(bot)
+    return SimpleNamespace(bot=SimpleNamespace(**bot_config))
+
+
+def test_create_bot_splits_global_rate_between_processes():
+    single = create_bot(make_config())
+    shared = create_bot(make_config(), processes=3)
+
+    assert single.rate_limiter.global_bucket.rate == 30.0
+    assert shared.rate_limiter.global_bucket.rate == 10.0
+
+
+def test_register_handlers_wires_message_and_feedback_handlers():
+    app = Application()
+    app.message_handler = AsyncMock()
+    app.digest_repository = AsyncMock()
+    bot = create_bot(make_config())
+
+    app.register_handlers(bot)
+
+    assert bot.message_handler == app.message_handler.handle
+    assert bot.feedback_handler is not None
+    assert "/start" in bot.handlers
+
+
+def make_ml_config(backend="remote"):
+    ml = SimpleNamespace(
+        backend=backend, url="http://ml", model_path="models", local_workers=1, model_reload_interval=0,
+        timeout=5, connection_limit=10, keepalive_timeout=5, batch_size=8, batch_window_ms=0,
+        deadline=5, breaker_threshold=3, breaker_recovery=5,
+    )
+    cache = SimpleNamespace(
+        l1_max_entries=10, l1_max_bytes=1024, l1_ttl=5, distributed_lock=False, lock_ttl=1,
+        fallback_ttl=5, namespace_refresh=5, dedup_max_entries=100, dedup_threshold=0.8,
+    )
+    ingest = SimpleNamespace(enabled=False, queue="messages:ingest", workers=2, batch_size=10, linger_ms=5, poll_timeout=0)
+    return SimpleNamespace(ml_service=ml, cache=cache, ingest=ingest, bot=SimpleNamespace(shutdown_timeout=1.0))
+
+
+def test_create_ml_client_selects_backend(fake_redis):
+    config = make_ml_config()
+
+    assert isinstance(create_ml_client(config, fake_redis), CachedMLClient)
+    assert type(create_ml_client(config)) is MLClient
+    config.ml_service.backend = "local"
+    assert isinstance(create_ml_client(config, fake_redis), LocalMLClient)
+
+
+@pytest.mark.asyncio
+async def test_setup_services_loads_document_frequencies(fake_redis):
+    await fake_redis.set("topics:df", json.dumps({"documents": 7, "df": {"релиз": 3}}))
+    app = Application()
+    app.config = make_ml_config()
+    app.redis = fake_redis
+    app.database = SimpleNamespace(session_factory=None)
+
+    await app.setup_services()
+    try:
+        topic_service = app.message_handler.topic_service
+        assert topic_service.df_store is app.df_store
+        analysis_service = app.message_handler.analysis_service
+        assert analysis_service.ml_client is app.ml_client
+        assert analysis_service.topic_service is topic_service
+        assert app.df_store.documents == 7
+        assert app.df_store.df["релиз"] == 3
+        assert app.message_handler.duplicate_index is app.duplicate_index
+        assert app.duplicate_index.max_entries == 100
+    finally:
+        await app.ml_client.close()
+
+
+@pytest.mark.asyncio
+async def test_setup_services_starts_ingestion_workers(fake_redis):
+    app = Application()
+    app.config = make_ml_config()
+    app.config.ingest.enabled = True
+    app.redis = fake_redis
+    app.database = SimpleNamespace(session_factory=None)
+
+    await app.setup_services()
+    try:
+        assert app.message_handler.message_queue is not None
+        assert len(app.ingestion_tasks) == 2
+        assert all(not task.done() for task in app.ingestion_tasks)
+        # У каждого воркера свой репозиторий
+        repositories = {id(worker.message_repository) for worker in app.ingestion_workers}
+        assert len(repositories) == 2
+    finally:
+        await app.stop_ingestion()
+        await app.ml_client.close()
+
+    assert app.ingestion_tasks == []
+
+
+@pytest.mark.asyncio
+async def test_setup_services_loads_and_seeds_subscription_index(fake_redis):
+    await fake_redis.sadd("subscriptions:topics", "спорт")
+    await fake_redis.sadd("subscriptions:topic:спорт", "2")
+    app = Application()
+    app.config = make_ml_config()
+    app.redis = fake_redis
+    app.database = SimpleNamespace(session_factory=None)
+    await app.user_repository.insert({"telegram_id": 1, "settings": {"topics": ["Релиз"]}})
+
+    await app.setup_services()
+    try:
+        index = app.subscription_index
+        assert index.redis is fake_redis
+        assert index.subscribers(["спорт"]) == {2}
+        assert index.subscribers(["релиз"]) == {1}
+
+        bot = create_bot(make_config())
+        app.register_handlers(bot)
+        await bot.handlers["/subscribe"](1, {"text": "/subscribe add Спорт"})
+        assert index.subscribers(["спорт"]) == {1, 2}
+    finally:
+        await app.ml_client.close()
+
+
+@pytest.mark.asyncio
+async def test_setup_bot_persists_update_offset(fake_redis):
+    app = Application()
+    app.config = make_config()
+    app.redis = fake_redis
+
+    await app.setup_bot()
+
+    assert app.bot.offset_store is not None
+    assert app.bot.offset_store.redis is fake_redis
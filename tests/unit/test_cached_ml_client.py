@@ -1,3 +1,5 @@
+import asyncio
+from unittest.mock import AsyncMock
 import pytest
 from src.pokoroche.adapters.ml_client import CachedMLClient
 
@@ -20,3 +22,216 @@ async def test_ml_client_cache(fake_redis):
 
     assert result1 == result2
     assert ml_client.calls == 1
+
+
+class CountingMLClient(CachedMLClient):
+    def __init__(self, redis_client, **kwargs):
+        kwargs.setdefault("model_version", "test")
+        super().__init__("http://fake-ml", redis_client, **kwargs)
+        self.calls = 0
+
+    async def _post_json(self, path, payload):
+        self.calls += 1
+        return {"importance": 0.5}
+
+
+@pytest.mark.asyncio
+async def test_ml_client_serves_hot_texts_from_memory(fake_redis):
+    ml_client = CountingMLClient(fake_redis)
+
+    for _ in range(3):
+        assert await ml_client.analyze_importance("hello") == 0.5
+
+    stats = ml_client.get_cache_stats()
+    assert ml_client.calls == 1
+    assert stats["l1"]["hits"] == 2
+    assert stats["redis"] == {"hits": 0, "misses": 1}
+
+
+@pytest.mark.asyncio
+async def test_ml_client_warms_memory_from_redis(fake_redis):
+    first = CountingMLClient(fake_redis)
+    await first.analyze_importance("hello")
+
+    # Другой процесс: L1 пуст, значение берётся из Redis и дальше из памяти
+    second = CountingMLClient(fake_redis)
+    assert await second.analyze_importance("hello") == 0.5
+    assert await second.analyze_importance("hello") == 0.5
+
+    stats = second.get_cache_stats()
+    assert second.calls == 0
+    assert stats["redis"]["hits"] == 1
+    assert stats["l1"]["hits"] == 1
+
+
+class SlowMLClient(CachedMLClient):
+    def __init__(self, redis_client, **kwargs):
+        kwargs.setdefault("model_version", "test")
+        super().__init__("http://fake-ml", redis_client, **kwargs)
+        self.calls = 0
+
+    async def _post_json(self, path, payload):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return {"importance": 0.8, "topics": ["анонс"]}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_ml_call(fake_redis):
+    ml_client = SlowMLClient(fake_redis)
+
+    scores = await asyncio.gather(*(ml_client.analyze_importance("анонс") for _ in range(10)))
+    topics = await asyncio.gather(*(ml_client.extract_topics("анонс") for _ in range(5)))
+
+    assert scores == [0.8] * 10
+    assert topics == [["анонс"]] * 5
+    assert ml_client.calls == 2
+    assert ml_client.get_cache_stats()["coalesced"] == 13
+    assert ml_client.in_flight == {}
+
+
+@pytest.mark.asyncio
+async def test_processes_share_ml_call_through_redis_lock(fake_redis):
+    first = SlowMLClient(fake_redis, distributed_lock=True, lock_poll_interval=0.01)
+    second = SlowMLClient(fake_redis, distributed_lock=True, lock_poll_interval=0.01)
+
+    scores = await asyncio.gather(first.analyze_importance("анонс"), second.analyze_importance("анонс"))
+
+    assert scores == [0.8, 0.8]
+    assert first.calls + second.calls == 1
+    assert not any(key.startswith("lock:") for key in fake_redis.storage)
+
+
+
+@pytest.mark.asyncio
+async def test_expired_lock_holder_keeps_foreign_lock(fake_redis):
+    ml_client = SlowMLClient(fake_redis, distributed_lock=True)
+    task = asyncio.ensure_future(ml_client.analyze_importance("анонс"))
+    await asyncio.sleep(0.01)
+    lock_key = next(key for key in fake_redis.storage if key.startswith("lock:"))
+    # TTL истёк, блокировку взял другой процесс
+    fake_redis.storage[lock_key] = "other-owner"
+
+    assert await task == 0.8
+    assert fake_redis.storage[lock_key] == "other-owner"
+
+
+class BatchMLClient(CachedMLClient):
+    def __init__(self, redis_client, **kwargs):
+        kwargs.setdefault("model_version", "test")
+        super().__init__("http://fake-ml", redis_client, **kwargs)
+        self.batches = []
+
+    async def _post_json(self, path, payload):
+        self.batches.append(payload["texts"])
+        return {"importances": [len(t) / 10 for t in payload["texts"]]}
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_uses_one_mget_and_one_pipeline(fake_redis):
+    ml_client = BatchMLClient(fake_redis)
+    await fake_redis.set(ml_client._generate_cache_key("a", "importance"), "0.9")
+    fake_redis.mget = AsyncMock(wraps=fake_redis.mget)
+    fake_redis.set_many = AsyncMock(wraps=fake_redis.set_many)
+
+    scores = await ml_client.batch_analyze_importance(["a", "bb", "ccc", "bb"])
+
+    assert scores == [0.9, 0.2, 0.3, 0.2]
+    assert ml_client.batches == [["bb", "ccc"]]
+    fake_redis.mget.assert_awaited_once()
+    fake_redis.set_many.assert_awaited_once()
+
+    # Повторная пачка целиком берётся из памяти процесса
+    assert await ml_client.batch_analyze_importance(["bb", "ccc"]) == [0.2, 0.3]
+    assert fake_redis.mget.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_keys_change_with_model_version_and_invalidation(fake_redis):
+    old = CountingMLClient(fake_redis, model_version="v1")
+    await old.analyze_importance("hello")
+
+    new = CountingMLClient(fake_redis, model_version="v2")
+    await new.analyze_importance("hello")
+    assert new.calls == 1
+
+    await old.invalidate_cache()
+    await old.analyze_importance("hello")
+    assert old.calls == 2
+    assert old.namespace.startswith("ml:v1:n1:g")
+    assert old.namespace != "ml:v1:n1:g0"
+
+
+class DownMLClient(CachedMLClient):
+    def __init__(self, redis_client, **kwargs):
+        super().__init__("http://fake-ml", redis_client, model_version="test", **kwargs)
+
+    async def _post_json(self, path, payload):
+        return None
+
+
+@pytest.mark.asyncio
+async def test_fallback_results_cached_briefly(fake_redis):
+    fake_redis.set = AsyncMock(wraps=fake_redis.set)
+    ml_client = DownMLClient(fake_redis, fallback_ttl=5)
+
+    await ml_client.analyze_importance("СРОЧНО!")
+
+    fake_redis.set.assert_awaited_once()
+    assert fake_redis.set.await_args.kwargs["expire"] == 5
+
+
+@pytest.mark.asyncio
+async def test_fallback_results_not_cached_with_zero_ttl(fake_redis):
+    fake_redis.set = AsyncMock(wraps=fake_redis.set)
+    fake_redis.set_many = AsyncMock(wraps=fake_redis.set_many)
+    ml_client = DownMLClient(fake_redis, fallback_ttl=0)
+
+    await ml_client.analyze_importance("СРОЧНО!")
+    await ml_client.batch_analyze_importance(["СРОЧНО!", "привет"])
+    await ml_client.analyze("привет")
+
+    fake_redis.set.assert_not_awaited()
+    fake_redis.set_many.assert_not_awaited()
+    assert ml_client.l1.get_stats()["entries"] == 0
+
+
+class VersionedMLClient(CountingMLClient):
+    def __init__(self, redis_client, versions, **kwargs):
+        super().__init__(redis_client, model_version=None, namespace_refresh_interval=0, **kwargs)
+        self.fetch_model_version = AsyncMock(side_effect=versions)
+
+
+@pytest.mark.asyncio
+async def test_namespace_keeps_last_version_when_health_fails(fake_redis):
+    ml_client = VersionedMLClient(fake_redis, ["v1", None, None])
+
+    await ml_client.analyze_importance("hello")
+    assert ml_client.namespace.startswith("ml:v1:")
+
+    # /health недоступен: пространство ключей и L1 остаются прежними
+    await ml_client.analyze_importance("hello")
+    await ml_client.namespace_task
+    assert await ml_client.analyze_importance("hello") == 0.5
+    assert ml_client.namespace.startswith("ml:v1:")
+    assert ml_client.calls == 1
+    await ml_client.close()
+
+
+@pytest.mark.asyncio
+async def test_namespace_refresh_does_not_block_calls(fake_redis):
+    versions = ["v1"]
+
+    async def fetch_version(timeout=None):
+        if versions:
+            return versions.pop()
+        # Повисший ML сервис
+        await asyncio.Event().wait()
+
+    ml_client = VersionedMLClient(fake_redis, fetch_version)
+
+    await ml_client.analyze_importance("hello")
+    # Повторное обновление висит в фоне, вызовы отвечают из кеша сразу
+    assert await asyncio.wait_for(ml_client.analyze_importance("hello"), timeout=0.5) == 0.5
+    assert ml_client.namespace.startswith("ml:v1:")
+    await ml_client.close()
@@ -0,0 +1,36 @@
+import time
+from src.pokoroche.adapters.circuit_breaker import CircuitBreaker
+
+
+def test_breaker_opens_after_threshold_and_recovers():
+    changes = []
+    breaker = CircuitBreaker(
+        "ml", failure_threshold=2, recovery_timeout=0.05,
+        on_state_change=lambda name, old, new: changes.append((old, new)),
+    )
+
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    time.sleep(0.06)
+    # Пропускается ровно один пробный запрос
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow_request()
+    breaker.record_success()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert changes == [("closed", "open"), ("open", "half_open"), ("half_open", "closed")]
+    assert breaker.get_status()["rejected"] == 2
+
+
+def test_failed_probe_reopens_breaker():
+    breaker = CircuitBreaker("ml", failure_threshold=1, recovery_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
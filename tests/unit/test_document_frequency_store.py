@@ -0,0 +1,35 @@
+import pytest
+from src.pokoroche.adapters.document_frequency_store import DocumentFrequencyStore
+
+
+def test_idf_and_common_terms():
+    store = DocumentFrequencyStore(min_documents=4)
+    for tokens in (["привет", "релиз"], ["привет", "встреча"], ["привет"], ["привет", "привет"]):
+        store.add_document(tokens)
+
+    assert store.df["привет"] == 4
+    assert store.idf("релиз") > store.idf("привет")
+    assert store.is_common("привет")
+    assert not store.is_common("релиз")
+
+
+@pytest.mark.asyncio
+async def test_processes_merge_counts_through_redis(fake_redis):
+    first = DocumentFrequencyStore(fake_redis, persist_every=2)
+    second = DocumentFrequencyStore(fake_redis, persist_every=2)
+
+    first.add_document(["релиз"])
+    await first.maybe_persist()
+    assert await fake_redis.get("topics:df") is None
+
+    first.add_document(["релиз", "дедлайн"])
+    await first.maybe_persist()
+    second.add_document(["дедлайн"])
+    await second.persist()
+
+    assert second.documents == 3
+    assert second.df == {"релиз": 2, "дедлайн": 2}
+
+    fresh = DocumentFrequencyStore(fake_redis)
+    await fresh.load()
+    assert fresh.documents == 3
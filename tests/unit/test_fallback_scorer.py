@@ -0,0 +1,41 @@
+import random
+import pytest
+from src.pokoroche.adapters.fake_ml_client import FakeMLClient
+from src.pokoroche.adapters.fallback_scorer import batch_fallback_importance
+from src.pokoroche.adapters.ml_client import MLClient
+
+
+def random_texts(count, seed=42):
+    rng = random.Random(seed)
+    alphabet = "abcXYZабвГДЁ  !?.,1\n\tⒶ𝐀😀"
+    return [
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 400)))
+        for _ in range(count)
+    ]
+
+
+def test_batch_scorer_matches_single_text_heuristic():
+    texts = random_texts(500) + ["", "   ", "СРОЧНО!", "привет", "A" * 1000]
+    client = MLClient("http://unused")
+
+    expected = [client._fallback_importance(text) for text in texts]
+
+    assert batch_fallback_importance(texts) == expected
+    assert batch_fallback_importance([]) == []
+
+
+def test_batch_scorer_handles_lone_surrogates():
+    texts = ["\ud83d", "ВАЖНО \ud83d!", "ok \udc00 ok", "привет"]
+    client = MLClient("http://unused")
+
+    assert batch_fallback_importance(texts) == [client._fallback_importance(text) for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_fake_client_batch_uses_same_scores():
+    texts = random_texts(50, seed=7)
+    client = FakeMLClient()
+
+    single = [await client.analyze_importance(text) for text in texts]
+
+    assert await client.batch_analyze_importance(texts) == single
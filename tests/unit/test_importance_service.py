@@ -0,0 +1,63 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from src.pokoroche.domain.services.importance_service import ImportanceService
+
+
+@pytest.mark.asyncio
+async def test_batch_calculate_importance_one_ml_call():
+    ml_client = AsyncMock()
+    ml_client.batch_analyze_importance = AsyncMock(return_value=[1.5, 0.4])
+    service = ImportanceService(ml_client)
+
+    scores = await service.batch_calculate_importance(["  Срочно\u200b ", "", "привет", "   "])
+
+    ml_client.batch_analyze_importance.assert_awaited_once_with(["Срочно", "привет"])
+    ml_client.analyze_importance.assert_not_awaited()
+    assert scores == [1.0, 0.0, 0.4, 0.0]
+
+
+class TrackingMLClient:
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.batches = []
+
+    async def batch_analyze_importance(self, texts):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        self.batches.append(len(texts))
+        # Первые пачки отвечают дольше остальных - порядок всё равно должен сохраниться
+        await asyncio.sleep(0.02 if len(self.batches) == 1 else 0.001)
+        self.active -= 1
+        return [int(t) / 1000 for t in texts]
+
+
+async def numbers(count):
+    for i in range(count):
+        yield str(i)
+
+
+@pytest.mark.asyncio
+async def test_stream_keeps_order_and_bounds_concurrency():
+    ml_client = TrackingMLClient()
+    service = ImportanceService(ml_client)
+
+    scores = [s async for s in service.stream_calculate_importance(numbers(250), chunk_size=20, concurrency=3)]
+
+    assert scores == [i / 1000 for i in range(250)]
+    assert ml_client.batches == [20] * 12 + [10]
+    assert ml_client.max_active <= 3
+
+
+@pytest.mark.asyncio
+async def test_stream_accepts_plain_iterables_and_stops_early():
+    ml_client = TrackingMLClient()
+    service = ImportanceService(ml_client, chunk_size=5, concurrency=2)
+
+    stream = service.stream_calculate_importance(str(i) for i in range(1000))
+    first = [await stream.__anext__() for _ in range(3)]
+    await stream.aclose()
+
+    assert first == [0.0, 0.001, 0.002]
+    assert len(ml_client.batches) <= 3
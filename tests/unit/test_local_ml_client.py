@@ -0,0 +1,69 @@
+import asyncio
+import pickle
+import pytest
+from src.pokoroche.adapters.local_ml_client import LocalMLClient
+
+
+class LengthModel:
+    def predict(self, texts):
+        return [min(len(t) / 10, 1.0) for t in texts]
+
+
+class FirstWordModel:
+    def predict(self, texts):
+        return [t.split()[0].lower() for t in texts]
+
+
+def save_models(path):
+    with open(path / "importance_model.pkl", "wb") as f:
+        pickle.dump(LengthModel(), f)
+    with open(path / "topic_model.pkl", "wb") as f:
+        pickle.dump(FirstWordModel(), f)
+
+
+@pytest.mark.asyncio
+async def test_local_client_runs_models_in_process_pool(tmp_path):
+    save_models(tmp_path)
+    client = LocalMLClient(str(tmp_path), workers=1, batch_window=0.01)
+    try:
+        await client.start()
+        scores = await asyncio.gather(client.analyze_importance("abc"), client.analyze_importance("abcdef"))
+        topics = await client.batch_extract_topics(["Релиз завтра", "Встреча"])
+        assert await client.health_check() is True
+    finally:
+        await client.close()
+
+    assert scores == [0.3, 0.6]
+    assert topics == [["релиз"], ["встреча"]]
+    assert client.model_version is not None
+
+
+@pytest.mark.asyncio
+async def test_local_client_requires_models(tmp_path):
+    client = LocalMLClient(str(tmp_path / "missing"))
+    with pytest.raises(RuntimeError):
+        await client.start()
+    assert await client.health_check() is False
+
+
+class DoubleLengthModel:
+    def predict(self, texts):
+        return [min(len(t) / 5, 1.0) for t in texts]
+
+
+@pytest.mark.asyncio
+async def test_local_client_hot_reloads_models(tmp_path):
+    save_models(tmp_path)
+    client = LocalMLClient(str(tmp_path), workers=1)
+    try:
+        await client.start()
+        assert await client.analyze_importance("abc") == 0.3
+        old_version = client.model_version
+
+        with open(tmp_path / "importance_model.pkl", "wb") as f:
+            pickle.dump(DoubleLengthModel(), f)
+        assert await client.reload_models() is True
+        assert await client.analyze_importance("abc") == 0.6
+        assert client.model_version != old_version
+    finally:
+        await client.close()
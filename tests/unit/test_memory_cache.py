@@ -0,0 +1,27 @@
+import time
+from src.pokoroche.adapters.memory_cache import LRUCache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_lru_respects_byte_limit_and_ttl():
+    cache = LRUCache(max_entries=100, max_bytes=10, ttl=0.05)
+    cache.set("a", "12345")
+    cache.set("b", "12345")
+    assert cache.get("a") is None
+    assert cache.get_stats()["bytes"] <= 10
+
+    time.sleep(0.06)
+    assert cache.get("b") is None
+    assert cache.get_stats()["entries"] == 0
@@ -50,3 +50,22 @@ async def test_message_handler_skips_when_no_message_id():
     await handler.handle(user_id=123, chat_id=777, text="hi", message_data={"date": 1700000000})
 
     message_repo.save.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_message_handler_uses_combined_analysis():
+    message_repo = AsyncMock()
+    importance_service = AsyncMock()
+    topic_service = AsyncMock()
+    analysis_service = AsyncMock()
+    analysis_service.analyze = AsyncMock(return_value={"importance": 0.8, "topics": ["релиз"]})
+    handler = MessageHandler(message_repo, importance_service, topic_service, analysis_service)
+
+    await handler.handle(user_id=123, chat_id=777, text="релиз завтра", message_data={"message_id": 1})
+
+    analysis_service.analyze.assert_awaited_once()
+    importance_service.calculate_importance.assert_not_awaited()
+    topic_service.extract_topics.assert_not_awaited()
+    saved_entity = message_repo.save.await_args.args[0]
+    assert saved_entity.importance_score == 0.8
+    assert saved_entity.topics == ["релиз"]
@@ -0,0 +1,115 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from src.pokoroche.adapters.message_queue import MessageQueue
+from src.pokoroche.commands.message_handler import INGEST_QUEUE, MessageHandler
+from src.pokoroche.commands.message_ingestion import MessageIngestionWorker
+
+
+def make_services():
+    importance_service = AsyncMock()
+    importance_service.batch_calculate_importance = AsyncMock(side_effect=lambda texts: [0.5] * len(texts))
+    topic_service = AsyncMock()
+    topic_service.batch_extract_topics = AsyncMock(side_effect=lambda texts: [["тема"] for _ in texts])
+    return importance_service, topic_service
+
+
+@pytest.mark.asyncio
+async def test_handler_enqueues_text_messages(fake_redis):
+    message_repo = AsyncMock()
+    importance_service, topic_service = make_services()
+    queue = MessageQueue(fake_redis)
+    handler = MessageHandler(message_repo, importance_service, topic_service, message_queue=queue)
+
+    await handler.handle(user_id=1, chat_id=7, text="релиз завтра", message_data={"message_id": 1})
+
+    # ML и БД не вызываются в обработчике апдейта
+    message_repo.save.assert_not_awaited()
+    importance_service.calculate_importance.assert_not_awaited()
+    assert await fake_redis.llen(INGEST_QUEUE) == 1
+
+    # Сообщения без текста по-прежнему сохраняются сразу
+    await handler.handle(user_id=1, chat_id=7, text="", message_data={"message_id": 2, "photo": []})
+    message_repo.save.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_worker_scores_and_saves_batch(fake_redis):
+    message_repo = AsyncMock()
+    importance_service, topic_service = make_services()
+    queue = MessageQueue(fake_redis)
+    handler = MessageHandler(AsyncMock(), importance_service, topic_service, message_queue=queue)
+    for i in range(3):
+        await handler.handle(user_id=i, chat_id=7, text=f"сообщение {i}", message_data={"message_id": i, "date": 1700000000})
+
+    worker = MessageIngestionWorker(queue, message_repo, importance_service, topic_service, batch_size=10, linger=0.01)
+    items = await queue.pop_batch(INGEST_QUEUE, worker.batch_size, linger=worker.linger)
+    assert await worker.process_batch(items) == 3
+
+    # Одна пачка в ML и одна запись в БД
+    importance_service.batch_calculate_importance.assert_awaited_once_with(["сообщение 0", "сообщение 1", "сообщение 2"])
+    topic_service.batch_extract_topics.assert_awaited_once()
+    message_repo.save_many.assert_awaited_once()
+    saved = message_repo.save_many.await_args.args[0]
+    assert [m.telegram_message_id for m in saved] == [0, 1, 2]
+    assert all(m.importance_score == 0.5 and m.topics == ["тема"] for m in saved)
+    assert saved[0].created_at.timestamp() == 1700000000
+
+
+@pytest.mark.asyncio
+async def test_worker_requeues_failed_batch_until_max_attempts(fake_redis):
+    queue = MessageQueue(fake_redis)
+    worker = MessageIngestionWorker(queue, AsyncMock(), None, None, max_attempts=2)
+    items = [{"user_id": 1, "chat_id": 7, "text": "привет", "message_data": {"message_id": 1}}]
+
+    await worker._requeue(items)
+    requeued = await queue.pop_batch(INGEST_QUEUE, 10, linger=0)
+    assert requeued == [{**items[0], "attempts": 1}]
+
+    # Вторая неудача - сообщение выбрасывается
+    await worker._requeue(requeued)
+    assert await fake_redis.llen(INGEST_QUEUE) == 0
+
+
+@pytest.mark.asyncio
+async def test_worker_run_requeues_batch_on_failure(fake_redis):
+    message_repo = AsyncMock()
+    importance_service, topic_service = make_services()
+    importance_service.batch_calculate_importance = AsyncMock(side_effect=RuntimeError("ml down"))
+    queue = MessageQueue(fake_redis)
+    await queue.push(INGEST_QUEUE, {"user_id": 1, "chat_id": 7, "text": "привет", "message_data": {"message_id": 1}})
+    worker = MessageIngestionWorker(queue, message_repo, importance_service, topic_service, linger=0, poll_timeout=0)
+
+    task = asyncio.ensure_future(worker.run())
+    await asyncio.sleep(0.1)
+    await worker.stop()
+    await task
+
+    message_repo.save_many.assert_not_awaited()
+    assert (await queue.pop(INGEST_QUEUE))["attempts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_worker_saves_one_by_one_when_batch_save_fails(fake_redis):
+    message_repo = AsyncMock()
+    message_repo.save_many = AsyncMock(side_effect=RuntimeError("constraint violation"))
+
+    async def save(entity):
+        if entity.telegram_message_id == 2:
+            raise RuntimeError("constraint violation")
+
+    message_repo.save = AsyncMock(side_effect=save)
+    importance_service, topic_service = make_services()
+    queue = MessageQueue(fake_redis)
+    worker = MessageIngestionWorker(queue, message_repo, importance_service, topic_service)
+    items = [
+        {"user_id": 1, "chat_id": 7, "text": f"сообщение {i}", "message_data": {"message_id": i}}
+        for i in range(1, 4)
+    ]
+
+    assert await worker.process_batch(items) == 2
+
+    # Частоты слов - только по сохранённым, в очередь возвращается только неудачное
+    recorded = [c.args[0] for c in topic_service.record_document.await_args_list]
+    assert recorded == ["сообщение 1", "сообщение 3"]
+    assert await queue.pop_batch(INGEST_QUEUE, 10, linger=0) == [{**items[1], "attempts": 1}]
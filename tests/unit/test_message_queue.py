@@ -11,3 +11,18 @@ async def test_message_queue_push_pop(fake_redis):
     result = await queue.pop("test_queue")
 
     assert result == message
+
+
+@pytest.mark.asyncio
+async def test_message_queue_pop_batch(fake_redis):
+    queue = MessageQueue(fake_redis)
+    for i in range(5):
+        await queue.push("test_queue", {"id": i})
+
+    # Пачка не больше max_size, остаток уходит в следующую
+    first = await queue.pop_batch("test_queue", max_size=3, linger=0.01)
+    second = await queue.pop_batch("test_queue", max_size=3, linger=0.01)
+
+    assert [m["id"] for m in first] == [0, 1, 2]
+    assert [m["id"] for m in second] == [3, 4]
+    assert await queue.pop_batch("test_queue", max_size=3, linger=0.01, timeout=0) == []
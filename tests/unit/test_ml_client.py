@@ -0,0 +1,241 @@
+import asyncio
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from src.pokoroche.adapters.fake_ml_client import FakeMLClient
+from src.pokoroche.adapters.ml_client import MLClient
+
+
+def make_ml_app(calls):
+    async def importance(request):
+        calls.append(request.path)
+        return web.json_response({"importance": 0.7})
+
+    async def topics(request):
+        calls.append(request.path)
+        return web.json_response({"topics": ["новости"]})
+
+    app = web.Application()
+    app.router.add_post("/importance", importance)
+    app.router.add_post("/topics", topics)
+    return app
+
+
+@pytest.mark.asyncio
+async def test_ml_client_reuses_one_session():
+    calls = []
+    server = TestServer(make_ml_app(calls))
+    await server.start_server()
+    client = MLClient(str(server.make_url("")), connection_limit=10)
+    try:
+        assert await client.analyze_importance("привет") == 0.7
+        session = client.session
+        assert await client.extract_topics("привет") == ["новости"]
+        assert await client.analyze_importance("ещё раз") == 0.7
+
+        assert client.session is session
+        assert calls == ["/importance", "/topics", "/importance"]
+    finally:
+        await client.close()
+        await server.close()
+
+    assert client.session is None
+
+
+@pytest.mark.asyncio
+async def test_ml_client_falls_back_when_service_unavailable():
+    client = MLClient("http://127.0.0.1:1", timeout=1, max_retries=1)
+    try:
+        score = await client.analyze_importance("СРОЧНО!")
+        topics = await client.extract_topics("Завтра собрание команды")
+    finally:
+        await client.close()
+
+    assert 0.0 < score <= 1.0
+    assert sorted(topics) == ["завтра", "команды", "собрание"]
+
+
+def make_batch_ml_app(calls):
+    async def importance_batch(request):
+        data = await request.json()
+        calls.append(len(data["texts"]))
+        return web.json_response({"importances": [len(t) / 100 for t in data["texts"]]})
+
+    async def topics_batch(request):
+        data = await request.json()
+        calls.append(len(data["texts"]))
+        return web.json_response({"topics": [[t] for t in data["texts"]]})
+
+    app = web.Application()
+    app.router.add_post("/importance/batch", importance_batch)
+    app.router.add_post("/topics/batch", topics_batch)
+    return app
+
+
+@pytest.mark.asyncio
+async def test_ml_client_micro_batches_concurrent_calls():
+    calls = []
+    server = TestServer(make_batch_ml_app(calls))
+    await server.start_server()
+    client = MLClient(str(server.make_url("")), batch_size=3, batch_window=0.01)
+    try:
+        texts = ["a" * n for n in range(1, 6)]
+        scores = await asyncio.gather(*(client.analyze_importance(t) for t in texts))
+        topics = await asyncio.gather(client.extract_topics("x"), client.extract_topics("y"))
+    finally:
+        await client.close()
+        await server.close()
+
+    # 5 текстов при размере пачки 3 -> два запроса; каждый получил свой результат
+    assert calls == [3, 2, 2]
+    assert scores == [0.01, 0.02, 0.03, 0.04, 0.05]
+    assert topics == [["x"], ["y"]]
+
+
+@pytest.mark.asyncio
+async def test_ml_client_batch_falls_back_per_text():
+    client = MLClient("http://127.0.0.1:1", timeout=1, max_retries=1, batch_window=0.01)
+    try:
+        scores = await client.batch_analyze_importance(["", "СРОЧНО!"])
+        single = await client.analyze_importance("СРОЧНО!")
+    finally:
+        await client.close()
+
+    assert scores[0] == 0.0
+    assert scores[1] == single > 0.0
+
+
+@pytest.mark.asyncio
+async def test_ml_client_stops_calling_service_when_breaker_open():
+    calls = []
+
+    async def importance(request):
+        calls.append(request.path)
+        return web.json_response({"error": "boom"}, status=500)
+
+    app = web.Application()
+    app.router.add_post("/importance", importance)
+    server = TestServer(app)
+    await server.start_server()
+    client = MLClient(
+        str(server.make_url("")), max_retries=2, backoff_base=0.001,
+        breaker_threshold=2, breaker_recovery=60,
+    )
+    try:
+        for _ in range(4):
+            assert 0.0 <= await client.analyze_importance("СРОЧНО!") <= 1.0
+    finally:
+        await client.close()
+        await server.close()
+
+    # Два вызова по две попытки, дальше breaker открыт и запросы не уходят
+    assert len(calls) == 4
+    assert client.breaker.get_status()["state"] == "open"
+    assert client.breaker.get_status()["rejected"] == 2
+
+
+@pytest.mark.asyncio
+async def test_ml_client_respects_total_deadline():
+    async def importance(request):
+        await asyncio.sleep(1)
+        return web.json_response({"importance": 0.9})
+
+    app = web.Application()
+    app.router.add_post("/importance", importance)
+    server = TestServer(app)
+    await server.start_server()
+    client = MLClient(str(server.make_url("")), max_retries=5, deadline=0.2)
+    try:
+        started = asyncio.get_running_loop().time()
+        score = await client.analyze_importance("привет")
+        elapsed = asyncio.get_running_loop().time() - started
+    finally:
+        await client.close()
+        await server.close()
+
+    assert score != 0.9
+    assert elapsed < 0.6
+
+
+@pytest.mark.asyncio
+async def test_ml_client_reads_model_version_from_health():
+    async def health(request):
+        return web.json_response({"status": "ok", "model_version": "2024-06"})
+
+    app = web.Application()
+    app.router.add_get("/health", health)
+    server = TestServer(app)
+    await server.start_server()
+    client = MLClient(str(server.make_url("")))
+    try:
+        assert await client.fetch_model_version() == "2024-06"
+    finally:
+        await client.close()
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_ml_client_cancelled_probe_does_not_stick_half_open():
+    calls = []
+    hang = asyncio.Event()
+
+    async def importance(request):
+        calls.append(request.path)
+        if len(calls) == 2:
+            # Пробный запрос зависает, вызывающий отменяет его по таймауту
+            await hang.wait()
+        if len(calls) == 1:
+            return web.json_response({"error": "boom"}, status=500)
+        return web.json_response({"importance": 0.7})
+
+    app = web.Application()
+    app.router.add_post("/importance", importance)
+    server = TestServer(app)
+    await server.start_server()
+    client = MLClient(
+        str(server.make_url("")), max_retries=1,
+        breaker_threshold=1, breaker_recovery=0.05,
+    )
+    try:
+        assert await client.analyze_importance("привет") != 0.7
+        assert client.breaker.state == "open"
+
+        await asyncio.sleep(0.06)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(client.analyze_importance("привет"), timeout=0.05)
+        assert client.breaker.state == "open"
+
+        # Через recovery_timeout следующая проба проходит и закрывает breaker
+        await asyncio.sleep(0.06)
+        assert await client.analyze_importance("привет") == 0.7
+        assert client.breaker.state == "closed"
+    finally:
+        hang.set()
+        await client.close()
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_ml_client_health_check_uses_get():
+    async def health(request):
+        return web.json_response({"status": "ok"})
+
+    app = web.Application()
+    app.router.add_get("/health", health)
+    server = TestServer(app)
+    await server.start_server()
+    client = MLClient(str(server.make_url("")))
+    try:
+        assert await client.health_check() is True
+    finally:
+        await client.close()
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_ml_client_interface_has_lifecycle_defaults():
+    # Любой IMLClient можно запускать и закрывать одинаково
+    client = FakeMLClient()
+    await client.start()
+    assert await client.analyze_importance("срочно!") > 0
+    await client.close()
@@ -0,0 +1,55 @@
+import pickle
+import numpy as np
+import pytest
+from src.pokoroche.infrastructure.ml.model_loader import ModelLoader
+
+
+class WeightedModel:
+    def predict(self, texts):
+        return [float(self.weights.sum()) for _ in texts]
+
+
+def save_models(path, weights):
+    for name in ("topic_model", "importance_model"):
+        with open(path / f"{name}.pkl", "wb") as f:
+            pickle.dump(WeightedModel(), f)
+    np.save(path / "importance_model.weights.npy", np.array(weights, dtype=np.float32))
+
+
+@pytest.mark.asyncio
+async def test_model_arrays_are_memory_mapped(tmp_path):
+    save_models(tmp_path, [0.25, 0.25])
+    loader = ModelLoader(str(tmp_path))
+
+    assert await loader.load_models() is True
+    assert isinstance(loader.importance_model.weights, np.memmap)
+    assert loader.importance_model.predict(["a"]) == [0.5]
+    assert not hasattr(loader.topic_model, "weights")
+
+
+@pytest.mark.asyncio
+async def test_reload_swaps_models_only_when_files_change(tmp_path):
+    save_models(tmp_path, [0.5])
+    loader = ModelLoader(str(tmp_path))
+    await loader.load_models()
+    old_models = loader.models
+
+    assert await loader.reload_if_changed() is False
+    save_models(tmp_path, [0.5, 0.25, 0.125])
+    assert await loader.reload_if_changed() is True
+
+    # Взятый раньше снимок не изменился - начатые запросы досчитываются на старой версии
+    assert old_models.importance_model.predict(["a"]) == [0.5]
+    assert loader.importance_model.predict(["a"]) == [0.875]
+    assert loader.model_version != old_models.version
+
+
+@pytest.mark.asyncio
+async def test_failed_reload_keeps_old_models(tmp_path):
+    save_models(tmp_path, [0.5])
+    loader = ModelLoader(str(tmp_path))
+    await loader.load_models()
+
+    (tmp_path / "topic_model.pkl").write_bytes(b"broken")
+    assert await loader.reload_if_changed() is False
+    assert loader.importance_model.predict(["a"]) == [0.5]
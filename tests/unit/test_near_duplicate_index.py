@@ -0,0 +1,63 @@
+import pytest
+from unittest.mock import AsyncMock
+from src.pokoroche.adapters.near_duplicate_index import NearDuplicateIndex
+from src.pokoroche.commands.message_handler import MessageHandler
+
+ANNOUNCEMENT = (
+    "Завтра в 10 утра состоится общее собрание сотрудников отдела разработки в большом зале, "
+    "просьба не опаздывать и взять с собой ноутбуки для демонстрации результатов спринта"
+)
+
+
+def test_index_finds_near_duplicates_only():
+    index = NearDuplicateIndex()
+    index.add(index.signature(ANNOUNCEMENT), (0.9, ["собрание"]))
+
+    # Пересылка с подписью и ссылкой - тот же текст
+    forwarded = ANNOUNCEMENT + " — Иван Петров https://t.me/devchat"
+    assert index.find(index.signature(forwarded)) == (0.9, ["собрание"])
+    other = "Продаю велосипед в хорошем состоянии недорого, пишите в личные сообщения если интересно"
+    assert index.find(index.signature(other)) is None
+    # Короткие тексты не сравниваются
+    assert index.signature("ок, спасибо") is None
+    assert index.find(None) is None
+
+    stats = index.get_stats()
+    assert stats["lookups"] == 3
+    assert stats["hits"] == 1
+    assert stats["reuse_rate"] == pytest.approx(1 / 3)
+
+
+def test_index_evicts_least_recently_used():
+    index = NearDuplicateIndex(max_entries=2)
+    texts = [f"текст номер {i} " + " ".join(f"слово{i}x{j}" for j in range(10)) for i in range(3)]
+    for i, text in enumerate(texts):
+        index.add(index.signature(text), i)
+
+    assert index.get_stats()["entries"] == 2
+    assert index.find(index.signature(texts[0])) is None
+    assert index.find(index.signature(texts[2])) == 2
+    # Полосы вытесненной записи тоже удалены
+    assert sum(len(bucket) for bucket in index.buckets.values()) == 2 * index.bands
+
+
+@pytest.mark.asyncio
+async def test_message_handler_reuses_scores_for_near_duplicates():
+    message_repo = AsyncMock()
+    importance_service = AsyncMock()
+    importance_service.calculate_importance = AsyncMock(return_value=0.7)
+    topic_service = AsyncMock()
+    topic_service.extract_topics = AsyncMock(return_value=["собрание"])
+    index = NearDuplicateIndex()
+    handler = MessageHandler(message_repo, importance_service, topic_service, duplicate_index=index)
+
+    await handler.handle(user_id=1, chat_id=7, text=ANNOUNCEMENT, message_data={"message_id": 1})
+    await handler.handle(user_id=2, chat_id=8, text=ANNOUNCEMENT + " @ivan", message_data={"message_id": 2})
+
+    importance_service.calculate_importance.assert_awaited_once()
+    topic_service.extract_topics.assert_awaited_once()
+    saved = message_repo.save.await_args.args[0]
+    assert saved.telegram_message_id == 2
+    assert saved.importance_score == 0.7
+    assert saved.topics == ["собрание"]
+    assert index.get_stats()["reuse_rate"] == 0.5
@@ -0,0 +1,67 @@
+import pytest
+from unittest.mock import AsyncMock
+from src.pokoroche.adapters.rate_limiter import TokenBucket, TelegramRateLimiter
+from src.pokoroche.adapters.telegram_bot import TelegramBot
+
+
+def test_token_bucket_reserve():
+    bucket = TokenBucket(rate=10, capacity=2)
+
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    # Третий токен будет доступен примерно через 1/rate секунд
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_throttles_single_chat():
+    limiter = TelegramRateLimiter(global_rate=1000, chat_rate=50, chat_burst=1)
+
+    await limiter.acquire(chat_id=1)
+    waited = await limiter.acquire(chat_id=1)
+    other_chat = await limiter.acquire(chat_id=2)
+
+    assert waited >= 0.015
+    assert other_chat < 0.005
+
+    stats = limiter.get_stats()
+    assert stats["sent"] == 3
+    assert stats["throttled"] == 1
+    assert stats["wait_max"] >= 0.015
+    assert stats["chats_tracked"] == 2
+
+
+@pytest.mark.asyncio
+async def test_post_retries_after_429():
+    bot = TelegramBot("token", max_send_retries=3)
+    flood = {"ok": False, "error_code": 429, "parameters": {"retry_after": 0.01}}
+    bot._request = AsyncMock(side_effect=[flood, {"ok": True, "result": {"message_id": 1}}])
+
+    ok = await bot.send_message(1, "привет")
+
+    assert ok is True
+    assert bot._request.await_count == 2
+    assert bot.rate_limiter.get_stats()["retries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_post_gives_up_after_max_retries():
+    bot = TelegramBot("token", max_send_retries=1)
+    flood = {"ok": False, "error_code": 429, "parameters": {"retry_after": 0.01}}
+    bot._request = AsyncMock(return_value=flood)
+
+    ok = await bot.send_message(1, "привет")
+
+    assert ok is False
+    assert bot._request.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_post_does_not_limit_get_updates():
+    bot = TelegramBot("token")
+    bot._request = AsyncMock(return_value={"ok": True, "result": []})
+
+    await bot.post("getUpdates", {"offset": 0})
+
+    assert bot.rate_limiter.get_stats()["sent"] == 0
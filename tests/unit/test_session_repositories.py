@@ -0,0 +1,37 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from src.pokoroche.domain.models.message import MessageEntity
+# Модели БД импортируются через database (там объявлен Base)
+from src.pokoroche.infrastructure.database import database  # noqa: F401
+from src.pokoroche.infrastructure.database.repositories.message_repository import SessionMessageRepository
+
+
+class FakeSessionFactory:
+    def __init__(self):
+        self.sessions = []
+
+    def __call__(self):
+        session = MagicMock()
+        session.flush = AsyncMock()
+        session.commit = AsyncMock()
+        session.__aenter__ = AsyncMock(return_value=session)
+        session.__aexit__ = AsyncMock(return_value=False)
+        self.sessions.append(session)
+        return session
+
+
+@pytest.mark.asyncio
+async def test_save_many_commits_each_batch_in_own_session():
+    factory = FakeSessionFactory()
+    repository = SessionMessageRepository(factory)
+    batch = [MessageEntity(telegram_message_id=i, chat_id=7, user_id=1, text="привет") for i in range(3)]
+
+    saved = await repository.save_many(batch)
+    await repository.save_many(batch[:1])
+
+    assert [m.telegram_message_id for m in saved] == [0, 1, 2]
+    assert len(factory.sessions) == 2
+    first = factory.sessions[0]
+    assert len(first.add_all.call_args.args[0]) == 3
+    first.flush.assert_awaited_once()
+    first.commit.assert_awaited_once()
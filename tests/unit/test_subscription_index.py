@@ -0,0 +1,68 @@
+import pytest
+from unittest.mock import AsyncMock
+from src.pokoroche.adapters.subscription_index import SubscriptionIndex
+from src.pokoroche.commands.subscribe_cmd import SubscribeCommand
+
+
+@pytest.mark.asyncio
+async def test_index_resolves_topics_to_subscribers(fake_redis):
+    index = SubscriptionIndex(fake_redis)
+    await index.add(1, "Релиз")
+    await index.add(2, "релиз")
+    await index.add(2, "Machine Learning")
+    await index.add(3, "спорт")
+
+    assert index.subscribers(["релиз", "machinelearning"]) == {1, 2}
+    assert await index.fetch_subscribers(["релиз!", "спорт"]) == {1, 2, 3}
+
+    await index.remove(1, "релиз")
+    assert index.subscribers(["релиз"]) == {2}
+
+    # Другой процесс восстанавливает зеркало из Redis
+    other = SubscriptionIndex(fake_redis)
+    await other.load()
+    assert other.subscribers(["релиз", "спорт"]) == {2, 3}
+
+
+@pytest.mark.asyncio
+async def test_remove_keeps_other_subscriptions_with_same_topic(fake_redis):
+    index = SubscriptionIndex(fake_redis)
+    # Обе подписки сводятся к теме "c"
+    await index.add(1, "C++")
+    await index.add(1, "C#")
+
+    await index.remove(1, "C++")
+    assert index.subscribers(["c"]) == {1}
+    assert await index.fetch_subscribers(["c"]) == {1}
+
+    await index.remove(1, "c#")
+    assert index.subscribers(["c"]) == set()
+    # Тема без подписчиков убирается из списка тем
+    assert await fake_redis.smembers(index.topics_key) == set()
+
+
+@pytest.mark.asyncio
+async def test_remove_counts_subscriptions_without_redis():
+    index = SubscriptionIndex()
+    await index.add(1, "C++")
+    await index.add(1, "C#")
+
+    await index.remove(1, "C#")
+    assert index.subscribers(["c"]) == {1}
+    await index.remove(1, "C++")
+    assert index.subscribers(["c"]) == set()
+
+
+@pytest.mark.asyncio
+async def test_subscribe_command_updates_index():
+    user = {"telegram_id": 10, "settings": {}}
+    repo = AsyncMock()
+    repo.find_by_telegram_id = AsyncMock(return_value=user)
+    index = SubscriptionIndex()
+    cmd = SubscribeCommand(None, repo, None, index)
+
+    await cmd.handle(10, {"text": "/subscribe add Релиз"})
+    assert index.subscribers(["релиз"]) == {10}
+
+    await cmd.handle(10, {"text": "/subscribe remove релиз"})
+    assert index.subscribers(["релиз"]) == set()
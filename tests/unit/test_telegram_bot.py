@@ -0,0 +1,98 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from src.pokoroche.adapters.telegram_bot import TelegramBot, split_message
+
+
+def test_split_message_short_text():
+    assert split_message("привет", max_len=10) == ["привет"]
+
+
+def test_split_message_prefers_paragraphs_and_lines():
+    text = "aaaa\nbbbb\n\ncccc\ndddd"
+    assert split_message(text, max_len=12) == ["aaaa\nbbbb", "cccc\ndddd"]
+    assert split_message("aaaa\nbbbb\ncccc", max_len=10) == ["aaaa\nbbbb", "cccc"]
+
+
+def test_split_message_hard_cut_long_line():
+    parts = split_message("x" * 25, max_len=10)
+    assert parts == ["x" * 10, "x" * 10, "x" * 5]
+
+
+@pytest.mark.asyncio
+async def test_send_digest_attaches_keyboard_to_last_part():
+    bot = TelegramBot("token")
+    bot._request = AsyncMock(return_value={"ok": True, "result": {"message_id": 10}})
+
+    ok = await bot.send_digest(123, "новость", digest_id=42)
+
+    assert ok is True
+    # Один sendMessage вместо sendMessage + editMessageReplyMarkup
+    bot._request.assert_awaited_once()
+    method, payload = bot._request.await_args.args
+    assert method == "sendMessage"
+    assert payload["chat_id"] == 123
+    buttons = payload["reply_markup"]["inline_keyboard"][0]
+    assert [b["callback_data"] for b in buttons] == ["feedback:42:1", "feedback:42:0"]
+
+
+@pytest.mark.asyncio
+async def test_send_digest_long_text_sends_parts():
+    bot = TelegramBot("token", chat_rate=1000)
+    bot._request = AsyncMock(return_value={"ok": True, "result": {"message_id": 10}})
+
+    content = "\n\n".join("пункт " * 300 for _ in range(5))
+    ok = await bot.send_digest(123, content, digest_id=1)
+
+    assert ok is True
+    calls = bot._request.await_args_list
+    assert len(calls) > 1
+    assert all(len(c.args[1]["text"]) <= 4096 for c in calls)
+    assert "reply_markup" not in calls[0].args[1]
+    assert "reply_markup" in calls[-1].args[1]
+
+
+@pytest.mark.asyncio
+async def test_stop_waits_for_in_flight_handlers():
+    bot = TelegramBot("token", workers=1)
+    bot._request = AsyncMock(return_value={"ok": True, "result": {"message_id": 1}})
+    replies = []
+
+    async def slow_handler(user_id, msg):
+        await asyncio.sleep(0.05)
+        replies.append(user_id)
+        return "готово"
+
+    bot.register_handler("/digest", slow_handler)
+    await bot.enqueue_update(
+        {"update_id": 1, "message": {"message_id": 1, "text": "/digest", "chat": {"id": 5}, "from": {"id": 5}}}
+    )
+    await asyncio.sleep(0)
+
+    await bot.stop()
+
+    assert replies == [5]
+    bot._request.assert_awaited_once()
+    assert bot.session is None
+
+
+@pytest.mark.asyncio
+async def test_stop_gives_up_after_timeout():
+    bot = TelegramBot("token", workers=1, shutdown_timeout=0.01)
+    started = asyncio.Event()
+
+    async def stuck_handler(user_id, msg):
+        started.set()
+        await asyncio.sleep(10)
+
+    bot.register_handler("/digest", stuck_handler)
+    await bot.enqueue_update(
+        {"update_id": 1, "message": {"message_id": 1, "text": "/digest", "chat": {"id": 5}, "from": {"id": 5}}}
+    )
+    await started.wait()
+
+    await bot.stop()
+
+    # Незавершённый апдейт не считается обработанным
+    assert bot.in_flight == {1}
+    assert not bot.dispatcher.is_running
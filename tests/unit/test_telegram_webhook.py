@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from unittest.mock import AsyncMock
+from src.pokoroche.adapters.telegram_bot import TelegramBot
+from src.pokoroche.adapters.update_offset_store import UpdateOffsetStore
+from src.pokoroche.adapters.telegram_webhook import TelegramWebhookServer, SECRET_HEADER
+
+RECORDED_UPDATE = {
+    "update_id": 1001,
+    "message": {
+        "message_id": 5,
+        "date": 1700000000,
+        "text": "/digest",
+        "chat": {"id": 777, "type": "private"},
+        "from": {"id": 123, "first_name": "Иван"},
+    },
+}
+
+
+def make_bot():
+    bot = TelegramBot("token", workers=1)
+    bot.send_message = AsyncMock(return_value=True)
+    digest_handler = AsyncMock(return_value="Дайджест отправлен.")
+    bot.register_handler("/digest", digest_handler)
+    return bot, digest_handler
+
+
+@pytest.mark.asyncio
+async def test_webhook_dispatches_recorded_update():
+    bot, digest_handler = make_bot()
+    server = TelegramWebhookServer(bot, secret_token="s3cret")
+
+    async with TestClient(TestServer(server.make_app())) as client:
+        resp = await client.post("/webhook", json=RECORDED_UPDATE, headers={SECRET_HEADER: "s3cret"})
+        assert resp.status == 200
+
+    await bot.dispatcher.join()
+    await bot.dispatcher.stop()
+    digest_handler.assert_awaited_once_with(123, RECORDED_UPDATE["message"])
+    bot.send_message.assert_awaited_once_with(777, "Дайджест отправлен.")
+
+
+@pytest.mark.asyncio
+async def test_webhook_rejects_wrong_secret():
+    bot, digest_handler = make_bot()
+    server = TelegramWebhookServer(bot, secret_token="s3cret")
+
+    async with TestClient(TestServer(server.make_app())) as client:
+        resp = await client.post("/webhook", json=RECORDED_UPDATE, headers={SECRET_HEADER: "wrong"})
+        assert resp.status == 401
+
+        resp = await client.post("/webhook", data="not json", headers={SECRET_HEADER: "s3cret"})
+        assert resp.status == 400
+
+    digest_handler.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_webhook_acknowledges_without_waiting_for_full_queue(fake_redis):
+    bot = TelegramBot("token", workers=1, queue_size=1, offset_store=UpdateOffsetStore(fake_redis))
+    started = asyncio.Event()
+    release = asyncio.Event()
+    handled = []
+
+    async def slow_handler(user_id, msg):
+        handled.append(msg["message_id"])
+        started.set()
+        await release.wait()
+
+    bot.register_handler("/digest", slow_handler)
+    server = TelegramWebhookServer(bot)
+
+    def make_update(update_id):
+        return {**RECORDED_UPDATE, "update_id": update_id, "message": {**RECORDED_UPDATE["message"], "message_id": update_id}}
+
+    await fake_redis.set("telegram:processed:1", "1")
+    async with TestClient(TestServer(server.make_app())) as client:
+        # Уже обработанный апдейт не ставится в очередь повторно
+        assert (await client.post("/webhook", json=make_update(1))).status == 200
+        assert (await client.post("/webhook", json=make_update(2))).status == 200
+        await started.wait()
+        # Повторная доставка обрабатываемого апдейта отбрасывается
+        assert (await client.post("/webhook", json=make_update(2))).status == 200
+        assert (await client.post("/webhook", json=make_update(3))).status == 200
+        # Очередь заполнена - ответ всё равно сразу, апдейт отброшен
+        resp = await asyncio.wait_for(client.post("/webhook", json=make_update(4)), timeout=1)
+        assert resp.status == 200
+
+    release.set()
+    await bot.dispatcher.join()
+    await bot.dispatcher.stop()
+    assert handled == [2, 3]
+    assert 4 not in bot.in_flight
@@ -0,0 +1,54 @@
+import re
+import sys
+import unicodedata
+from src.pokoroche.domain.services.text_processing import (
+    extract_keywords,
+    normalize_text,
+    normalize_topic,
+    remove_invisible_chars,
+)
+
+
+def old_remove_invisible_chars(s):
+    return "".join(c for c in s if unicodedata.category(c) not in ("Cc", "Cf"))
+
+
+def old_keywords(text):
+    allowed_chars = re.compile(r"[^a-zA-Zа-яА-ЯёЁ0-9-]")
+    words = {allowed_chars.sub("", word) for word in text.strip().lower().split()}
+    return {word for word in words if len(word) > 4}
+
+
+def test_remove_invisible_chars_matches_unicode_categories():
+    text = "При\u200bвет\u0000, мир\u2060!\t\nÉ\U000E0001"
+    assert remove_invisible_chars(text) == old_remove_invisible_chars(text)
+
+
+def test_invisible_chars_ranges_cover_all_control_and_format_chars():
+    # Зашитые диапазоны совпадают с категориями Cc/Cf текущей версии Unicode
+    invisible = "".join(
+        chr(code) for code in range(sys.maxunicode + 1) if unicodedata.category(chr(code)) in ("Cc", "Cf")
+    )
+    assert remove_invisible_chars(invisible + "a") == "a"
+    assert remove_invisible_chars("\ue000\u00a0a") == "\ue000\u00a0a"
+
+
+def test_normalize_text_strips_composes_and_memoizes():
+    raw = "  Café\u200b дня \n"
+    assert normalize_text(raw) == "Café дня"
+    hits = normalize_text.cache_info().hits
+    normalize_text(raw)
+    assert normalize_text.cache_info().hits == hits + 1
+
+
+def test_keywords_match_previous_heuristic():
+    text = "Завтра СОБРАНИЕ команды, собрание в 10:00! e-mail: test@example.com"
+    keywords = extract_keywords(text)
+    assert set(keywords) == old_keywords(text)
+    assert keywords[:2] == ["завтра", "собрание"]
+    assert extract_keywords("") == []
+
+
+def test_normalize_topic():
+    assert normalize_topic("  Релиз! ") == "релиз"
+    assert normalize_topic("Machine Learning") == "machinelearning"
@@ -0,0 +1,51 @@
+import pytest
+from unittest.mock import AsyncMock
+from src.pokoroche.adapters.document_frequency_store import DocumentFrequencyStore
+from src.pokoroche.domain.services.topic_service import TopicService
+
+
+@pytest.mark.asyncio
+async def test_categorize_weights_rare_topics_higher():
+    ml_client = AsyncMock()
+    ml_client.extract_topics = AsyncMock(return_value=["сегодня", "релиз"])
+    service = TopicService(ml_client, DocumentFrequencyStore(min_documents=1000))
+    for text in ("сегодня обед", "сегодня дождь", "сегодня релиз", "сегодня тихо"):
+        await service.record_document(text)
+
+    result = await service.categorize_message("Сегодня релиз, релиз!")
+
+    assert result["релиз"] > result["сегодня"]
+    assert 0.0 < result["сегодня"] < result["релиз"] <= 1.0
+
+
+@pytest.mark.asyncio
+async def test_categorize_drops_common_words():
+    ml_client = AsyncMock()
+    ml_client.extract_topics = AsyncMock(return_value=["привет", "дедлайн"])
+    service = TopicService(ml_client, DocumentFrequencyStore(min_documents=3))
+    for text in ("привет всем", "привет", "привет дедлайн"):
+        await service.record_document(text)
+
+    assert await service.categorize_message("привет, дедлайн завтра") == {"дедлайн": 1.0}
+
+
+@pytest.mark.asyncio
+async def test_categorize_without_store_and_empty_text():
+    ml_client = AsyncMock()
+    ml_client.extract_topics = AsyncMock(return_value=["релиз"])
+    service = TopicService(ml_client)
+
+    assert await service.categorize_message("релиз") == {"релиз": 1.0}
+    assert await service.categorize_message("   ") == {}
+
+
+@pytest.mark.asyncio
+async def test_batch_extract_topics_skips_empty_texts():
+    ml_client = AsyncMock()
+    ml_client.batch_extract_topics = AsyncMock(return_value=[["Релиз", "релиз"], ["Machine Learning"]])
+    service = TopicService(ml_client)
+
+    result = await service.batch_extract_topics(["релиз", "  ", "ml"])
+
+    ml_client.batch_extract_topics.assert_awaited_once_with(["релиз", "ml"])
+    assert result == [["релиз"], [], ["machinelearning"]]
@@ -0,0 +1,104 @@
+import asyncio
+import pytest
+from src.pokoroche.adapters.update_dispatcher import UpdateDispatcher, extract_chat_id
+
+
+def make_update(update_id, chat_id, text="привет"):
+    return {
+        "update_id": update_id,
+        "message": {"message_id": update_id, "text": text, "chat": {"id": chat_id}, "from": {"id": chat_id}},
+    }
+
+
+def test_extract_chat_id():
+    assert extract_chat_id(make_update(1, -100500)) == -100500
+    callback = {"callback_query": {"id": "1", "from": {"id": 42}, "message": {"chat": {"id": 7}}}}
+    assert extract_chat_id(callback) == 7
+    assert extract_chat_id({"callback_query": {"id": "1", "from": {"id": 42}}}) == 42
+    assert extract_chat_id({"update_id": 5}) is None
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_keeps_order_within_chat():
+    processed = []
+
+    async def handler(update):
+        # Первое сообщение чата обрабатывается дольше остальных
+        if update["update_id"] == 1:
+            await asyncio.sleep(0.05)
+        processed.append(update["update_id"])
+
+    dispatcher = UpdateDispatcher(handler, workers=4, queue_size=10)
+    for i in range(1, 4):
+        await dispatcher.dispatch(make_update(i, chat_id=10))
+    await dispatcher.join()
+    await dispatcher.stop()
+
+    assert processed == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_runs_chats_in_parallel():
+    slow_started = asyncio.Event()
+    release = asyncio.Event()
+    processed = []
+
+    async def handler(update):
+        if extract_chat_id(update) == 1:
+            slow_started.set()
+            await release.wait()
+        processed.append(extract_chat_id(update))
+
+    dispatcher = UpdateDispatcher(handler, workers=2, queue_size=10)
+    await dispatcher.dispatch(make_update(1, chat_id=1))
+    await slow_started.wait()
+    await dispatcher.dispatch(make_update(2, chat_id=2))
+    await asyncio.sleep(0.01)
+
+    # Медленный чат 1 не блокирует чат 2
+    assert processed == [2]
+
+    release.set()
+    await dispatcher.join()
+    await dispatcher.stop()
+    assert processed == [2, 1]
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_backpressure_when_queue_full():
+    release = asyncio.Event()
+
+    async def handler(update):
+        await release.wait()
+
+    dispatcher = UpdateDispatcher(handler, workers=1, queue_size=1)
+    await dispatcher.dispatch(make_update(1, chat_id=1))
+    await asyncio.sleep(0)
+    await dispatcher.dispatch(make_update(2, chat_id=1))
+
+    blocked = asyncio.create_task(dispatcher.dispatch(make_update(3, chat_id=1)))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    release.set()
+    await blocked
+    await dispatcher.join()
+    await dispatcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_survives_handler_error():
+    processed = []
+
+    async def handler(update):
+        if update["update_id"] == 1:
+            raise RuntimeError("boom")
+        processed.append(update["update_id"])
+
+    dispatcher = UpdateDispatcher(handler, workers=1)
+    await dispatcher.dispatch(make_update(1, chat_id=1))
+    await dispatcher.dispatch(make_update(2, chat_id=1))
+    await dispatcher.join()
+    await dispatcher.stop()
+
+    assert processed == [2]
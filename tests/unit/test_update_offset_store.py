@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from src.pokoroche.adapters.telegram_bot import TelegramBot
+from src.pokoroche.adapters.update_offset_store import UpdateOffsetStore
+
+
+def make_update(update_id, chat_id=1):
+    return {
+        "update_id": update_id,
+        "message": {"message_id": update_id, "text": "привет", "chat": {"id": chat_id}, "from": {"id": chat_id}},
+    }
+
+
+@pytest.mark.asyncio
+async def test_offset_store_roundtrip(fake_redis):
+    store = UpdateOffsetStore(fake_redis)
+
+    assert await store.load() == (0, 0)
+    await store.save(15, 20)
+    assert await store.load() == (15, 20)
+
+    assert await store.is_processed(16) is False
+    await store.mark_processed(16)
+    assert await store.is_processed(16) is True
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_keeps_unprocessed_updates(fake_redis):
+    store = UpdateOffsetStore(fake_redis)
+    release = asyncio.Event()
+
+    async def message_handler(user_id, chat_id, text, msg):
+        if chat_id == 1:
+            await release.wait()
+
+    bot = TelegramBot("token", workers=2, offset_store=store)
+    bot.register_message_handler(message_handler)
+
+    await bot.enqueue_update(make_update(10, chat_id=1))
+    await bot.enqueue_update(make_update(11, chat_id=2))
+    bot.update_offset = 12
+    await asyncio.sleep(0.01)
+
+    # Апдейт 11 обработан, а 10 ещё висит - продолжить можно только с 10
+    await bot.checkpoint()
+    assert await store.load() == (10, 11)
+
+    release.set()
+    await bot.dispatcher.join()
+    await bot.checkpoint()
+    assert await store.load() == (12, 11)
+    await bot.dispatcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_resume_skips_already_processed_updates(fake_redis):
+    store = UpdateOffsetStore(fake_redis)
+    await store.save(10, 11)
+    await store.mark_processed(11)
+
+    message_handler = AsyncMock()
+    bot = TelegramBot("token", workers=1, offset_store=store)
+    bot.register_message_handler(message_handler)
+    bot.update_offset, bot.resume_max_seen = await store.load()
+
+    for update_id in (10, 11, 12):
+        await bot.enqueue_update(make_update(update_id))
+    await bot.dispatcher.join()
+    await bot.dispatcher.stop()
+
+    handled = [c.args[3]["message_id"] for c in message_handler.await_args_list]
+    assert handled == [10, 12]
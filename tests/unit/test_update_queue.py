@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from src.pokoroche.adapters.telegram_bot import TelegramBot
+from src.pokoroche.adapters.update_queue import RedisUpdateQueue, UpdateQueueConsumer
+
+
+def make_update(update_id, chat_id):
+    return {
+        "update_id": update_id,
+        "message": {"message_id": update_id, "text": "привет", "chat": {"id": chat_id}, "from": {"id": chat_id}},
+    }
+
+
+@pytest.mark.asyncio
+async def test_poller_bot_publishes_updates_by_chat_partition(fake_redis):
+    update_queue = RedisUpdateQueue(fake_redis, partitions=2)
+    poller = TelegramBot("token", update_queue=update_queue)
+
+    for update_id, chat_id in ((1, 10), (2, 11), (3, 10)):
+        await poller.enqueue_update(make_update(update_id, chat_id))
+    await poller.dispatcher.join()
+    await poller.dispatcher.stop()
+
+    assert await fake_redis.llen("telegram:updates:0") == 2
+    assert await fake_redis.llen("telegram:updates:1") == 1
+    first, _ = await update_queue.consume(0)
+    second, _ = await update_queue.consume(0)
+    assert [first["update_id"], second["update_id"]] == [1, 3]
+    assert poller.in_flight == set()
+
+
+@pytest.mark.asyncio
+async def test_consumer_runs_handlers_for_its_partition(fake_redis):
+    update_queue = RedisUpdateQueue(fake_redis, partitions=2)
+    await update_queue.publish(make_update(1, chat_id=10))
+    await update_queue.publish(make_update(2, chat_id=11))
+
+    message_handler = AsyncMock()
+    worker_bot = TelegramBot("token", workers=1)
+    worker_bot.register_message_handler(message_handler)
+    consumer = UpdateQueueConsumer(worker_bot, update_queue, partition=0, poll_timeout=0)
+
+    task = asyncio.create_task(consumer.run())
+    await asyncio.sleep(0.01)
+    await consumer.stop()
+    await task
+
+    message_handler.assert_awaited_once()
+    assert message_handler.await_args.args[1] == 10
+    assert await fake_redis.llen("telegram:updates:1") == 1
+    # Обработанный апдейт подтверждён и убран из списка обрабатываемых
+    assert await fake_redis.llen("telegram:updates:0:processing") == 0
+
+
+@pytest.mark.asyncio
+async def test_consumer_restores_updates_left_by_crashed_worker(fake_redis):
+    update_queue = RedisUpdateQueue(fake_redis, partitions=1)
+    for update_id in (1, 2, 3):
+        await update_queue.publish(make_update(update_id, chat_id=10))
+    # Воркер взял два апдейта и упал, не обработав их
+    await update_queue.consume(0)
+    await update_queue.consume(0)
+    assert await fake_redis.llen("telegram:updates:0") == 1
+
+    message_handler = AsyncMock()
+    worker_bot = TelegramBot("token", workers=1)
+    worker_bot.register_message_handler(message_handler)
+    consumer = UpdateQueueConsumer(worker_bot, update_queue, partition=0, poll_timeout=0)
+
+    task = asyncio.create_task(consumer.run())
+    await asyncio.sleep(0.1)
+    await consumer.stop()
+    await task
+
+    handled = [c.args[3]["message_id"] for c in message_handler.await_args_list]
+    assert handled == [1, 2, 3]
+    assert await fake_redis.llen("telegram:updates:0:processing") == 0